@@ -0,0 +1,196 @@
+/**
+ * Computer player – search core
+ * ─────────────────────────────────────────────
+ * Pure functions over a compact snapshot, no DOM: run inside ai-worker.js,
+ * or on the main thread by ai.js when workers are unavailable. engine/ai.py
+ * makes the same choices for the same seed (python -m engine.crosscheck).
+ *
+ * Snapshot: board is the flat 100-cell layout; chips is an Int8Array of
+ * team indices (-1 = empty) and locked a Uint8Array of sequence cells,
+ * both indexed r * 10 + c; color is the mover's team index.
+ */
+
+export const ONE_EYE = new Set(['JH', 'JS']);
+export const TWO_EYE = new Set(['JD', 'JC']);
+
+// evaluateMove's terms, as in engine/ai.py; ai.js passes the tuned ones
+// from ai-weights.json (python -m engine.tune) once it has loaded them
+export const DEFAULT_WEIGHTS = {
+    win: 10000, block: 8000,
+    blockFour: 800, blockThree: 50,
+    makeFour: 100, makeThree: 10, makeTwo: 1,
+    breakFour: 800, breakThree: 150, breakTwo: 20,
+    center: 0.1
+};
+
+// The 192 five-cell windows on the board, as flat cell indices
+const WINDOWS = [];
+for (let r = 0; r < 10; r++) {
+    for (let c = 0; c < 10; c++) {
+        for (const [dr, dc] of [[0, 1], [1, 0], [1, 1], [1, -1]]) {
+            const er = r + 4 * dr, ec = c + 4 * dc;
+            if (er >= 10 || ec < 0 || ec >= 10) continue;
+            const cells = [];
+            for (let i = 0; i < 5; i++) cells.push((r + i * dr) * 10 + c + i * dc);
+            WINDOWS.push(cells);
+        }
+    }
+}
+
+// Seeded PRNG for the move jitter; engine/ai.py has the same generator
+export function mulberry32(seed) {
+    let a = seed >>> 0;
+    return () => {
+        a = (a + 0x6D2B79F5) >>> 0;
+        let t = a;
+        t = Math.imul(t ^ (t >>> 15), t | 1);
+        t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+        return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+    };
+}
+
+// Open windows (no opposing chip) holding 5/4/3/2 of `color`'s chips
+export function getLineStats(board, chips, color) {
+    let seqs = 0, max4 = 0, max3 = 0, max2 = 0;
+    for (const cells of WINDOWS) {
+        let run = 0, blocked = false;
+        for (const i of cells) {
+            if (board[i] === 'FREE' || chips[i] === color) run++;
+            else if (chips[i] !== -1) { blocked = true; break; }
+        }
+        if (blocked) continue;
+        if (run === 5) seqs++;
+        else if (run === 4) max4++;
+        else if (run === 3) max3++;
+        else if (run === 2) max2++;
+    }
+    return { seqs, max4, max3, max2 };
+}
+
+function sumStats(board, chips, colors) {
+    const total = { seqs: 0, max4: 0, max3: 0, max2: 0 };
+    for (const clr of colors) {
+        const stats = getLineStats(board, chips, clr);
+        total.seqs += stats.seqs;
+        total.max4 += stats.max4;
+        total.max3 += stats.max3;
+        total.max2 += stats.max2;
+    }
+    return total;
+}
+
+// Threat map: completing[clr][i] counts the open windows (no other team's
+// chip) whose only empty cell is i, so a chip of clr there makes five.
+// engine/threats.py keeps the same map incrementally.
+export function buildThreats(board, chips, teamCount) {
+    const completing = Array.from({ length: teamCount }, () => new Uint8Array(100));
+    for (const cells of WINDOWS) {
+        let owner = -1, gap = -1, gaps = 0;
+        for (const i of cells) {
+            if (board[i] === 'FREE') continue;
+            if (chips[i] === -1) {
+                gap = i;
+                if (++gaps > 1) break;
+            } else if (owner === -1) owner = chips[i];
+            else if (chips[i] !== owner) { owner = -2; break; }
+        }
+        if (gaps === 1 && owner >= 0) completing[owner][gap]++;
+    }
+    return completing;
+}
+
+export function evaluateMove(state, idx, type, threats = buildThreats(state.board, state.chips, state.teamCount), w = DEFAULT_WEIGHTS) {
+    const { board, chips, color, teamCount } = state;
+    let score = 0;
+    // Wins and blocks are lookups: a placement makes five exactly when idx
+    // is the last gap of an open window, and blocks one when it is an opponent's
+    if (type === 'place' && threats[color][idx]) {
+        score += w.win;
+    } else if (type === 'place' && threats.some((cells, clr) => clr !== color && cells[idx])) {
+        score += w.block;
+    } else {
+        const opponents = [];
+        for (let clr = 0; clr < teamCount; clr++) if (clr !== color) opponents.push(clr);
+        const testChips = Int8Array.from(chips);
+
+        const countsBefore = getLineStats(board, testChips, color);
+        const oppsBefore = sumStats(board, testChips, opponents);
+
+        testChips[idx] = type === 'place' ? color : -1;
+
+        const countsAfter = getLineStats(board, testChips, color);
+        const oppsAfter = sumStats(board, testChips, opponents);
+
+        if (type === 'place') {
+            score += (oppsBefore.max4 - oppsAfter.max4) * w.blockFour; // Blocking opponent 4-in-a-row
+            score += (oppsBefore.max3 - oppsAfter.max3) * w.blockThree;
+
+            score += (countsAfter.max4 - countsBefore.max4) * w.makeFour;
+            score += (countsAfter.max3 - countsBefore.max3) * w.makeThree;
+            score += (countsAfter.max2 - countsBefore.max2) * w.makeTwo;
+        } else if (type === 'remove') {
+            score += (oppsBefore.max4 - oppsAfter.max4) * w.breakFour;
+            score += (oppsBefore.max3 - oppsAfter.max3) * w.breakThree;
+            score += (oppsBefore.max2 - oppsAfter.max2) * w.breakTwo;
+        }
+    }
+
+    const r = Math.floor(idx / 10), c = idx % 10;
+    const centerDist = Math.abs(r - 4.5) + Math.abs(c - 4.5);
+    score -= centerDist * w.center;
+
+    return score;
+}
+
+function targets(state, card) {
+    const { board, chips, locked, color } = state;
+    const cells = [];
+    for (let i = 0; i < 100; i++) {
+        if (ONE_EYE.has(card)) {
+            if (chips[i] !== -1 && chips[i] !== color && !locked[i]) cells.push({ idx: i, type: 'remove' });
+        } else if (TWO_EYE.has(card)) {
+            if (board[i] !== 'FREE' && chips[i] === -1) cells.push({ idx: i, type: 'place' });
+        } else if (board[i] === card && chips[i] === -1) {
+            cells.push({ idx: i, type: 'place' });
+        }
+    }
+    return cells;
+}
+
+/**
+ * Best move for state.color: { type: 'place' | 'remove', cardIndex, r, c },
+ * { type: 'exchange', cardIndex } for a dead card, or null to pass.
+ * Stops scoring candidates once budgetMs has elapsed and returns the best
+ * so far (complete: false); an unlimited budget is fully deterministic.
+ */
+export function chooseMove(state, { seed = 0, budgetMs = Infinity, now = () => performance.now(), weights = DEFAULT_WEIGHTS } = {}) {
+    const random = mulberry32(seed);
+    const start = now();
+    let bestMove = null;
+    let bestScore = -Infinity;
+    let deadCardIndex = -1;
+    let evaluated = 0;
+    const threats = buildThreats(state.board, state.chips, state.teamCount);
+
+    for (let i = 0; i < state.hand.length; i++) {
+        const card = state.hand[i];
+        const cells = targets(state, card);
+        if (!cells.length && !ONE_EYE.has(card) && !TWO_EYE.has(card)) deadCardIndex = i;
+
+        for (const cell of cells) {
+            const score = evaluateMove(state, cell.idx, cell.type, threats, weights) + random() * 0.1;
+            evaluated++;
+            if (score > bestScore) {
+                bestScore = score;
+                bestMove = { type: cell.type, cardIndex: i, r: Math.floor(cell.idx / 10), c: cell.idx % 10 };
+            }
+            if (now() - start > budgetMs) {
+                return { ...bestMove, evaluated, complete: false };
+            }
+        }
+    }
+
+    if (bestMove) return { ...bestMove, evaluated, complete: true };
+    if (deadCardIndex !== -1) return { type: 'exchange', cardIndex: deadCardIndex };
+    return null;
+}
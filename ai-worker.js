@@ -0,0 +1,18 @@
+/**
+ * Computer player – Web Worker
+ * ─────────────────────────────────────────────
+ * Runs chooseMove off the UI thread. ai.js sends the board layout once
+ * ({ type: 'init' }) and then one compact snapshot per computer turn.
+ */
+import { chooseMove } from './ai-core.js';
+
+let board = null;
+
+self.onmessage = ({ data }) => {
+    if (data.type === 'init') {
+        board = data.board;
+        return;
+    }
+    const move = chooseMove({ ...data.state, board }, { seed: data.seed, budgetMs: data.budgetMs, weights: data.weights });
+    self.postMessage({ id: data.id, move });
+};
@@ -0,0 +1,228 @@
+/**
+ * Computer player – loaded on demand
+ * ─────────────────────────────────────────────
+ * Single-player setup and the AI only matter once "Play vs Computer" is
+ * chosen, so game.js fetches this module with import() at that point and
+ * mixes these methods into SequenceGame.prototype. Clients that join a
+ * multiplayer room never download or parse it. The move search itself
+ * (ai-core.js) runs in a Web Worker so long 3-team turns don't stall the UI.
+ */
+
+import { DEFAULT_WEIGHTS, chooseMove } from './ai-core.js';
+
+// Same values as in game.js
+const SUITS = { H: '♥', D: '♦', S: '♠', C: '♣' };
+const TEAM_COLORS = ['red', 'blue', 'green'];
+
+// Time the search may take per computer turn; set game.aiBudgetMs to override
+const AI_BUDGET_MS = 300;
+
+// Tuned evaluateMove weights (python -m engine.tune writes the file). Loaded
+// when this module is; until then, or if it is missing, the defaults apply.
+let aiWeights;
+fetch(new URL('./ai-weights.json', import.meta.url))
+    .then(res => (res.ok ? res.json() : null))
+    .then(file => {
+        if (!file || !file.weights) return;
+        // Same filter as load_weights in engine/ai.py: known keys, finite numbers
+        aiWeights = { ...DEFAULT_WEIGHTS };
+        for (const [key, value] of Object.entries(file.weights)) {
+            if (key in DEFAULT_WEIGHTS && Number.isFinite(value)) aiWeights[key] = value;
+        }
+    })
+    .catch(() => {});
+
+export const aiMethods = {
+    setupSinglePlayer() {
+        const ui = this.ui;
+        this.isSinglePlayer = true;
+        this.isHost = true; // Act as host for game logic
+
+        // Set up peers array manually (empty peer for the AI will be built by startGame)
+        this.peers = [];
+        this.peerNames = {};
+        this.playerIDMap = {};
+
+        // Show options instead of starting
+        ui.createSec.style.display = 'none';
+        ui.teamCfg.style.display = 'block';
+        ui.teamCfg.classList.add('single-player-setup');
+        ui.startBtn.style.display = 'block';
+        document.getElementById('setup-back-btn').style.display = 'block';
+
+        // Allow team selection for 1v1 or 1v1v1
+        this.updateTeamLabels(ui.teamLabels);
+    },
+
+    addComputerPlayers(assignments, colors) {
+        // Add automated computers for remaining teams
+        for (let i = 1; i < this.teamCount; i++) {
+            const botId = `bot-${i}`;
+            const botPeer = `COMPUTER_${i}`;
+            assignments.push({
+                peerId: botPeer,
+                playerID: botId,
+                color: colors[i],
+                name: 'Computer'
+            });
+            this.peerNames[botPeer] = 'Computer';
+            this.playerIDMap[botPeer] = botId;
+        }
+        this.peers = assignments.filter(a => a.peerId).map(a => a.peerId);
+    },
+
+    scheduleAITurn() {
+        if (this.isSinglePlayer && this.currentTurn) {
+            const playerState = Object.values(this.playerStates).find(s => s.color === this.currentTurn);
+            if (playerState && playerState.peerId && playerState.peerId.startsWith('COMPUTER_')) {
+                // Clear any existing timeout to prevent overlapping turns
+                if (this.aiTurnTimeout) clearTimeout(this.aiTurnTimeout);
+
+                this.aiTurnTimeout = setTimeout(() => {
+                    this.playAITurn();
+                }, 1000); // 1s thinking delay
+            }
+        }
+    },
+
+    playAITurn() {
+        if (this.aiTurnTimeout) {
+            clearTimeout(this.aiTurnTimeout);
+            this.aiTurnTimeout = null;
+        }
+
+        const colors = TEAM_COLORS.slice(0, this.teamCount);
+        const myColor = this.currentTurn;
+        const playerState = Object.values(this.playerStates).find(s => s.color === myColor);
+        if (!playerState || !playerState.peerId || !playerState.peerId.startsWith('COMPUTER_')) return;
+
+        const name = (this.colorNames && this.colorNames[myColor]) || 'Computer';
+        this.log(`🤔 ${name} is thinking...`);
+
+        // Compact snapshot for the worker: team indices and locked cells, r * 10 + c
+        const chips = new Int8Array(100);
+        const locked = new Uint8Array(100);
+        for (let r = 0; r < 10; r++) {
+            for (let c = 0; c < 10; c++) {
+                chips[r * 10 + c] = colors.indexOf(this.chips[r][c]);
+                locked[r * 10 + c] = this.sequenceGrid[r][c] ? 1 : 0;
+            }
+        }
+        const request = {
+            state: { chips, locked, hand: [...playerState.hand], color: colors.indexOf(myColor), teamCount: this.teamCount },
+            seed: (Math.random() * 2 ** 32) >>> 0,
+            budgetMs: this.aiBudgetMs || AI_BUDGET_MS,
+            weights: aiWeights
+        };
+
+        const turn = this.aiTurnToken = (this.aiTurnToken || 0) + 1;
+        const searched = this.perf.start('playAITurn.search');
+        this.searchAIMove(request).then(move => {
+            searched();
+            // Drop results for a turn that is no longer current (restart, leave)
+            if (turn !== this.aiTurnToken || this.currentTurn !== myColor) return;
+            if (!Object.values(this.playerStates).includes(playerState)) return;
+            const done = this.perf.start('playAITurn.apply');
+            this.applyAIMove(playerState, move);
+            done();
+        });
+    },
+
+    searchAIMove(request) {
+        const worker = this.getAIWorker();
+        if (!worker) {
+            return Promise.resolve(chooseMove({ ...request.state, board: this.board.flat() }, request));
+        }
+        return new Promise(resolve => {
+            const id = this.aiRequestId = (this.aiRequestId || 0) + 1;
+            this.aiPending.set(id, { request, resolve });
+            worker.postMessage({ id, ...request });
+        });
+    },
+
+    getAIWorker() {
+        if (this.aiWorker === undefined) {
+            this.aiPending = new Map();
+            try {
+                this.aiWorker = new Worker(new URL('./ai-worker.js', import.meta.url), { type: 'module' });
+                this.aiWorker.postMessage({ type: 'init', board: this.board.flat() });
+                this.aiWorker.onmessage = ({ data }) => {
+                    const pending = this.aiPending.get(data.id);
+                    this.aiPending.delete(data.id);
+                    if (pending) pending.resolve(data.move);
+                };
+                this.aiWorker.onerror = () => {
+                    // Fall back to searching on the main thread from now on
+                    this.aiWorker.terminate();
+                    this.aiWorker = null;
+                    const board = this.board.flat();
+                    this.aiPending.forEach(({ request, resolve }) => resolve(chooseMove({ ...request.state, board }, request)));
+                    this.aiPending.clear();
+                };
+            } catch (e) {
+                this.aiWorker = null;
+            }
+        }
+        return this.aiWorker;
+    },
+
+    applyAIMove(playerState, move) {
+        const colors = TEAM_COLORS.slice(0, this.teamCount);
+        const myColor = playerState.color;
+        const name = (this.colorNames && this.colorNames[myColor]) || 'Computer';
+        const hand = playerState.hand;
+
+        if (!move || move.type === 'exchange') {
+            if (move) {
+                const newCard = this.deck.length > 0 ? this.deck.shift() : null;
+                const deadCard = hand[move.cardIndex];
+                hand.splice(move.cardIndex, 1);
+                if (newCard) hand.push(newCard);
+
+                const rank = deadCard.slice(0, -1);
+                const suit = deadCard.slice(-1);
+                this.log(`♻️ ${name} exchanged dead card: ${rank + SUITS[suit]}`);
+                this.checkAndTriggerAITurn();
+            } else {
+                this.log(`⚠ ${name} has no valid moves!`);
+                const nextIdx = (colors.indexOf(myColor) + 1) % colors.length;
+                this.currentTurn = colors[nextIdx];
+                this.updateTurnUI();
+                this.checkAndTriggerAITurn();
+            }
+            return;
+        }
+
+        const { r, c, cardIndex, type } = move;
+        const cardName = hand[cardIndex];
+
+        this.setChip(r, c, type === 'place' ? myColor : null);
+        if (type === 'place') {
+            this.lastMove = { r, c };
+        } else {
+            this.lastMove = null;
+        }
+
+        const drawnCard = this.deck.length > 0 ? this.deck.shift() : null;
+        hand.splice(cardIndex, 1);
+        if (drawnCard) hand.push(drawnCard);
+
+        const rank = cardName.slice(0, -1);
+        const suit = cardName.slice(-1);
+        const displayName = rank + (SUITS[suit] || suit);
+
+        this.log(`${type === 'place' ? '🤖✅' : '🤖❌'} Computer ${type === 'place' ? 'placed on' : 'removed from'} ${displayName}`);
+
+        const nextIdx = (colors.indexOf(myColor) + 1) % colors.length;
+        this.currentTurn = colors[nextIdx];
+        this.renderBoard();
+        this.updateTurnUI();
+        this.checkSequences();
+
+        if (this.isHost) {
+            this.saveGameState(); // CRITICAL: Save state after AI moves
+        }
+
+        this.checkAndTriggerAITurn();
+    }
+};
@@ -0,0 +1,36 @@
+"""Headless Sequence engine: the rules of game.js, without the DOM."""
+
+from .rules import (
+    BOARD_LAYOUT,
+    CARD_CELLS,
+    CORNERS,
+    DIRECTIONS,
+    FREE,
+    ONE_EYE,
+    TEAM_COLORS,
+    TWO_EYE,
+    WINDOWS,
+    WINDOWS_THROUGH,
+    count_sequences_for_color,
+    create_deck,
+    empty_chips,
+    empty_grid,
+    find_new_sequences_at,
+    get_line_stats,
+    open_cell_counts,
+    sequence_grid_from,
+    team_colors,
+)
+from .game import Game
+from .threats import ThreatMap
+from .ai import (
+    DEFAULT_WEIGHTS,
+    WEIGHTS,
+    Mulberry32,
+    choose_move,
+    evaluate_move,
+    load_weights,
+    play_ai_turn,
+    play_game,
+)
+from .endgame import EndgameSolver
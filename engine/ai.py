@@ -0,0 +1,194 @@
+"""Computer player: a port of ``playAITurn`` / ``evaluateMove`` in ai.js.
+
+Greedy one-ply search: every legal (card, cell) pair is scored with
+``evaluate_move`` plus a little random jitter and the best one is played.
+
+The terms of the score are weighted by ``WEIGHTS``: the defaults below,
+overridden by ``ai-weights.json`` at the repo root when it exists
+(``python -m engine.tune`` writes it; ai.js loads the same file).
+"""
+import json
+import math
+import warnings
+from pathlib import Path
+
+from .game import Game
+from .rules import get_line_stats
+
+DEFAULT_WEIGHTS = {
+    "win": 10000,        # placement completes a sequence
+    "block": 8000,       # placement fills an opponent's last gap
+    "blockFour": 800,    # per opponent four this placement closes
+    "blockThree": 50,
+    "makeFour": 100,     # per open four/three/two of our own it adds
+    "makeThree": 10,
+    "makeTwo": 1,
+    "breakFour": 800,    # per opponent four/three/two a removal breaks
+    "breakThree": 150,
+    "breakTwo": 20,
+    "center": 0.1,       # per unit of distance from the board center
+}
+WEIGHTS_FILE = Path(__file__).resolve().parent.parent / "ai-weights.json"
+
+
+def load_weights(path=WEIGHTS_FILE):
+    """``DEFAULT_WEIGHTS`` with any known, numeric keys from a weights file applied.
+
+    A missing file gives the defaults; an unreadable one or a bad value
+    warns and falls back, so a broken file never stops ``import engine``.
+    """
+    weights = dict(DEFAULT_WEIGHTS)
+    try:
+        with open(path) as f:
+            tuned = json.load(f).get("weights", {})
+        if not isinstance(tuned, dict):
+            raise ValueError("'weights' is not an object")
+    except FileNotFoundError:
+        return weights
+    except (OSError, ValueError, AttributeError) as e:
+        warnings.warn(f"ignoring weights file {path}: {e}")
+        return weights
+    for key, value in tuned.items():
+        if key not in weights:
+            continue
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            warnings.warn(f"ignoring non-numeric weight {key}={value!r} in {path}")
+            continue
+        weights[key] = value
+    return weights
+
+
+WEIGHTS = load_weights()
+
+
+class Mulberry32:
+    """The seeded jitter generator ai-core.js uses, bit for bit."""
+
+    def __init__(self, seed):
+        self.state = seed & 0xFFFFFFFF
+
+    def random(self):
+        self.state = (self.state + 0x6D2B79F5) & 0xFFFFFFFF
+        t = self.state
+        t = ((t ^ (t >> 15)) * (t | 1)) & 0xFFFFFFFF
+        t ^= (t + ((t ^ (t >> 7)) * (t | 61))) & 0xFFFFFFFF
+        return ((t ^ (t >> 14)) & 0xFFFFFFFF) / 4294967296
+
+
+def _sum_stats(chips, colors):
+    total = {"seqs": 0, "max4": 0, "max3": 0, "max2": 0}
+    for color in colors:
+        for key, value in get_line_stats(chips, color).items():
+            total[key] += value
+    return total
+
+
+def evaluate_move(game, r, c, move_type, color, weights=None):
+    w = weights or WEIGHTS
+    score = 0
+    # A placement completes five exactly when (r, c) is the last gap of an
+    # open window, and blocks one when it is the last gap of an opponent's:
+    # both are lookups in the threat map, no board scan needed
+    if move_type == "place" and game.threats.wins_at(color, r, c):
+        score += w["win"]
+    elif move_type == "place" and game.threats.blocks_at(color, r, c):
+        score += w["block"]
+    else:
+        opponents = [clr for clr in game.colors if clr != color]
+        test_chips = [list(row) for row in game.chips]
+
+        counts_before = get_line_stats(test_chips, color)
+        opps_before = _sum_stats(test_chips, opponents)
+
+        test_chips[r][c] = color if move_type == "place" else None
+
+        counts_after = get_line_stats(test_chips, color)
+        opps_after = _sum_stats(test_chips, opponents)
+
+        if move_type == "place":
+            score += (opps_before["max4"] - opps_after["max4"]) * w["blockFour"]
+            score += (opps_before["max3"] - opps_after["max3"]) * w["blockThree"]
+
+            score += (counts_after["max4"] - counts_before["max4"]) * w["makeFour"]
+            score += (counts_after["max3"] - counts_before["max3"]) * w["makeThree"]
+            score += (counts_after["max2"] - counts_before["max2"]) * w["makeTwo"]
+        elif move_type == "remove":
+            score += (opps_before["max4"] - opps_after["max4"]) * w["breakFour"]
+            score += (opps_before["max3"] - opps_after["max3"]) * w["breakThree"]
+            score += (opps_before["max2"] - opps_after["max2"]) * w["breakTwo"]
+
+    center_dist = abs(r - 4.5) + abs(c - 4.5)
+    score -= center_dist * w["center"]
+    return score
+
+
+def choose_move(game, player=None, rng=None, weights=None):
+    """Pick the AI's action for ``player`` without applying it.
+
+    Returns ``("place" | "remove", card_index, r, c)``, ``("exchange",
+    card_index)`` for a dead card, or ``None`` when there is nothing to do.
+    """
+    player = player or game.current_turn
+    color = game.player_colors[player]
+    rng = rng or game.rng
+    best_move = None
+    best_score = float("-inf")
+    dead_card_index = -1
+
+    for i, card in enumerate(game.hands[player]):
+        targets = game.targets(card, color)
+        if not targets and game.is_dead(card):
+            dead_card_index = i
+        for r, c, move_type in targets:
+            score = evaluate_move(game, r, c, move_type, color, weights) + rng.random() * 0.1
+            if score > best_score:
+                best_score = score
+                best_move = (move_type, i, r, c)
+
+    if best_move:
+        return best_move
+    if dead_card_index != -1:
+        return ("exchange", dead_card_index)
+    return None
+
+
+def play_ai_turn(game, endgame=None, weights=None):
+    """Play the current color's turn. Returns the list of actions taken.
+
+    With an ``EndgameSolver``, late positions are searched to the end and
+    the greedy choice is only the fallback.
+    """
+    player = game.current_turn
+    actions = []
+    while True:
+        action = None
+        if endgame is not None and endgame.applies(game):
+            action = endgame.choose(game, player)
+        if action is None:
+            action = choose_move(game, player, weights=weights)
+        actions.append(action)
+        if action is None:
+            game.pass_turn()
+        elif action[0] == "exchange":
+            game.exchange_dead(action[1], player)
+            continue
+        else:
+            move_type, i, r, c = action
+            game.apply_move(i, r, c, move_type, player)
+        return actions
+
+
+def play_game(team_count=2, seed=None, max_turns=500, endgame=None, weights=None):
+    """Computer vs. computer until someone wins or nobody can move.
+
+    ``weights`` is one weight dict for everyone, or a dict of them by color.
+    """
+    game = Game(team_count, seed=seed)
+    by_color = weights if weights and set(weights) <= set(game.colors) else dict.fromkeys(game.colors, weights)
+    passes = 0
+    while not game.over and game.turns < max_turns:
+        actions = play_ai_turn(game, endgame, by_color.get(game.current_turn))
+        passes = passes + 1 if actions[-1] is None else 0
+        if passes >= len(game.colors):
+            break
+    return game
@@ -0,0 +1,203 @@
+"""Benchmark suite for the rules engine and AI hot paths.
+
+Runs each hot path against fixed seeded positions (empty, mid-game,
+near-win, 3-team) and reports ops/sec plus latency percentiles as JSON.
+The endgame solver also reports its search throughput in nodes/sec.
+
+    python -m engine.bench --out bench.json             # run and save
+    python -m engine.bench --compare bench.json         # fail on regressions
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from .ai import choose_move, evaluate_move, play_ai_turn, play_game
+from .bitboard import BitBoard
+from .endgame import EndgameSolver
+from .game import Game
+from .rules import count_sequences_for_color, get_line_stats
+
+SEED = 20240601
+
+
+# ── Positions ─────────────────────────────────────────────────
+def _advance(game, turns):
+    for _ in range(turns):
+        if game.over:
+            break
+        play_ai_turn(game)
+    return game
+
+
+def _near_win(seed):
+    # First position where the side to move is one sequence from winning
+    # and already has an open four on the board.
+    for attempt in range(50):
+        game = Game(2, seed=seed + attempt)
+        while not game.over and game.turns < 200:
+            color = game.current_turn
+            if (game.sequences[color] == game.win_target - 1
+                    and get_line_stats(game.chips, color)["max4"] > 0):
+                return game
+            play_ai_turn(game)
+    raise RuntimeError("no near-win position found")
+
+
+def _endgame(seed):
+    # A mid-game board with the deck cut down to a few cards, so deck
+    # plus hands is within the solver's reach
+    game = _advance(Game(2, seed=seed), 30)
+    del game.deck[6:]
+    return game
+
+
+def build_positions(seed=SEED):
+    return {
+        "empty": Game(2, seed=seed),
+        "mid-game": _advance(Game(2, seed=seed), 24),
+        "near-win": _near_win(seed),
+        "3-team": _advance(Game(3, seed=seed), 30),
+    }
+
+
+# ── Measurement ───────────────────────────────────────────────
+def measure(fn, min_time, min_runs):
+    samples = []
+    clock = time.perf_counter_ns
+    deadline = time.perf_counter() + min_time
+    while len(samples) < min_runs or time.perf_counter() < deadline:
+        start = clock()
+        fn()
+        samples.append(clock() - start)
+    samples.sort()
+    total = sum(samples)
+
+    def pct(p):
+        return samples[min(len(samples) - 1, int(p / 100 * len(samples)))] / 1e3
+
+    return {
+        "runs": len(samples),
+        "ops_per_sec": len(samples) / (total / 1e9),
+        "mean_us": total / len(samples) / 1e3,
+        "p50_us": pct(50),
+        "p90_us": pct(90),
+        "p99_us": pct(99),
+    }
+
+
+def position_cases(label, game):
+    bits = BitBoard.from_chips(game.chips, game.sequence_grid, game.team_count)
+    colors = game.colors
+    color = game.current_turn or colors[0]
+    locked = game.locked_sequences
+    _, r, c, move_type = game.legal_moves(color)[0]
+
+    return [
+        (f"{label}/countSequencesForColor",
+         lambda: [count_sequences_for_color(game.chips, clr, locked) for clr in colors]),
+        (f"{label}/getLineStats", lambda: [get_line_stats(game.chips, clr) for clr in colors]),
+        (f"{label}/getLineStats[bitboard]", lambda: [bits.line_stats(clr) for clr in colors]),
+        (f"{label}/evaluateMove", lambda: evaluate_move(game, r, c, move_type, color)),
+        (f"{label}/playAITurn", lambda: choose_move(game, color, random.Random(SEED))),
+    ]
+
+
+def cases(positions, games, seed=SEED):
+    """Every ``(name, fn)`` benchmark for the given positions.
+
+    A case may carry a third element, a function returning extra fields
+    for its result once it has been measured.
+    """
+    found = []
+    for label, game in positions.items():
+        found.extend(position_cases(label, game))
+    found.append(("game/2-team", lambda: [play_game(2, seed=seed + i) for i in range(games)]))
+    found.append(("game/3-team", lambda: [play_game(3, seed=seed + i) for i in range(games)]))
+
+    endgame = _endgame(seed)
+    solver = EndgameSolver(max_cards=len(endgame.deck) + 14, time_limit=0.25)
+    found.append(("endgame/solve", lambda: solver.choose(endgame),
+                  lambda: {"nodes_per_sec": solver.stats()["nodesPerSec"]}))
+    return found
+
+
+def run(args):
+    positions = build_positions(args.seed)
+    results = {}
+    for name, fn, *extra in cases(positions, args.games, args.seed):
+        if args.filter and args.filter not in name:
+            continue
+        results[name] = measure(fn, args.min_time, args.min_runs)
+        for more in extra:
+            results[name].update(more())
+        line = (f"{name:40s} {results[name]['ops_per_sec']:12.1f} ops/s  "
+                f"p50 {results[name]['p50_us']:10.1f} us  p99 {results[name]['p99_us']:10.1f} us")
+        if "nodes_per_sec" in results[name]:
+            line += f"  {results[name]['nodes_per_sec']:10.0f} nodes/s"
+        print(line, file=sys.stderr)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "seed": args.seed,
+            "timestamp": int(time.time()),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Print a ratio table; return the names that got slower than allowed."""
+    regressions = []
+    print(f"{'benchmark':40s} {'baseline':>12s} {'current':>12s} {'ratio':>7s}")
+    for name, cur in current["results"].items():
+        base = baseline["results"].get(name)
+        if not base:
+            continue
+        # A time-capped search runs at a fixed rate; its throughput is nodes/sec
+        key = "nodes_per_sec" if "nodes_per_sec" in cur and "nodes_per_sec" in base else "ops_per_sec"
+        ratio = cur[key] / base[key]
+        flag = ""
+        if ratio < 1 - threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:40s} {base[key]:12.1f} {cur[key]:12.1f} {ratio:7.2f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the rules engine and AI")
+    parser.add_argument("--out", help="write JSON results to this file (default: stdout)")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against a saved run")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="allowed ops/sec drop before a case counts as a regression")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--games", type=int, default=2, help="games per simulated-game op")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds per benchmark")
+    parser.add_argument("--min-runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    current = run(args)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(current, f, indent=2)
+    elif not args.compare:
+        json.dump(current, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
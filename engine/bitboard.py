@@ -0,0 +1,237 @@
+"""Bitboard representation of the 10x10 board.
+
+Each color, the FREE corners and the locked (``sequenceGrid``) cells are
+100-bit integers with bit ``r * 10 + c`` set for an occupied cell. Every
+5-cell window is precomputed as a mask, so the rule checks in rules.py
+become ``popcount(board & mask)`` operations.
+
+    python -m engine.bitboard        # microbenchmark vs. the array version
+"""
+import argparse
+import random
+import sys
+import timeit
+
+from .rules import (
+    BOARD_LAYOUT,
+    CORNERS,
+    FREE,
+    WINDOWS,
+    WINDOWS_THROUGH,
+    count_sequences_for_color,
+    empty_chips,
+    get_line_stats,
+    team_colors,
+)
+
+
+def bit(r, c):
+    return 1 << (r * 10 + c)
+
+
+def mask_of(cells):
+    m = 0
+    for r, c in cells:
+        m |= bit(r, c)
+    return m
+
+
+def cells_of(mask):
+    cells = []
+    while mask:
+        low = mask & -mask
+        i = low.bit_length() - 1
+        cells.append((i // 10, i % 10))
+        mask ^= low
+    return cells
+
+
+FREE_MASK = mask_of(CORNERS)
+WINDOW_MASKS = tuple(mask_of(cells) for cells in WINDOWS)
+WINDOW_MASKS_THROUGH = tuple(
+    tuple(WINDOW_MASKS[i] for i in WINDOWS_THROUGH[(r, c)])
+    for r in range(10) for c in range(10)
+)
+
+# Board cells grouped by the card printed on them.
+CARD_MASKS = {}
+for _r in range(10):
+    for _c in range(10):
+        if BOARD_LAYOUT[_r][_c] != FREE:
+            CARD_MASKS[BOARD_LAYOUT[_r][_c]] = CARD_MASKS.get(BOARD_LAYOUT[_r][_c], 0) | bit(_r, _c)
+del _r, _c
+
+
+class BitBoard:
+    """Chips per color plus the locked cells, one int each."""
+
+    __slots__ = ("colors", "locked")
+
+    def __init__(self, team_count=2):
+        self.colors = {color: 0 for color in team_colors(team_count)}
+        self.locked = 0
+
+    @classmethod
+    def from_chips(cls, chips, sequence_grid=None, team_count=2):
+        board = cls(team_count)
+        for r in range(10):
+            for c in range(10):
+                if chips[r][c] is not None:
+                    board.colors[chips[r][c]] |= bit(r, c)
+                if sequence_grid is not None and sequence_grid[r][c]:
+                    board.locked |= bit(r, c)
+        return board
+
+    def to_chips(self):
+        chips = empty_chips()
+        for color, mask in self.colors.items():
+            for r, c in cells_of(mask):
+                chips[r][c] = color
+        return chips
+
+    def copy(self):
+        other = BitBoard.__new__(BitBoard)
+        other.colors = dict(self.colors)
+        other.locked = self.locked
+        return other
+
+    @property
+    def occupied(self):
+        m = 0
+        for mask in self.colors.values():
+            m |= mask
+        return m
+
+    def chip_at(self, r, c):
+        b = bit(r, c)
+        for color, mask in self.colors.items():
+            if mask & b:
+                return color
+        return None
+
+    def place(self, r, c, color):
+        self.colors[color] |= bit(r, c)
+
+    def remove(self, r, c):
+        b = ~bit(r, c)
+        for color in self.colors:
+            self.colors[color] &= b
+
+    def lock(self, cells):
+        self.locked |= mask_of(cells)
+
+    def open_cells(self, card):
+        """Empty cells showing ``card`` (zero means the card is dead)."""
+        return CARD_MASKS.get(card, 0) & ~self.occupied
+
+    # ── Rule evaluation ──
+    def is_blocked(self, window_mask, color):
+        """True when another color holds a non-corner cell of the window."""
+        return bool(window_mask & (self.occupied & ~self.colors[color]))
+
+    def find_new_sequences_at(self, r, c):
+        """Bitboard twin of ``rules.find_new_sequences_at``."""
+        b = bit(r, c)
+        color = next((clr for clr, mask in self.colors.items() if mask & b), None)
+        if color is None:
+            return []
+        own = self.colors[color] | FREE_MASK
+        claimed = self.locked
+        found = []
+        for m in WINDOW_MASKS_THROUGH[r * 10 + c]:
+            if m & ~own:
+                continue
+            if (m & claimed & ~FREE_MASK).bit_count() <= 1:
+                found.append(m)
+                claimed |= m
+        return found
+
+    def scan_sequences(self, color):
+        """Bitboard twin of ``rules.count_sequences_for_color``.
+
+        Returns the masks of the new (not yet locked) sequences in scan order.
+        """
+        own = self.colors[color] | FREE_MASK
+        claimed = self.locked
+        found = []
+        for m in WINDOW_MASKS:
+            if m & ~own:
+                continue
+            if (m & claimed & ~FREE_MASK).bit_count() <= 1:
+                found.append(m)
+                claimed |= m
+        return found
+
+    def line_stats(self, color):
+        """Bitboard twin of ``rules.get_line_stats``."""
+        own = self.colors[color] | FREE_MASK
+        others = self.occupied & ~self.colors[color]
+        counts = [0] * 6
+        for m in WINDOW_MASKS:
+            if not m & others:
+                counts[(m & own).bit_count()] += 1
+        return {"seqs": counts[5], "max4": counts[4], "max3": counts[3], "max2": counts[2]}
+
+
+# ── Microbenchmark ────────────────────────────────────────────
+def random_position(rng, team_count, fill):
+    colors = team_colors(team_count)
+    chips = empty_chips()
+    cells = [(r, c) for r in range(10) for c in range(10) if BOARD_LAYOUT[r][c] != FREE]
+    for r, c in rng.sample(cells, fill):
+        chips[r][c] = rng.choice(colors)
+    return chips
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bitboard vs. array rule evaluation")
+    parser.add_argument("--positions", type=int, default=50)
+    parser.add_argument("--number", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    positions = [random_position(rng, 2 + i % 2, rng.randint(10, 70)) for i in range(args.positions)]
+    boards = [BitBoard.from_chips(p, team_count=2 + i % 2) for i, p in enumerate(positions)]
+
+    for chips, board in zip(positions, boards):
+        for color in board.colors:
+            if board.line_stats(color) != get_line_stats(chips, color):
+                print("line_stats mismatch", file=sys.stderr)
+                return 1
+            if [cells_of(m) for m in board.scan_sequences(color)] != \
+                    [list(cells) for cells in count_sequences_for_color(chips, color)]:
+                print("sequence scan mismatch", file=sys.stderr)
+                return 1
+
+    def array_stats():
+        for chips, board in zip(positions, boards):
+            for color in board.colors:
+                get_line_stats(chips, color)
+
+    def bit_stats():
+        for board in boards:
+            for color in board.colors:
+                board.line_stats(color)
+
+    def array_scan():
+        for chips, board in zip(positions, boards):
+            for color in board.colors:
+                count_sequences_for_color(chips, color)
+
+    def bit_scan():
+        for board in boards:
+            for color in board.colors:
+                board.scan_sequences(color)
+
+    for label, slow, fast in (("line stats", array_stats, bit_stats),
+                              ("sequence scan", array_scan, bit_scan)):
+        t_array = min(timeit.repeat(slow, number=args.number, repeat=3))
+        t_bits = min(timeit.repeat(fast, number=args.number, repeat=3))
+        print(f"{label:14s} array {t_array * 1e3:8.1f} ms   bitboard {t_bits * 1e3:8.1f} ms   "
+              f"x{t_array / t_bits:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Cross-implementation check: ai-core.js against the Python AI.
+
+Plays seeded computer-vs-computer games with the Python engine and, at
+every turn, asks both ``choose_move`` and the browser's ``chooseMove``
+(run under Node, unlimited time budget) for a move with the same jitter
+seed. The two must agree on every position.
+
+    python -m engine.crosscheck --games 20 --seed 1
+"""
+import argparse
+import json
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+from .ai import WEIGHTS, Mulberry32, choose_move, play_ai_turn
+from .game import Game
+from .rules import BOARD_LAYOUT
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Reads one snapshot per line and prints chooseMove's answer for each.
+# ai-core.js is loaded from a data: URL because the repo has no
+# package.json marking .js files as ES modules.
+NODE_HARNESS = """
+const fs = require('fs');
+const readline = require('readline');
+const src = fs.readFileSync(process.argv[1], 'utf8');
+import('data:text/javascript;base64,' + Buffer.from(src).toString('base64')).then(async core => {
+    const board = JSON.parse(process.argv[2]);
+    for await (const line of readline.createInterface({ input: process.stdin })) {
+        const { state, seed, weights } = JSON.parse(line);
+        state.board = board;
+        state.chips = Int8Array.from(state.chips);
+        state.locked = Uint8Array.from(state.locked);
+        console.log(JSON.stringify(core.chooseMove(state, { seed, weights })));
+    }
+});
+"""
+
+
+def snapshot(game, player):
+    colors = game.colors
+    return {
+        "chips": [colors.index(game.chips[r][c]) if game.chips[r][c] else -1
+                  for r in range(10) for c in range(10)],
+        "locked": [1 if game.sequence_grid[r][c] else 0 for r in range(10) for c in range(10)],
+        "hand": list(game.hands[player]),
+        "color": colors.index(game.player_colors[player]),
+        "teamCount": game.team_count,
+    }
+
+
+def as_tuple(move):
+    if move is None:
+        return None
+    if move["type"] == "exchange":
+        return ("exchange", move["cardIndex"])
+    return (move["type"], move["cardIndex"], move["r"], move["c"])
+
+
+def positions(games, seed, max_turns):
+    """Python's answer for every position of ``games`` seeded games."""
+    rng = random.Random(seed)
+    for g in range(games):
+        game = Game(2 + g % 2, seed=rng.random())
+        passes = 0
+        while not game.over and game.turns < max_turns:
+            player = game.current_turn
+            jitter_seed = rng.getrandbits(32)
+            expected = choose_move(game, player, Mulberry32(jitter_seed))
+            yield g, {"state": snapshot(game, player), "seed": jitter_seed, "weights": WEIGHTS}, expected
+            actions = play_ai_turn(game)
+            passes = passes + 1 if actions[-1] is None else 0
+            if passes >= len(game.colors):
+                break
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-turns", type=int, default=200)
+    parser.add_argument("--node", default="node")
+    args = parser.parse_args(argv)
+
+    cases = list(positions(args.games, args.seed, args.max_turns))
+    board = json.dumps([card for row in BOARD_LAYOUT for card in row])
+    try:
+        proc = subprocess.run(
+            [args.node, "-e", NODE_HARNESS, str(ROOT / "ai-core.js"), board],
+            input="".join(json.dumps(request) + "\n" for _, request, _ in cases),
+            capture_output=True, text=True, check=True,
+        )
+    except FileNotFoundError:
+        print(f"{args.node} not found; the check needs Node.js", file=sys.stderr)
+        return 2
+    except subprocess.CalledProcessError as e:
+        print(e.stderr, file=sys.stderr)
+        return 1
+
+    answers = [as_tuple(json.loads(line)) for line in proc.stdout.splitlines()]
+    if len(answers) != len(cases):
+        print(f"node answered {len(answers)} of {len(cases)} positions", file=sys.stderr)
+        return 1
+    for (g, request, expected), actual in zip(cases, answers):
+        if actual != expected:
+            print(f"game {g}: python chose {expected}, ai-core.js chose {actual} "
+                  f"(seed {request['seed']}, hand {request['state']['hand']})", file=sys.stderr)
+            return 1
+    print(f"ok: {args.games} games, {len(cases)} positions, identical moves")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""Exact endgame search once the deck runs low.
+
+The greedy ``choose_move`` looks one ply ahead and regularly throws away
+forced wins and blocks late in a game. Once the deck plus every card
+still in hand is down to ``max_cards``, ``EndgameSolver`` searches the
+rest of the game instead. It runs alpha-beta over every legal move and
+draws from the engine's own deck, so it sees every hand and the draw
+order. That suits self-play and analysis, not a fair browser opponent.
+
+Positions are scored for the color to move at the root. A win is worth
+``WIN - ply``, so sooner is better, and a loss ``-(WIN - ply)``. A game
+where nobody can move any more is 0. With three teams, the other two are
+assumed to play against the root color (paranoid search). Moves are
+ordered from the threat map: wins, then blocks, then cells that build a
+four. Before those comes the transposition table's best move, so most
+cutoffs come early. Positions are memoized in that table by chips,
+locked cells, hands, the remaining deck in draw order and turn.
+
+Search deepens one ply at a time, and ``time_limit`` is a hard cap per
+move. A move is returned when the last finished iteration either proved
+a win or loss or searched the whole tree. Otherwise ``choose`` returns
+``None`` and the caller falls back to the greedy AI.
+
+    python -m engine.endgame --games 10 --max-cards 45 --time-limit 0.5
+"""
+import argparse
+import sys
+import time
+from itertools import chain
+
+WIN = 1000
+UNBOUNDED = 1 << 20    # depth stored for a subtree searched to the end
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class EndgameSolver:
+    def __init__(self, max_cards=24, time_limit=1.0, max_depth=60):
+        self.max_cards = max_cards
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.table = {}
+        self.nodes = 0
+        self.elapsed = 0.0
+        self.searches = 0
+        self.proved = 0
+        self.timeouts = 0
+        self.last = None
+
+    def stats(self):
+        return {"searches": self.searches, "proved": self.proved, "timeouts": self.timeouts,
+                "nodes": self.nodes, "nodesPerSec": self.nodes / self.elapsed if self.elapsed else 0.0}
+
+    def applies(self, game):
+        # One player per color, so the color to move names the hand to search
+        return (not game.over and len(game.players) == len(game.colors)
+                and len(game.deck) + sum(len(hand) for hand in game.hands.values()) <= self.max_cards)
+
+    # ── Search ──
+    def choose(self, game, player=None):
+        """Like ``choose_move``, or ``None`` if nothing was proved in time."""
+        player = player or game.current_turn
+        self.root = game.player_colors[player]
+        self.table.clear()
+        self.deadline = time.perf_counter() + self.time_limit
+        start = time.perf_counter()
+        nodes = self.nodes
+        result = None
+        timed_out = False
+        try:
+            for depth in range(1, self.max_depth + 1):
+                self.cutoffs = 0
+                value, action = self.search_root(game, depth)
+                exact = not self.cutoffs
+                result = (value, action, depth, exact)
+                if exact or abs(value) > WIN // 2:
+                    break
+        except SearchTimeout:
+            timed_out = True
+        self.searches += 1
+        self.timeouts += timed_out
+        self.elapsed += time.perf_counter() - start
+        self.last = {"nodes": self.nodes - nodes, "ms": (time.perf_counter() - start) * 1e3,
+                     "depth": result[2] if result else 0, "value": result[0] if result else None,
+                     "exact": bool(result and result[3]), "timedOut": timed_out}
+        if result is None:
+            return None
+        value, action, _, exact = result
+        if not exact and abs(value) <= WIN // 2:
+            return None
+        self.proved += 1
+        return action
+
+    def search_root(self, game, depth):
+        best_value, best_action = -WIN - 1, None
+        alpha, beta = -WIN - 1, WIN + 1
+        for action, _, child, passes in self.children(game, None, 0):
+            value = self.search(child, depth - cost(action), alpha, beta, 1, passes)
+            if value > best_value:
+                best_value, best_action = value, action
+            alpha = max(alpha, value)
+        return best_value, best_action
+
+    def search(self, game, depth, alpha, beta, ply, passes):
+        self.nodes += 1
+        if time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        if game.winner is not None:
+            return WIN - ply if game.winner == self.root else ply - WIN
+        if game.current_turn is None or passes >= len(game.colors):
+            return 0
+        if depth <= 0:
+            self.cutoffs += 1
+            return 0
+
+        key = self.key(game, passes)
+        entry = self.table.get(key)
+        best_first = None
+        if entry:
+            stored_depth, stored, flag, best_first = entry
+            if stored_depth >= depth:
+                value = from_table(stored, ply)
+                if flag == EXACT or (flag == LOWER and value >= beta) or (flag == UPPER and value <= alpha):
+                    self.cutoffs += stored_depth != UNBOUNDED
+                    return value
+
+        maximizing = game.current_turn == self.root
+        alpha0, beta0 = alpha, beta
+        cutoffs = self.cutoffs
+        best_value = -WIN - 1 if maximizing else WIN + 1
+        best_action = None
+        for action, move, child, child_passes in self.children(game, best_first, passes):
+            value = self.search(child, depth - cost(action), alpha, beta, ply + 1, child_passes)
+            if maximizing and value > best_value or not maximizing and value < best_value:
+                best_value, best_action = value, move
+            if maximizing:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                break
+
+        if best_value <= alpha0:
+            flag = UPPER
+        elif best_value >= beta0:
+            flag = LOWER
+        else:
+            flag = EXACT
+        searched = UNBOUNDED if self.cutoffs == cutoffs else depth
+        self.table[key] = (searched, to_table(best_value, ply), flag, best_action)
+        return best_value
+
+    def key(self, game, passes):
+        return (tuple(chain.from_iterable(game.chips)),
+                tuple(chain.from_iterable(game.sequence_grid)),
+                tuple(tuple(sorted(game.hands[key])) for key, _ in game.players),
+                # The deck, not its size: equal chips and hands can still
+                # leave different cards to draw
+                tuple(game.deck), game.current_turn, passes)
+
+    # ── Move generation ──
+    def children(self, game, best_first, passes):
+        """``(action, (card, r, c), game after it, passes)`` in search order.
+
+        ``best_first`` is a ``(card, r, c)`` from the table; hands are
+        memoized sorted, so it names the card rather than its index.
+        """
+        color = game.current_turn
+        player = next(key for key, clr in game.players if clr == color)
+        hand = game.hands[player]
+        scored = []
+        seen = set()
+        for i, card in enumerate(hand):
+            for r, c, move_type in game.targets(card, color):
+                # A duplicate card in hand leads to the same position
+                if (card, r, c) in seen:
+                    continue
+                seen.add((card, r, c))
+                action = (move_type, i, r, c)
+                rank = -1 if (card, r, c) == best_first else self.rank(game, color, r, c, move_type)
+                scored.append((rank, abs(r - 4.5) + abs(c - 4.5), action))
+        scored.sort(key=lambda item: item[:2])
+
+        for _, _, action in scored:
+            move_type, i, r, c = action
+            child = game.copy()
+            child.apply_move(i, r, c, move_type, player)
+            yield action, (hand[i], r, c), child, 0
+        if scored:
+            return
+
+        dead = next((i for i, card in enumerate(hand) if game.is_dead(card)), -1)
+        child = game.copy()
+        if dead != -1:
+            child.exchange_dead(dead, player)
+            yield ("exchange", dead), None, child, passes
+        else:
+            child.pass_turn()
+            yield None, None, child, passes + 1
+
+    @staticmethod
+    def rank(game, color, r, c, move_type):
+        threats = game.threats
+        if move_type == "place":
+            if threats.wins_at(color, r, c):
+                return 0
+            if threats.blocks_at(color, r, c):
+                return 1
+            if (r, c) in threats.building[color]:
+                return 2
+            if any((r, c) in threats.building[other] for other in game.colors if other != color):
+                return 3
+            return 5
+        # Removals after every placement that wins, blocks or builds
+        return 4
+
+
+def cost(action):
+    # Swapping a dead card keeps the turn, so it costs no depth
+    return 0 if action and action[0] == "exchange" else 1
+
+
+def to_table(value, ply):
+    # Wins and losses are stored as distance from this node, not the root
+    if value > WIN // 2:
+        return value + ply
+    if value < -WIN // 2:
+        return value - ply
+    return value
+
+
+def from_table(value, ply):
+    if value > WIN // 2:
+        return value - ply
+    if value < -WIN // 2:
+        return value + ply
+    return value
+
+
+def main(argv=None):
+    from .ai import play_ai_turn
+    from .game import Game
+
+    parser = argparse.ArgumentParser(description="Solve late-game positions from greedy self-play")
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--teams", type=int, choices=(2, 3), default=2)
+    parser.add_argument("--max-cards", type=int, default=45, help="deck plus hands at which search starts")
+    parser.add_argument("--time-limit", type=float, default=0.5, help="seconds per move")
+    args = parser.parse_args(argv)
+
+    solver = EndgameSolver(args.max_cards, args.time_limit)
+    reached = 0
+    for i in range(args.games):
+        game = Game(args.teams, seed=args.seed + i)
+        while not game.over and game.turns < 500:
+            if solver.applies(game):
+                reached += 1
+                action = solver.choose(game)
+                last = solver.last
+                if last["exact"]:
+                    outcome = "solved"
+                elif last["value"] is not None and abs(last["value"]) > WIN // 2:
+                    outcome = "forced " + ("win" if last["value"] > 0 else "loss")
+                else:
+                    outcome = "timed out"
+                print(f"game {i} turn {game.turns}: {len(game.deck)} in deck, {outcome} at depth "
+                      f"{last['depth']}, {last['nodes']} nodes in {last['ms']:.0f} ms -> {action}")
+                break
+            play_ai_turn(game)
+    stats = solver.stats()
+    print(f"{reached}/{args.games} games reached {args.max_cards} cards; {stats['proved']} proved, "
+          f"{stats['timeouts']} timed out, {stats['nodesPerSec']:.0f} nodes/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
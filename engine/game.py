@@ -0,0 +1,244 @@
+"""Headless game state: deck, hands, turns and move application.
+
+Follows ``startGame``, ``handleCellClick`` and ``checkSequences`` in
+game.js, minus the DOM and networking. Turns rotate by team color. Hands
+are keyed by player; by default there is one player per team whose key is
+the color itself, as in single-player games against the computer.
+"""
+import random
+
+from .rules import (
+    BOARD_LAYOUT,
+    CARD_CELLS,
+    FREE,
+    ONE_EYE,
+    TWO_EYE,
+    create_deck,
+    empty_chips,
+    empty_grid,
+    find_new_sequences_at,
+    open_cell_counts,
+    team_colors,
+)
+from .threats import ThreatMap
+
+
+def cards_per_player(total_players):
+    return 7 if total_players <= 2 else 6 if total_players <= 4 else 5
+
+
+def win_target_for(total_players, team_count):
+    return 1 if total_players > 2 and team_count == 3 else 2
+
+
+class Game:
+    def __init__(self, team_count=2, seed=None, players=None):
+        self.rng = random.Random(seed)
+        self.team_count = team_count
+        self.colors = team_colors(team_count)
+        # (player key, color) in deal order
+        self.players = list(players or [(color, color) for color in self.colors])
+        self.player_colors = dict(self.players)
+        self.win_target = win_target_for(len(self.players), team_count)
+
+        self.deck = create_deck()
+        self.shuffle(self.deck)
+        per_player = cards_per_player(len(self.players))
+        self.hands = {}
+        for key, _ in self.players:
+            self.hands[key] = self.deck[:per_player]
+            del self.deck[:per_player]
+
+        self.chips = empty_chips()
+        self.open_cells = open_cell_counts(self.chips)   # card -> empty cells showing it
+        self.threats = ThreatMap(self.chips, self.colors)
+        self.sequence_grid = empty_grid()
+        self.locked_sequences = []   # (color, cells) in lock order
+        self.sequences = {color: 0 for color in self.colors}
+        self.current_turn = self.colors[0]
+        self.last_move = None
+        self.changed_cells = set()   # r * 10 + c of cells the last move redrew
+        self.winner = None
+        self.turns = 0
+
+    def shuffle(self, arr):
+        # Same Fisher-Yates walk as SequenceGame.shuffle
+        for i in range(len(arr) - 1, 0, -1):
+            j = int(self.rng.random() * (i + 1))
+            arr[i], arr[j] = arr[j], arr[i]
+
+    def copy(self):
+        other = Game.__new__(Game)
+        other.rng = random.Random()
+        other.rng.setstate(self.rng.getstate())
+        other.team_count = self.team_count
+        other.colors = self.colors
+        other.players = self.players
+        other.player_colors = self.player_colors
+        other.win_target = self.win_target
+        other.deck = list(self.deck)
+        other.hands = {key: list(hand) for key, hand in self.hands.items()}
+        other.chips = [list(row) for row in self.chips]
+        other.open_cells = dict(self.open_cells)
+        other.threats = self.threats.copy()
+        other.sequence_grid = [list(row) for row in self.sequence_grid]
+        other.locked_sequences = list(self.locked_sequences)
+        other.sequences = dict(self.sequences)
+        other.current_turn = self.current_turn
+        other.last_move = self.last_move
+        other.changed_cells = set(self.changed_cells)
+        other.winner = self.winner
+        other.turns = self.turns
+        return other
+
+    @property
+    def over(self):
+        return self.winner is not None or self.current_turn is None
+
+    def next_color(self, color):
+        return self.colors[(self.colors.index(color) + 1) % len(self.colors)]
+
+    def draw(self):
+        return self.deck.pop(0) if self.deck else None
+
+    # ── Move generation ──
+    def is_dead(self, card):
+        if card in ONE_EYE or card in TWO_EYE:
+            return False
+        return not self.open_cells.get(card)
+
+    def targets(self, card, color):
+        """Cells ``card`` can be played on, as ``(r, c, move_type)``."""
+        if card in ONE_EYE:
+            return [(r, c, "remove") for r in range(10) for c in range(10)
+                    if self.chips[r][c] and self.chips[r][c] != color and not self.sequence_grid[r][c]]
+        if card in TWO_EYE:
+            return [(r, c, "place") for r in range(10) for c in range(10)
+                    if BOARD_LAYOUT[r][c] != FREE and self.chips[r][c] is None]
+        if not self.open_cells.get(card):
+            return []
+        return [(r, c, "place") for r, c in CARD_CELLS[card] if self.chips[r][c] is None]
+
+    def legal_moves(self, player=None):
+        """All ``(card_index, r, c, move_type)`` for ``player``'s hand."""
+        player = player or self.current_turn
+        color = self.player_colors[player]
+        moves = []
+        for i, card in enumerate(self.hands[player]):
+            for r, c, move_type in self.targets(card, color):
+                moves.append((i, r, c, move_type))
+        return moves
+
+    # ── Applying moves ──
+    def set_chip(self, r, c, color):
+        """Place (or with ``None`` remove) a chip, keeping ``open_cells`` and ``threats`` current."""
+        card = BOARD_LAYOUT[r][c]
+        if card in self.open_cells:
+            self.open_cells[card] += (self.chips[r][c] is not None) - (color is not None)
+        self.threats.set_chip(self.chips, r, c, color)
+
+    def apply_move(self, card_index, r, c, move_type, player=None):
+        """Play a card and pass the turn. Returns newly locked sequences."""
+        player = player or self.current_turn
+        color = self.player_colors[player]
+        hand = self.hands[player]
+        previous = self.last_move
+        self.set_chip(r, c, color if move_type == "place" else None)
+        self.last_move = (r, c) if move_type == "place" else None
+
+        drawn = self.draw()
+        hand.pop(card_index)
+        if drawn:
+            hand.append(drawn)
+
+        self.current_turn = self.next_color(color)
+        self.turns += 1
+        new_seqs = self.check_sequences()
+
+        # Cells that look different now: the played cell, the old last-move
+        # marker and any newly locked cells. Clients repaint only these.
+        self.changed_cells = {r * 10 + c}
+        if previous:
+            self.changed_cells.add(previous[0] * 10 + previous[1])
+        for cells in new_seqs:
+            self.changed_cells.update(sr * 10 + sc for sr, sc in cells)
+        return new_seqs
+
+    def exchange_dead(self, card_index, player=None):
+        """Swap a dead card for a fresh one; the turn continues."""
+        hand = self.hands[player or self.current_turn]
+        drawn = self.draw()
+        hand.pop(card_index)
+        if drawn:
+            hand.append(drawn)
+        return drawn
+
+    def pass_turn(self):
+        self.current_turn = self.next_color(self.current_turn)
+        self.turns += 1
+
+    def check_sequences(self):
+        new_seqs = []
+        if self.last_move:
+            r, c = self.last_move
+            color = self.chips[r][c]
+            new_seqs = find_new_sequences_at(self.chips, r, c, self.sequence_grid)
+            for cells in new_seqs:
+                self.locked_sequences.append((color, cells))
+                for sr, sc in cells:
+                    self.sequence_grid[sr][sc] = True
+            if new_seqs:
+                self.sequences[color] += len(new_seqs)
+
+        winner = next((c for c in self.colors if self.sequences[c] >= self.win_target), None)
+        if winner:
+            self.winner = winner
+            self.current_turn = None
+        return new_seqs
+
+    # ── Wire format ──
+    def to_state(self):
+        """Public state in the shape game.js keeps in ``saveGameState``."""
+        return {
+            "chips": self.chips,
+            "sequences": self.sequences,
+            "currentTurn": self.current_turn,
+            "teamCount": self.team_count,
+            "winTarget": self.win_target,
+            "lastMove": {"r": self.last_move[0], "c": self.last_move[1]} if self.last_move else None,
+            "sequenceGrid": self.sequence_grid,
+            "lockedSequences": [
+                {"color": color, "cells": [{"r": r, "c": c} for r, c in cells]}
+                for color, cells in self.locked_sequences
+            ],
+        }
+
+    @classmethod
+    def from_state(cls, state, hands=None, deck=None, seed=None):
+        """Rebuild a game from ``to_state`` output (or a game.js state blob)."""
+        game = cls.__new__(cls)
+        game.rng = random.Random(seed)
+        game.team_count = state["teamCount"]
+        game.colors = team_colors(game.team_count)
+        game.hands = {key: list(hand) for key, hand in (hands or {}).items()}
+        game.players = [(color, color) for color in game.colors]
+        game.player_colors = {color: color for color in game.colors}
+        game.win_target = state.get("winTarget") or (1 if game.team_count == 3 else 2)
+        game.deck = list(deck or state.get("deck") or [])
+        game.chips = [list(row) for row in state.get("chips") or empty_chips()]
+        game.open_cells = open_cell_counts(game.chips)
+        game.threats = ThreatMap(game.chips, game.colors)
+        game.sequence_grid = [list(row) for row in state.get("sequenceGrid") or empty_grid()]
+        game.locked_sequences = [
+            (ls["color"], tuple((cell["r"], cell["c"]) for cell in ls["cells"]))
+            for ls in state.get("lockedSequences") or []
+        ]
+        game.sequences = {color: 0 for color in game.colors}
+        game.sequences.update(state.get("sequences") or {})
+        game.current_turn = state.get("currentTurn")
+        last = state.get("lastMove")
+        game.last_move = (last["r"], last["c"]) if last else None
+        game.changed_cells = set()
+        game.winner = next((c for c in game.colors if game.sequences[c] >= game.win_target), None)
+        game.turns = 0
+        return game
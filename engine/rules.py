@@ -0,0 +1,166 @@
+"""Board layout and sequence rules for the headless engine.
+
+Mirrors the constants and rule helpers in game.js so the server, the
+simulators and the AI all see exactly what the browser sees. Cells are
+``(r, c)`` tuples, chips are color strings or ``None``.
+"""
+
+# ── Constants ─────────────────────────────────────────────────
+BOARD_LAYOUT = (
+    ("FREE", "2S", "3S", "4S", "5S", "6S", "7S", "8S", "9S", "FREE"),
+    ("6C", "5C", "4C", "3C", "2C", "AH", "KH", "QH", "10H", "10S"),
+    ("7C", "AS", "2D", "3D", "4D", "5D", "6D", "7D", "9H", "QS"),
+    ("8C", "KS", "6C", "5C", "4C", "3C", "2C", "8D", "8H", "KS"),
+    ("9C", "QS", "7C", "6H", "5H", "4H", "AH", "9D", "7H", "AS"),
+    ("10C", "10S", "9C", "7H", "2H", "3H", "KH", "10D", "6H", "2D"),
+    ("QC", "9S", "9C", "8H", "9H", "10H", "QH", "QD", "5H", "3D"),
+    ("KC", "8S", "10C", "QC", "KC", "AC", "AD", "KD", "4H", "4D"),
+    ("AC", "7S", "6S", "5S", "4S", "3S", "2S", "2H", "3H", "5D"),
+    ("FREE", "AD", "KD", "QD", "10D", "9D", "8D", "7D", "6D", "FREE"),
+)
+
+FREE = "FREE"
+ONE_EYE = frozenset(("JH", "JS"))
+TWO_EYE = frozenset(("JD", "JC"))
+TEAM_COLORS = ("red", "blue", "green")
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+CORNERS = frozenset((r, c) for r in (0, 9) for c in (0, 9))
+
+# Every 5-cell window on the board, in the (r, c, direction) order the
+# full scan visits them, plus the ids of the windows through each cell.
+WINDOWS = []
+WINDOWS_THROUGH = {(r, c): [] for r in range(10) for c in range(10)}
+for _r in range(10):
+    for _c in range(10):
+        for _dr, _dc in DIRECTIONS:
+            _er, _ec = _r + 4 * _dr, _c + 4 * _dc
+            if _er >= 10 or not 0 <= _ec < 10:
+                continue
+            _cells = tuple((_r + i * _dr, _c + i * _dc) for i in range(5))
+            for _cell in _cells:
+                WINDOWS_THROUGH[_cell].append(len(WINDOWS))
+            WINDOWS.append(_cells)
+del _r, _c, _dr, _dc, _er, _ec, _cells, _cell
+
+# The cells showing each card, in scan order (two per card; none for jacks)
+CARD_CELLS = {}
+for _r in range(10):
+    for _c in range(10):
+        if BOARD_LAYOUT[_r][_c] != FREE:
+            CARD_CELLS.setdefault(BOARD_LAYOUT[_r][_c], []).append((_r, _c))
+CARD_CELLS = {card: tuple(cells) for card, cells in CARD_CELLS.items()}
+del _r, _c
+
+
+def create_deck():
+    suits = ["H", "D", "S", "C"]
+    ranks = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "Q", "K", "A", "J"]
+    return [rank + suit for _ in range(2) for suit in suits for rank in ranks]
+
+
+def empty_chips():
+    return [[None] * 10 for _ in range(10)]
+
+
+def empty_grid():
+    return [[False] * 10 for _ in range(10)]
+
+
+def open_cell_counts(chips):
+    """Empty cells per card; a card with none left is dead."""
+    return {card: sum(chips[r][c] is None for r, c in cells) for card, cells in CARD_CELLS.items()}
+
+
+def team_colors(team_count):
+    return TEAM_COLORS[:team_count]
+
+
+def sequence_grid_from(locked_sequences):
+    """Rebuild the ``sequenceGrid`` boolean board from locked sequences."""
+    grid = empty_grid()
+    for _, cells in locked_sequences:
+        for r, c in cells:
+            grid[r][c] = True
+    return grid
+
+
+# ── Sequence detection ────────────────────────────────────────
+def count_sequences_for_color(chips, color, locked_sequences=()):
+    """Full-board scan, a port of ``countSequencesForColor``.
+
+    Returns every sequence for ``color``: the locked ones first, then any
+    new ones in scan order. A new window may share at most one non-corner
+    chip with sequences already found.
+    """
+    used = empty_grid()
+    found = []
+    for locked_color, cells in locked_sequences:
+        if locked_color != color:
+            continue
+        for r, c in cells:
+            used[r][c] = True
+        found.append(tuple(cells))
+
+    for cells in WINDOWS:
+        if any(BOARD_LAYOUT[r][c] != FREE and chips[r][c] != color for r, c in cells):
+            continue
+        used_count = sum(1 for r, c in cells if BOARD_LAYOUT[r][c] != FREE and used[r][c])
+        if used_count <= 1:
+            found.append(cells)
+            for r, c in cells:
+                used[r][c] = True
+    return found
+
+
+def find_new_sequences_at(chips, r, c, sequence_grid):
+    """Sequences completed by the chip just placed on ``(r, c)``.
+
+    Only the (at most 20) windows through the changed cell can hold a new
+    sequence, so this visits those in full-scan order and applies the same
+    shared-chip rule against ``sequence_grid``. Removals never complete a
+    sequence; callers skip them.
+    """
+    color = chips[r][c]
+    if color is None:
+        return []
+    claimed = set()
+    found = []
+    for window_id in WINDOWS_THROUGH[(r, c)]:
+        cells = WINDOWS[window_id]
+        used_count = 0
+        for wr, wc in cells:
+            if BOARD_LAYOUT[wr][wc] == FREE:
+                continue
+            if chips[wr][wc] != color:
+                break
+            if sequence_grid[wr][wc] or (wr, wc) in claimed:
+                used_count += 1
+        else:
+            if used_count <= 1:
+                found.append(cells)
+                claimed.update(cells)
+    return found
+
+
+# ── Line statistics ───────────────────────────────────────────
+def get_line_stats(chips, color):
+    """Port of ``getLineStats``: count open windows holding 5/4/3/2 chips."""
+    seqs = max4 = max3 = max2 = 0
+    for cells in WINDOWS:
+        run = 0
+        for r, c in cells:
+            if BOARD_LAYOUT[r][c] == FREE or chips[r][c] == color:
+                run += 1
+            elif chips[r][c] is not None:
+                break
+        else:
+            if run == 5:
+                seqs += 1
+            elif run == 4:
+                max4 += 1
+            elif run == 3:
+                max3 += 1
+            elif run == 2:
+                max2 += 1
+    return {"seqs": seqs, "max4": max4, "max3": max3, "max2": max2}
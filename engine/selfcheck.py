@@ -0,0 +1,95 @@
+"""Property check: incremental sequence detection vs. the full-board scan.
+
+Plays random placements and removals on random boards and, after every
+placement, asserts that ``find_new_sequences_at`` returns exactly the new
+sequences ``count_sequences_for_color`` finds. The incrementally updated
+``ThreatMap`` is checked against one rebuilt from scratch, and its
+completing cells against ``get_line_stats``.
+
+    python -m engine.selfcheck --games 2000 --seed 1
+"""
+import argparse
+import random
+import sys
+
+from .rules import (
+    BOARD_LAYOUT,
+    FREE,
+    count_sequences_for_color,
+    empty_chips,
+    empty_grid,
+    find_new_sequences_at,
+    get_line_stats,
+    team_colors,
+)
+from .threats import ThreatMap
+
+
+def random_game(rng, team_count, moves):
+    colors = team_colors(team_count)
+    chips = empty_chips()
+    grid = empty_grid()
+    locked = []
+    threats = ThreatMap(chips, colors)
+    checked = 0
+
+    for _ in range(moves):
+        occupied = [(r, c) for r in range(10) for c in range(10) if chips[r][c] and not grid[r][c]]
+        if occupied and rng.random() < 0.15:
+            r, c = rng.choice(occupied)
+            threats.set_chip(chips, r, c, None)
+            continue
+
+        empty = [(r, c) for r in range(10) for c in range(10)
+                 if chips[r][c] is None and BOARD_LAYOUT[r][c] != FREE]
+        if not empty:
+            break
+        r, c = rng.choice(empty)
+        color = rng.choice(colors)
+        before = get_line_stats(chips, color)["seqs"]
+        completes = threats.wins_at(color, r, c)
+        threats.set_chip(chips, r, c, color)
+        if completes != (get_line_stats(chips, color)["seqs"] > before):
+            raise AssertionError(f"threat map says {completes} for {color} completing on {(r, c)}")
+        fresh = ThreatMap(chips, colors)
+        if (fresh.completing, fresh.building) != (threats.completing, threats.building):
+            raise AssertionError(f"threat map drifted after placing {color} on {(r, c)}")
+
+        expected = count_sequences_for_color(chips, color, locked)
+        expected = expected[sum(1 for lc, _ in locked if lc == color):]
+        actual = find_new_sequences_at(chips, r, c, grid)
+        if actual != expected:
+            raise AssertionError(
+                f"mismatch after placing {color} on {(r, c)}: "
+                f"incremental={actual} full={expected}"
+            )
+        checked += 1
+
+        for cells in actual:
+            locked.append((color, cells))
+            for sr, sc in cells:
+                grid[sr][sc] = True
+    return checked
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=500)
+    parser.add_argument("--moves", type=int, default=90)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    checked = 0
+    for i in range(args.games):
+        try:
+            checked += random_game(rng, 2 + i % 2, args.moves)
+        except AssertionError as e:
+            print(f"game {i}: {e}", file=sys.stderr)
+            return 1
+    print(f"ok: {args.games} games, {checked} placements matched the full scan")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
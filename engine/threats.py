@@ -0,0 +1,91 @@
+"""Threat map: per color, the empty cells that finish or build a five.
+
+A window is open for a color when it holds none of the other colors'
+chips. Counting the FREE corners as filled, an open window whose only
+empty cell is ``(r, c)`` makes ``(r, c)`` a *completing* cell: a chip
+there makes five, a win for that color and a must-block for everyone
+else. An open window with exactly two empty cells makes both of them
+*building* cells: a chip on either creates a new completing cell.
+
+``completing[color]`` and ``building[color]`` map cell -> number of
+windows giving it that status. ``set_chip`` re-reads only the (at most
+20) windows through the changed cell, so keeping the map current costs
+about as much as one ``find_new_sequences_at``. Queries such as
+``(r, c) in threats.completing[color]`` are O(1).
+
+``Game`` keeps one in ``game.threats``, so the AI and the room server
+can ask for wins and blocks without scanning the board. Rooms answer a
+player's ``threats`` message with ``to_json()`` for the hint UI.
+"""
+from .rules import BOARD_LAYOUT, FREE, WINDOWS, WINDOWS_THROUGH
+
+# Each window without its FREE corner, which counts as filled for everyone
+PLAYABLE = tuple(tuple((r, c) for r, c in cells if BOARD_LAYOUT[r][c] != FREE) for cells in WINDOWS)
+PLAYABLE_THROUGH = {cell: tuple(PLAYABLE[i] for i in ids) for cell, ids in WINDOWS_THROUGH.items()}
+
+
+class ThreatMap:
+    __slots__ = ("colors", "completing", "building")
+
+    def __init__(self, chips, colors):
+        self.colors = tuple(colors)
+        self.completing = {color: {} for color in self.colors}
+        self.building = {color: {} for color in self.colors}
+        for cells in PLAYABLE:
+            self.count(chips, cells, 1)
+
+    def copy(self):
+        other = ThreatMap.__new__(ThreatMap)
+        other.colors = self.colors
+        other.completing = {color: dict(cells) for color, cells in self.completing.items()}
+        other.building = {color: dict(cells) for color, cells in self.building.items()}
+        return other
+
+    def count(self, chips, cells, sign):
+        """Add (``sign`` 1) or retract (-1) what one window contributes."""
+        owner = None
+        gaps = []
+        for r, c in cells:
+            chip = chips[r][c]
+            if chip is None:
+                if len(gaps) == 2:
+                    return
+                gaps.append((r, c))
+            elif owner is None:
+                owner = chip
+            elif chip != owner:
+                return
+        if owner is None or not gaps:
+            return
+        target = (self.completing if len(gaps) == 1 else self.building)[owner]
+        for cell in gaps:
+            n = target.get(cell, 0) + sign
+            if n:
+                target[cell] = n
+            else:
+                del target[cell]
+
+    def set_chip(self, chips, r, c, color):
+        """Write ``chips[r][c] = color`` and update the windows through it."""
+        through = PLAYABLE_THROUGH[(r, c)]
+        for cells in through:
+            self.count(chips, cells, -1)
+        chips[r][c] = color
+        for cells in through:
+            self.count(chips, cells, 1)
+
+    # ── Queries ──
+    def wins_at(self, color, r, c):
+        """True when a ``color`` chip on the empty cell ``(r, c)`` makes five."""
+        return (r, c) in self.completing[color]
+
+    def blocks_at(self, color, r, c):
+        """True when ``(r, c)`` is a completing cell for any other color."""
+        return any((r, c) in self.completing[other] for other in self.colors if other != color)
+
+    def to_json(self):
+        """Completing and building cells per color, as ``r * 10 + c`` lists."""
+        return {
+            "completing": {color: sorted(r * 10 + c for r, c in cells) for color, cells in self.completing.items()},
+            "building": {color: sorted(r * 10 + c for r, c in cells) for color, cells in self.building.items()},
+        }
@@ -0,0 +1,316 @@
+"""Round-robin and gauntlet tournaments between AI configurations.
+
+Each engine is a name plus options:
+
+    --engine base                          built-in weights
+    --engine tuned=weights=ai-weights.json a weights file (see engine.tune)
+    --engine solver=endgame=45,time=0.2    base weights plus the endgame solver
+
+Every pairing (``--teams 2``) or three-way pairing (``--teams 3``) plays
+rounds. A round is one seeded deal, played once per seat rotation, so
+nobody gains from moving first. Win targets come from ``Game``, as in
+``startGame``. Rounds run on a process pool.
+
+Results are kept per pair of engines. In a 3-team game the winner beats
+both others and the two losers draw. Each pair runs a sequential
+probability ratio test of ``--elo0`` against ``--elo1``. It uses the
+normal approximation fishtest uses. A pairing stops once every pair in
+it has accepted either hypothesis, or after ``--max-rounds``. The report
+has two tables:
+- pairwise Elo differences with 95% confidence intervals;
+- each engine's Elo against the field.
+
+    python -m engine.tournament --engine base --engine tuned=weights=ai-weights.json
+    python -m engine.tournament --engine a --engine b=weights=w.json --engine c=endgame=45 --teams 3
+    python -m engine.tournament --gauntlet new --engine new=weights=w.json --engine base --max-rounds 400 --json
+"""
+import argparse
+import itertools
+import json
+import math
+import multiprocessing
+import sys
+import time
+
+from .ai import DEFAULT_WEIGHTS, load_weights, play_ai_turn
+from .endgame import EndgameSolver
+from .game import Game
+
+Z95 = 1.96
+
+
+# ── Engines ───────────────────────────────────────────────────
+def parse_engine(text):
+    """``name[=key=value,...]`` -> ``(name, options)``."""
+    name, _, rest = text.partition("=")
+    options = {}
+    for item in filter(None, rest.split(",")):
+        key, _, value = item.partition("=")
+        if key not in ("weights", "endgame", "time"):
+            raise ValueError(f"unknown engine option {key!r} in {text!r}")
+        options[key] = value
+    return name, options
+
+
+_players = {}
+
+
+def player_for(name, options):
+    """``(weights, endgame solver or None)``, built once per worker process."""
+    if name not in _players:
+        weights = load_weights(options["weights"]) if "weights" in options else dict(DEFAULT_WEIGHTS)
+        solver = None
+        if "endgame" in options:
+            solver = EndgameSolver(int(options["endgame"]), float(options.get("time", 0.25)))
+        _players[name] = (weights, solver)
+    return _players[name]
+
+
+def play_game(task):
+    """One game with ``names`` in seat order; returns the winner's seat or None."""
+    names, engines, seed, max_turns = task
+    game = Game(len(names), seed=seed)
+    seats = {color: player_for(name, engines[name]) for color, name in zip(game.colors, names)}
+    passes = 0
+    while not game.over and game.turns < max_turns:
+        weights, solver = seats[game.current_turn]
+        actions = play_ai_turn(game, solver, weights)
+        passes = passes + 1 if actions[-1] is None else 0
+        if passes >= len(game.colors):
+            break
+    winner = game.colors.index(game.winner) if game.winner else None
+    return names, winner
+
+
+# ── Statistics ────────────────────────────────────────────────
+def elo(score):
+    score = min(max(score, 1e-4), 1 - 1e-4)
+    return -400 * math.log10(1 / score - 1)
+
+
+def expected(elo_diff):
+    return 1 / (1 + 10 ** (-elo_diff / 400))
+
+
+class PairStats:
+    """Wins, draws and losses of ``a`` against ``b``."""
+
+    def __init__(self, a, b):
+        self.a, self.b = a, b
+        self.wins = self.draws = self.losses = 0
+
+    def add(self, score):
+        if score == 1:
+            self.wins += 1
+        elif score == 0:
+            self.losses += 1
+        else:
+            self.draws += 1
+
+    @property
+    def games(self):
+        return self.wins + self.draws + self.losses
+
+    def score(self):
+        return (self.wins + 0.5 * self.draws) / self.games if self.games else 0.5
+
+    def variance(self):
+        # Per-game variance of the score, floored so a clean sweep still has one
+        n, s = self.games, self.score()
+        if not n:
+            return 0.25
+        var = (self.wins * (1 - s) ** 2 + self.draws * (0.5 - s) ** 2 + self.losses * s ** 2) / n
+        return max(var, 1e-3)
+
+    def interval(self):
+        """Elo difference and its 95% confidence bounds."""
+        s = self.score()
+        half = Z95 * math.sqrt(self.variance() / max(self.games, 1))
+        return elo(s), elo(s - half), elo(s + half)
+
+    def llr(self, elo0, elo1):
+        """Log-likelihood ratio of H1 (elo1) over H0 (elo0), normal approximation."""
+        if not self.games:
+            return 0.0
+        s0, s1 = expected(elo0), expected(elo1)
+        return self.games * (s1 - s0) * (2 * self.score() - s0 - s1) / (2 * self.variance())
+
+
+def sprt_verdict(stats, args):
+    lower = math.log(args.beta / (1 - args.alpha))
+    upper = math.log((1 - args.beta) / args.alpha)
+    llr = stats.llr(args.elo0, args.elo1)
+    if llr >= upper:
+        return "H1"
+    if llr <= lower:
+        return "H0"
+    return None
+
+
+# ── Scheduling ────────────────────────────────────────────────
+def pairings(names, teams, gauntlet=None):
+    """Engine tuples to play: all of them, or each one with ``gauntlet``."""
+    if teams == 2:
+        combos = itertools.combinations(names, 2)
+    elif len(names) >= 3:
+        combos = itertools.combinations(names, 3)
+    else:
+        a, b = names
+        combos = [(a, a, b), (a, b, b)]
+    return [combo for combo in combos if gauntlet is None or gauntlet in combo]
+
+
+def rotations(names):
+    return [names[k:] + names[:k] for k in range(len(names))]
+
+
+def pair_key(a, b):
+    return (a, b) if a < b else (b, a)
+
+
+def record(pairs, names, winner):
+    """Split one game into pairwise results."""
+    for i, j in itertools.combinations(range(len(names)), 2):
+        a, b = names[i], names[j]
+        if a == b:
+            continue
+        if winner is None or winner not in (i, j):
+            score = 0.5
+        else:
+            score = 1.0 if winner == i else 0.0
+        stats = pairs.setdefault(pair_key(a, b), PairStats(*pair_key(a, b)))
+        stats.add(score if stats.a == a else 1 - score)
+
+
+def run(args, engines):
+    names = list(engines)
+    matches = pairings(names, args.teams, args.gauntlet)
+    rounds = dict.fromkeys(matches, 0)
+    pairs = {}
+    seeds = iter(range(args.seed, args.seed + 10 ** 9))
+    start = time.perf_counter()
+    games = 0
+
+    def finished(match):
+        if rounds[match] >= args.max_rounds:
+            return True
+        if not args.sprt or rounds[match] < args.min_rounds:
+            return False
+        keys = {pair_key(a, b) for a, b in itertools.combinations(match, 2) if a != b}
+        return all(sprt_verdict(pairs[key], args) for key in keys if key in pairs)
+
+    pool = multiprocessing.Pool(args.workers) if args.workers > 1 else None
+    try:
+        while True:
+            active = [match for match in matches if not finished(match)]
+            if not active:
+                break
+            tasks = []
+            for match in active:
+                for _ in range(min(args.batch, args.max_rounds - rounds[match])):
+                    seed = next(seeds)
+                    tasks.extend((seated, engines, seed, args.max_turns) for seated in rotations(match))
+                    rounds[match] += 1
+            results = pool.imap_unordered(play_game, tasks) if pool else map(play_game, tasks)
+            for seated, winner in results:
+                record(pairs, seated, winner)
+                games += 1
+            elapsed = time.perf_counter() - start
+            print(f"{games} games, {games / elapsed:.1f} games/s, {len(active)} pairings running",
+                  file=sys.stderr)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return report(args, names, pairs, games, time.perf_counter() - start)
+
+
+# ── Report ────────────────────────────────────────────────────
+def report(args, names, pairs, games, elapsed):
+    pairwise = []
+    field = {name: PairStats(name, "field") for name in names}
+    for (a, b), stats in sorted(pairs.items()):
+        diff, low, high = stats.interval()
+        pairwise.append({
+            "a": a, "b": b, "games": stats.games,
+            "wins": stats.wins, "draws": stats.draws, "losses": stats.losses,
+            "score": stats.score(), "elo": diff, "eloLow": low, "eloHigh": high,
+            "llr": stats.llr(args.elo0, args.elo1), "sprt": sprt_verdict(stats, args) if args.sprt else None,
+        })
+        field[a].wins += stats.wins
+        field[a].draws += stats.draws
+        field[a].losses += stats.losses
+        field[b].wins += stats.losses
+        field[b].draws += stats.draws
+        field[b].losses += stats.wins
+    ratings = []
+    for name in names:
+        diff, low, high = field[name].interval()
+        ratings.append({"engine": name, "games": field[name].games, "score": field[name].score(),
+                        "elo": diff, "eloLow": low, "eloHigh": high})
+    ratings.sort(key=lambda row: -row["elo"])
+    return {
+        "teams": args.teams,
+        "games": games,
+        "elapsedSec": elapsed,
+        "gamesPerSec": games / elapsed if elapsed else 0.0,
+        "sprt": {"elo0": args.elo0, "elo1": args.elo1, "alpha": args.alpha, "beta": args.beta} if args.sprt else None,
+        "pairwise": pairwise,
+        "ratings": ratings,
+    }
+
+
+def print_report(result):
+    print(f"{result['teams']}-team games: {result['games']} in {result['elapsedSec']:.1f}s "
+          f"({result['gamesPerSec']:.1f} games/s)")
+    print(f"  {'pair':<28}{'games':>7}{'W-D-L':>14}{'score':>8}{'elo':>8}{'95% CI':>18}{'llr':>7}  sprt")
+    for row in result["pairwise"]:
+        wdl = f"{row['wins']}-{row['draws']}-{row['losses']}"
+        ci = f"[{row['eloLow']:.0f}, {row['eloHigh']:.0f}]"
+        print(f"  {row['a'] + ' vs ' + row['b']:<28}{row['games']:>7}{wdl:>14}{row['score']:>8.3f}"
+              f"{row['elo']:>8.1f}{ci:>18}{row['llr']:>7.2f}  {row['sprt'] or '-'}")
+    print(f"  {'engine vs field':<28}{'games':>7}{'':>14}{'score':>8}{'elo':>8}{'95% CI':>18}")
+    for row in result["ratings"]:
+        ci = f"[{row['eloLow']:.0f}, {row['eloHigh']:.0f}]"
+        print(f"  {row['engine']:<28}{row['games']:>7}{'':>14}{row['score']:>8.3f}{row['elo']:>8.1f}{ci:>18}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play AI configurations against each other and rate them")
+    parser.add_argument("--engine", action="append", default=[], metavar="NAME[=OPTIONS]",
+                        help="an engine: weights=FILE, endgame=CARDS, time=SECONDS (repeatable)")
+    parser.add_argument("--gauntlet", metavar="NAME", help="only play pairings that include this engine")
+    parser.add_argument("--teams", type=int, choices=(2, 3), default=2)
+    parser.add_argument("--max-rounds", type=int, default=200, help="deals per pairing, each in every seat order")
+    parser.add_argument("--min-rounds", type=int, default=10, help="deals before SPRT may stop a pairing")
+    parser.add_argument("--batch", type=int, default=10, help="deals per pairing between SPRT checks")
+    parser.add_argument("--no-sprt", dest="sprt", action="store_false", help="always play --max-rounds")
+    parser.add_argument("--elo0", type=float, default=0.0)
+    parser.add_argument("--elo1", type=float, default=30.0)
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    parser.add_argument("--max-turns", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        engines = dict(parse_engine(text) for text in args.engine or ["base", "tuned=weights=ai-weights.json"])
+    except ValueError as e:
+        parser.error(str(e))
+    if len(engines) < 2:
+        parser.error("need at least two distinct --engine names")
+    if args.gauntlet and args.gauntlet not in engines:
+        parser.error(f"--gauntlet {args.gauntlet} is not one of the engines")
+
+    result = run(args, engines)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+"""Tune ``evaluate_move``'s weights by self-play.
+
+An evolution strategy in the spirit of CMA-ES, with a diagonal
+covariance. Each weight is searched in log space, so it stays positive
+and moves by ratios. Every generation samples ``--population``
+candidates around the current mean. Each candidate plays ``--games``
+seeded games against the reference weights, alternating seats, and
+scores 1 per win and 1/2 per draw. The mean and the per-weight spread
+then move toward the best ``--elite`` candidates.
+
+All candidates of a generation play the same seeds, so they are
+compared on the same deals. The games run on a process pool. ``win`` is
+not tuned: it anchors the scale the move jitter is measured against.
+
+After every generation the state is written to ``--checkpoint``, and
+``--resume`` continues from there. At the end the mean weights go to
+``--out``, by default the ``ai-weights.json`` that engine/ai.py and
+ai.js load at startup. Throughput is reported in games/sec, so runs can
+be budgeted.
+
+    python -m engine.tune --generations 20 --population 12 --games 40
+    python -m engine.tune --resume --generations 40
+    python -m engine.tune --generations 1 --population 4 --games 8 --out /tmp/w.json
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+from .ai import DEFAULT_WEIGHTS, WEIGHTS_FILE, load_weights, play_ai_turn
+from .game import Game
+
+TUNED = [key for key in DEFAULT_WEIGHTS if key != "win"]
+MIN_SIGMA = 0.02
+
+
+# ── Self-play ─────────────────────────────────────────────────
+def play_match(job):
+    """One seeded game: the candidate in ``seat``, the reference elsewhere."""
+    candidate, reference, seed, seat, teams, max_turns = job
+    game = Game(teams, seed=seed)
+    mine = game.colors[seat]
+    passes = 0
+    while not game.over and game.turns < max_turns:
+        weights = candidate if game.current_turn == mine else reference
+        actions = play_ai_turn(game, weights=weights)
+        passes = passes + 1 if actions[-1] is None else 0
+        if passes >= len(game.colors):
+            break
+    if game.winner is None:
+        return 0.5
+    return 1.0 if game.winner == mine else 0.0
+
+
+def evaluate(pool, candidates, reference, seeds, args):
+    """Mean score of each candidate over the same seeded games."""
+    jobs = [(weights, reference, seed, i % args.teams, args.teams, args.max_turns)
+            for weights in candidates for i, seed in enumerate(seeds)]
+    if pool is None:
+        scores = [play_match(job) for job in jobs]
+    else:
+        scores = pool.map(play_match, jobs, chunksize=max(1, len(jobs) // (4 * args.workers)))
+    n = len(seeds)
+    return [sum(scores[i * n:(i + 1) * n]) / n for i in range(len(candidates))]
+
+
+# ── Strategy ──────────────────────────────────────────────────
+def to_weights(base, x):
+    weights = dict(base)
+    weights.update((key, float(f"{math.exp(x[key]):.4g}")) for key in TUNED)
+    return weights
+
+
+def sample(rng, mean, sigma):
+    return {key: mean[key] + sigma[key] * rng.gauss(0, 1) for key in TUNED}
+
+
+def update(mean, sigma, ranked, elite, smoothing):
+    """Move mean and spread toward the top ``elite`` samples (log-rank weighted)."""
+    ranks = [math.log(elite + 0.5) - math.log(i + 1) for i in range(elite)]
+    total = sum(ranks)
+    ranks = [r / total for r in ranks]
+    best = ranked[:elite]
+    new_mean, new_sigma = {}, {}
+    for key in TUNED:
+        m = sum(w * x[key] for w, x in zip(ranks, best))
+        var = sum(w * (x[key] - mean[key]) ** 2 for w, x in zip(ranks, best))
+        new_mean[key] = m
+        new_sigma[key] = max(MIN_SIGMA, (1 - smoothing) * sigma[key] + smoothing * math.sqrt(var))
+    return new_mean, new_sigma
+
+
+# ── Checkpoints ───────────────────────────────────────────────
+def save_json(path, data):
+    # Replaced atomically, so an interrupted run never leaves half a file
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, indent=1) + "\n")
+    os.replace(tmp, path)
+
+
+def fresh_state(args):
+    reference = load_weights(args.reference) if args.reference else dict(DEFAULT_WEIGHTS)
+    start = load_weights(args.start) if args.start else dict(reference)
+    # The search runs in log space, so every tuned weight has to start positive
+    bad = [f"{key}={start[key]!r}" for key in TUNED if start[key] <= 0]
+    if bad:
+        raise ValueError(f"tuned weights must be positive, {args.start or args.reference} has {', '.join(bad)}")
+    return {
+        "generation": 0,
+        "mean": {key: math.log(start[key]) for key in TUNED},
+        "sigma": {key: args.sigma for key in TUNED},
+        "reference": reference,
+        "base": start,
+        "games": 0,
+        "seconds": 0.0,
+        "history": [],
+    }
+
+
+def run(args, state):
+    pool = multiprocessing.Pool(args.workers) if args.workers > 1 else None
+    try:
+        while state["generation"] < args.generations:
+            generation = state["generation"]
+            # Seeded by generation, so a resumed run samples what the original would have
+            rng = random.Random(args.seed * 1000003 + generation)
+            seeds = [rng.getrandbits(32) for _ in range(args.games)]
+            samples = [sample(rng, state["mean"], state["sigma"]) for _ in range(args.population)]
+            candidates = [to_weights(state["base"], x) for x in samples]
+
+            start = time.perf_counter()
+            scores = evaluate(pool, candidates, state["reference"], seeds, args)
+            elapsed = time.perf_counter() - start
+            played = len(candidates) * len(seeds)
+
+            order = sorted(range(len(samples)), key=lambda i: -scores[i])
+            state["mean"], state["sigma"] = update(
+                state["mean"], state["sigma"], [samples[i] for i in order], args.elite, args.smoothing)
+            state["generation"] += 1
+            state["games"] += played
+            state["seconds"] += elapsed
+            state["history"].append({
+                "generation": generation,
+                "best": scores[order[0]],
+                "meanScore": sum(scores) / len(scores),
+                "gamesPerSec": played / elapsed,
+                "bestWeights": candidates[order[0]],
+            })
+            save_json(args.checkpoint, state)
+            print(f"gen {generation:3d}: best {scores[order[0]]:.3f}  mean {sum(scores) / len(scores):.3f}  "
+                  f"{played} games in {elapsed:.1f}s ({played / elapsed:.1f} games/s)", file=sys.stderr)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return state
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tune the computer player's weights by self-play")
+    parser.add_argument("--generations", type=int, default=20, help="total generations, counting resumed ones")
+    parser.add_argument("--population", type=int, default=12, help="candidates per generation")
+    parser.add_argument("--elite", type=int, help="candidates the next generation is drawn toward "
+                                                  "(default: half the population)")
+    parser.add_argument("--games", type=int, default=40, help="games per candidate")
+    parser.add_argument("--teams", type=int, choices=(2, 3), default=2)
+    parser.add_argument("--max-turns", type=int, default=300)
+    parser.add_argument("--sigma", type=float, default=0.3, help="initial spread, in log space")
+    parser.add_argument("--smoothing", type=float, default=0.5, help="how fast the spread follows the elite")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--reference", help="weights file candidates play against (default: built-in)")
+    parser.add_argument("--start", help="weights file to start from (default: the reference)")
+    parser.add_argument("--checkpoint", default="tune-checkpoint.json")
+    parser.add_argument("--resume", action="store_true", help="continue from --checkpoint if it exists")
+    parser.add_argument("--out", default=str(WEIGHTS_FILE), help="where the tuned weights go")
+    args = parser.parse_args(argv)
+    args.elite = args.elite or max(1, args.population // 2)
+    if not 1 <= args.elite <= args.population:
+        parser.error("--elite must be between 1 and --population")
+    if args.games % args.teams:
+        parser.error("--games must be a multiple of --teams so every seat is played equally")
+
+    if args.resume and Path(args.checkpoint).exists():
+        state = json.loads(Path(args.checkpoint).read_text())
+        print(f"resuming at generation {state['generation']} from {args.checkpoint}", file=sys.stderr)
+    else:
+        try:
+            state = fresh_state(args)
+        except ValueError as e:
+            parser.error(str(e))
+    state = run(args, state)
+    weights = to_weights(state["base"], state["mean"])
+    last = state["history"][-1] if state["history"] else {}
+    save_json(args.out, {
+        "weights": weights,
+        "meta": {
+            "generations": state["generation"],
+            "games": state["games"],
+            "teams": args.teams,
+            "lastBest": last.get("best"),
+            "lastMeanScore": last.get("meanScore"),
+        },
+    })
+    rate = state["games"] / state["seconds"] if state["seconds"] else 0.0
+    print(f"{state['games']} games in {state['seconds']:.0f}s ({rate:.1f} games/s); weights written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
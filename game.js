@@ -38,6 +38,30 @@ const ONE_EYE = new Set(['JH', 'JS']);
 const TWO_EYE = new Set(['JD', 'JC']);
 const TEAM_COLORS = ['red', 'blue', 'green'];
 
+// Every 5-cell window on the board, in the (r, c, direction) order a full-board
+// scan visits them, plus the ids of the windows through each cell (index r * 10 + c).
+const SEQ_DIRECTIONS = [[0, 1], [1, 0], [1, 1], [1, -1]];
+const SEQ_WINDOWS = [];
+const WINDOWS_THROUGH = Array(100).fill(null).map(() => []);
+for (let r = 0; r < 10; r++) {
+    for (let c = 0; c < 10; c++) {
+        for (const [dr, dc] of SEQ_DIRECTIONS) {
+            const er = r + 4 * dr, ec = c + 4 * dc;
+            if (er >= 10 || ec < 0 || ec >= 10) continue;
+            const cells = [];
+            for (let i = 0; i < 5; i++) cells.push({ r: r + i * dr, c: c + i * dc });
+            cells.forEach(cell => WINDOWS_THROUGH[cell.r * 10 + cell.c].push(SEQ_WINDOWS.length));
+            SEQ_WINDOWS.push(cells);
+        }
+    }
+}
+
+// Board cells showing each card, as r * 10 + c (two per card; none for jacks)
+const CARD_CELLS = {};
+BOARD_LAYOUT.flat().forEach((card, i) => {
+    if (card !== 'FREE') (CARD_CELLS[card] = CARD_CELLS[card] || []).push(i);
+});
+
 const PEER_CONFIG = {
     config: {
         'iceServers': [
@@ -50,7 +74,33 @@ const PEER_CONFIG = {
     }
 };
 
-const MAX_RECONNECT_ATTEMPTS = 60; // ~5 minutes of attempts
+// ?signal=host:port (or localStorage sequence_signal) points PeerJS at another
+// broker, e.g. the local one in server/signaling.py; loopback needs no STUN
+function peerConfig() {
+    const match = /[?&]signal=([^&#]+)/.exec(window.location.search || '');
+    const signal = match ? decodeURIComponent(match[1]) : localStorage.getItem('sequence_signal');
+    if (!signal) return PEER_CONFIG;
+    const url = new URL(signal.includes('//') ? signal : `http://${signal}`);
+    const secure = url.protocol === 'https:' || url.protocol === 'wss:';
+    const loopback = ['localhost', '127.0.0.1', '[::1]'].includes(url.hostname);
+    return {
+        host: url.hostname,
+        port: Number(url.port) || (secure ? 443 : 80),
+        path: url.pathname,
+        secure,
+        key: 'peerjs',
+        config: loopback ? { iceServers: [] } : PEER_CONFIG.config
+    };
+}
+
+const RECONNECT_BASE_MS = 1000;      // shortest wait between reconnect attempts
+const RECONNECT_CAP_MS = 30000;      // longest wait between reconnect attempts
+const TAKEOVER_STEP_MS = 10000;      // successor n takes over after (n + 1) steps without a host
+const ROOM_LOST_MS = 5 * 60 * 1000;  // give the room up after this long without a host
+const SAVE_IDLE_TIMEOUT_MS = 1000;  // longest a host state save waits for an idle period
+const SAVE_FALLBACK_DELAY_MS = 100; // coalescing window without requestIdleCallback (Safari)
+// Full-state messages: a newer one replaces any still queued for the same connection
+const SUPERSEDED_MESSAGES = new Set(['sync', 'hostStateBackup', 'players_sync']);
 
 function getCardImagePath(card) {
     if (card === 'FREE') return 'card_images/back_light.png';
@@ -75,6 +125,79 @@ function genId(len = 8) {
         .map(b => b.toString(36).padStart(2, '0')).join('').slice(0, len);
 }
 
+// ── Performance Tracing ───────────────────────────────────────
+// Opt-in with ?perf in the URL, or localStorage sequence_perf = '1'. Hot
+// paths are timed with performance.measure (so they also show in the
+// DevTools timeline), as are peer.open and peer.connect (join latency), and
+// peer messages are counted by type. In the
+// console, sequencePerf.download() saves the trace as JSON;
+// python -m tools.perf_report aggregates traces from many sessions.
+const PERF_MAX_MEASURES = 20000;
+const PERF_NOOP = () => { };
+
+class PerfTrace {
+    constructor(enabled) {
+        this.enabled = enabled;
+        this.session = genId(10);
+        this.startedAt = new Date().toISOString();
+        this.measures = [];  // [name, start ms, duration ms]
+        this.counters = {};
+        this.dropped = 0;
+    }
+
+    // Starts timing `name`; call the returned function when the work is done
+    start(name) {
+        if (!this.enabled) return PERF_NOOP;
+        const t0 = performance.now();
+        return () => {
+            const t1 = performance.now();
+            if (this.measures.length < PERF_MAX_MEASURES) {
+                this.measures.push([name, +t0.toFixed(2), +(t1 - t0).toFixed(3)]);
+            } else {
+                this.dropped++;
+            }
+            try {
+                performance.measure(name, { start: t0, end: t1 });
+                performance.clearMeasures(name); // the trace keeps its own copy
+            } catch (e) { /* no User Timing L3 */ }
+        };
+    }
+
+    count(name) {
+        if (this.enabled) this.counters[name] = (this.counters[name] || 0) + 1;
+    }
+
+    toJSON() {
+        return {
+            format: 'sequence-perf/1',
+            session: this.session,
+            startedAt: this.startedAt,
+            exportedAt: new Date().toISOString(),
+            userAgent: navigator.userAgent,
+            hardwareConcurrency: navigator.hardwareConcurrency || null,
+            deviceMemory: navigator.deviceMemory || null,
+            measures: this.measures,
+            counters: this.counters,
+            dropped: this.dropped
+        };
+    }
+
+    download() {
+        const url = URL.createObjectURL(new Blob([JSON.stringify(this)], { type: 'application/json' }));
+        const a = document.createElement('a');
+        a.href = url;
+        a.download = `sequence-perf-${this.session}.json`;
+        a.click();
+        URL.revokeObjectURL(url);
+    }
+
+    reset() {
+        this.measures = [];
+        this.counters = {};
+        this.dropped = 0;
+    }
+}
+
 // ── Game Class ────────────────────────────────────────────────
 class SequenceGame {
     constructor() {
@@ -143,6 +266,30 @@ class SequenceGame {
         this.hoveredCardIndex = null;
         this.hands = {};         // For reconnects, host saves all hands dealt
         this.hostStateBackup = null; // Backup of the game state for migration
+        this.stateVersion = 0;   // bumped by every saveGameState, stored with the state
+        this.stateDirty = false; // host state changed since the last flush
+        this.saveHandle = null;  // pending idle callback / timer for flushGameState
+        this.outbox = new Map();   // connection -> [{ type, data }] queued this tick
+        this.outboxFlushQueued = false;
+        this.reconnectTimer = null;  // the one pending retry, see scheduleReconnect
+        this.reconnectDelay = 0;
+        this.hostLostAt = null;      // when reconnecting to the host started
+        this.takeoverAt = null;      // when this client will take over as host
+        this.cellEls = null;     // per-cell { cell, chip, cellClass, chipClass }, built by renderBoard
+        this.dirtyCells = new Set(); // r * 10 + c of cells to repaint on the next sync
+        this.painted = null;     // paintState() as of the last sync
+        this.drawnSequences = 0; // lockedSequences already drawn as SVG lines
+        this.openCells = null;   // card -> empty cells showing it, see openCellCount
+        this.openCellsFor = null;
+        this.threats = null;     // color -> completing cells, see threatMap
+        this.threatsFor = null;
+        this.handEls = new Map();    // hand card elements by key, see renderHand
+        this.spareHandEls = new Map();
+
+        const perfOn = /[?&]perf\b/.test(window.location.search || '') || localStorage.getItem('sequence_perf') === '1';
+        this.perf = new PerfTrace(perfOn);
+        if (perfOn) window.sequencePerf = this.perf;
+        this.peerConfig = peerConfig();
 
         this.initSetup();
     }
@@ -162,14 +309,20 @@ class SequenceGame {
             renderSetupState();
         };
 
+        // A pending state save must not be lost when the tab is hidden or closed
+        document.addEventListener('visibilitychange', () => {
+            if (document.visibilityState === 'hidden') this.flushGameState();
+        });
+        window.addEventListener('pagehide', () => this.flushGameState());
+
         // Auto-reconnect on visibility change (helps with mobile backgrounding)
         document.addEventListener('visibilitychange', () => {
-            if (document.visibilityState === 'visible' && this.started && !this.isHost) {
+            if (document.visibilityState === 'visible' && !this.isHost) {
                 const needsReconnect = !this.hostConnection || !this.hostConnection.open ||
                     !this.peer || this.peer.destroyed || this.peer.disconnected;
                 if (needsReconnect) {
                     console.log("Tab visible & connection lost. Auto-reconnecting...");
-                    this.attemptReconnect();
+                    this.scheduleReconnect('visible', true);
                 }
             }
         });
@@ -305,34 +458,11 @@ class SequenceGame {
                 this.startSession(roomId, true);
             };
 
+            ui.playSingleBtn.onpointerenter = () => this.loadAI(); // start fetching early
             ui.playSingleBtn.onclick = () => {
-                this.isSinglePlayer = true;
-                this.isHost = true; // Act as host for game logic
-
-                // Set up peers array manually (empty peer for the AI will be built by startGame)
-                this.peers = [];
-                this.peerNames = {};
-                this.playerIDMap = {};
-
-                // Show options instead of starting
-                ui.createSec.style.display = 'none';
-                ui.teamCfg.style.display = 'block';
-                ui.teamCfg.classList.add('single-player-setup');
-                ui.startBtn.style.display = 'block';
-                document.getElementById('setup-back-btn').style.display = 'block';
-
-                // Allow team selection for 1v1 or 1v1v1
-                this.updateTeamLabels(ui.teamLabels);
+                this.loadAI().then(() => this.setupSinglePlayer());
             };
         }
-
-        window.addEventListener("visibilitychange", () => {
-            if (document.visibilityState === 'visible' && !this.isHost) {
-                if (!this.hostConnection || !this.hostConnection.open) {
-                    this.attemptReconnect();
-                }
-            }
-        });
     }
 
     // ── Peer events ──
@@ -383,6 +513,7 @@ class SequenceGame {
                     this.lastMove = s.lastMove || null;
                     this.sequenceGrid = s.sequenceGrid || Array(10).fill(null).map(() => Array(10).fill(false));
                     this.lockedSequences = s.lockedSequences || [];
+                    this.stateVersion = s.version || 0;
 
                     const myState = this.playerStates[this.playerID];
                     if (myState) {
@@ -402,17 +533,20 @@ class SequenceGame {
             this.renderBoard();
         }
 
-        this.peer = this.isHost ? new Peer(roomId, PEER_CONFIG) : new Peer(PEER_CONFIG);
+        this.peer = this.isHost ? new Peer(roomId, this.peerConfig) : new Peer(this.peerConfig);
+        const opened = this.perf.start('peer.open');
 
         const watchdog = setTimeout(() => {
             if (this.peer && !this.peer.open && !this.peer.destroyed) {
                 console.warn("PeerJS open timed out, restarting session...");
+                this.perf.count('peer:watchdog');
                 this.startSession(roomId, this.isHost);
             }
         }, 10000);
 
         this.peer.on('open', (id) => {
             clearTimeout(watchdog);
+            opened();
             console.log('My peer ID is: ' + id);
             this.myPeerId = id;
             if (this.isHost) {
@@ -445,7 +579,11 @@ class SequenceGame {
         this.peer.on('disconnected', () => {
             console.log("Disconnected from signaling server. Reconnecting...");
             ui.status.innerText = "Connection lost. Reconnecting...";
-            this.peer.reconnect();
+            // Jittered, so a broker restart is not met by every client at once
+            const peer = this.peer;
+            setTimeout(() => {
+                if (!peer.destroyed && peer.disconnected) peer.reconnect();
+            }, Math.random() * RECONNECT_BASE_MS);
         });
 
         if (this.isHost) {
@@ -456,11 +594,12 @@ class SequenceGame {
 
         this.peer.on('error', (err) => {
             const errStr = String(err);
+            this.perf.count(`peer:error:${err.type}`);
             if (err.type === 'peer-unavailable' || errStr.includes('Could not connect to peer')) {
                 console.log("Peer unavailable (expected during reconnection):", errStr);
                 if (!this.isHost) {
                     ui.status.innerText = "Waiting for host...";
-                    setTimeout(() => this.attemptReconnect(), 5000);
+                    this.scheduleReconnect('peer-unavailable');
                 }
                 return;
             }
@@ -468,7 +607,7 @@ class SequenceGame {
             console.error("PeerJS Network Error:", err);
             if (!this.isHost) {
                 ui.status.innerText = "Network error: " + err.type;
-                setTimeout(() => this.attemptReconnect(), 5000);
+                this.scheduleReconnect('network-error');
             } else {
                 if (err.type === 'identity-taken') {
                     if (this.isHost && this.hostStateBackup && this._takeoverRetries < 5) {
@@ -572,7 +711,7 @@ class SequenceGame {
             this.sequenceGrid = Array(10).fill(null).map(() => Array(10).fill(false));
             this.lockedSequences = [];
             this.lastMove = data.lastMove || null;
-            if (this.ui && this.ui.seqLines) this.ui.seqLines.innerHTML = '';
+            if (this.ui) this.redrawSequenceLines();
             document.getElementById('game-over-overlay').style.display = 'none';
             document.getElementById('play-again-waiting').style.display = 'none';
 
@@ -655,7 +794,9 @@ class SequenceGame {
             this.showEmojiFloat(data);
             if (this.isHost) this.broadcast('emoji', data, peerId);
         } else if (type === 'hostStateBackup') {
-            if (!this.isHost) {
+            // Versions only grow, so a backup overtaken in flight is ignored
+            const stale = data && this.hostStateBackup && (data.version || 0) < (this.hostStateBackup.version || 0);
+            if (!this.isHost && !stale) {
                 this.hostStateBackup = data;
                 // Persistent backup for takeover stability
                 const roomID = window.location.hash.substring(1);
@@ -677,20 +818,23 @@ class SequenceGame {
 
         console.log("Connecting to host:", hostID);
         const newConn = this.peer.connect(hostID, { reliable: true });
+        const connected = this.perf.start('peer.connect');
 
         const handshakeTimeout = setTimeout(() => {
             this._connectingToHost = false;
             if (newConn && !newConn.open) {
                 console.warn("Host connection handshake timed out (5s). Retrying...");
+                this.perf.count('peer:handshake-timeout');
                 newConn.close();
-                this.attemptReconnect();
+                this.scheduleReconnect('handshake-timeout');
             }
         }, 5000);
 
         newConn.on('open', () => {
             clearTimeout(handshakeTimeout);
+            connected();
             this._connectingToHost = false;
-            this._reconnectAttempts = 0;
+            this.resetReconnect();
             const warningEl = document.getElementById('host-dropped-warning');
             if (warningEl) warningEl.style.display = 'none';
         });
@@ -698,7 +842,7 @@ class SequenceGame {
         newConn.on('error', (err) => {
             console.error("Host connection error:", err);
             this._connectingToHost = false;
-            this.attemptReconnect();
+            this.scheduleReconnect('host-error');
         });
 
         newConn.on('close', () => {
@@ -709,6 +853,42 @@ class SequenceGame {
         this.setupConnection(newConn);
     }
 
+    // Retries back off with decorrelated jitter: each wait is random between the
+    // base and three times the previous one, capped. Clients that lost the same
+    // host (or server) together spread out instead of retrying in lockstep, and
+    // however many triggers fire (close, error, timeout) one retry is pending.
+    // `soon` restarts the backoff, for signals that are not shared by every
+    // client, like this tab becoming visible again.
+    scheduleReconnect(reason, soon = false) {
+        this.perf.count(`reconnect:${reason}`);
+        if (soon && this.reconnectDelay > RECONNECT_BASE_MS) {
+            clearTimeout(this.reconnectTimer);
+            this.reconnectTimer = null;
+            this.reconnectDelay = 0;
+        }
+        if (this.reconnectTimer) return;
+        const prev = this.reconnectDelay || RECONNECT_BASE_MS;
+        this.reconnectDelay = Math.min(RECONNECT_CAP_MS,
+            RECONNECT_BASE_MS + Math.random() * (3 * prev - RECONNECT_BASE_MS));
+        // Never sleep through this client's turn to take over as host
+        const delay = this.takeoverAt
+            ? Math.min(this.reconnectDelay, Math.max(0, this.takeoverAt - Date.now()))
+            : this.reconnectDelay;
+        this.reconnectTimer = setTimeout(() => {
+            this.reconnectTimer = null;
+            this.attemptReconnect();
+        }, delay);
+    }
+
+    resetReconnect() {
+        clearTimeout(this.reconnectTimer);
+        this.reconnectTimer = null;
+        this.reconnectDelay = 0;
+        this.hostLostAt = null;
+        this.takeoverAt = null;
+        this._reconnectAttempts = 0;
+    }
+
     attemptReconnect() {
         if (this._reconnecting) return;
         this._reconnecting = true;
@@ -733,6 +913,8 @@ class SequenceGame {
 
             // Track reconnect attempts to show Take Over button
             this._reconnectAttempts = (this._reconnectAttempts || 0) + 1;
+            this.hostLostAt = this.hostLostAt || Date.now();
+            const lostFor = Date.now() - this.hostLostAt;
 
             if (timerEl) {
                 timerEl.innerText = `Attempting to reconnect (${this._reconnectAttempts})...`;
@@ -748,22 +930,24 @@ class SequenceGame {
                 const otherPeers = [...this.allPeers].filter(p => p !== this.lastHostId && p !== 'HOST' && p !== '').sort();
                 const myRank = otherPeers.indexOf(currentId);
 
-                // Staggered takeover: Successor 0 waits ~10s (2 attempts), Successor 1 waits ~20s (4 attempts), etc.
-                const attemptsToWait = (myRank + 1) * 2;
+                // Staggered takeover: Successor 0 waits ~10s, Successor 1 waits ~20s, etc.
+                // Timed from losing the host, since backoff makes attempts uneven
+                const waitMs = (myRank + 1) * TAKEOVER_STEP_MS;
 
-                console.log(`Successor Rank: ${myRank}. Attempts: ${this._reconnectAttempts}/${attemptsToWait}`);
+                console.log(`Successor Rank: ${myRank}. Host lost ${Math.round(lostFor / 1000)}s/${waitMs / 1000}s`);
 
-                if (myRank !== -1 && this._reconnectAttempts >= attemptsToWait) {
+                if (myRank !== -1 && lostFor >= waitMs) {
                     console.log(`Auto-takeover triggered (Rank: ${myRank}, ID: ${currentId}, Attempt: ${this._reconnectAttempts})`);
                     this.takeOverAsHost();
                     return; // Stop reconnect flow
                 } else if (myRank !== -1) {
-                    timerEl.innerText += ` (Auto-takeover in ${attemptsToWait - this._reconnectAttempts}...)`;
+                    this.takeoverAt = this.hostLostAt + waitMs;
+                    timerEl.innerText += ` (Auto-takeover in ${Math.ceil((waitMs - lostFor) / 1000)}s...)`;
                 }
             }
 
-            // FALLBACK: Room lost if too many attempts
-            if (this._reconnectAttempts >= MAX_RECONNECT_ATTEMPTS) {
+            // FALLBACK: Room lost if the host stays away too long
+            if (lostFor >= ROOM_LOST_MS) {
                 this.handleRoomLost();
                 return;
             }
@@ -817,7 +1001,7 @@ class SequenceGame {
         this.isHost = true;
         this._reconnecting = false;
         this._connectingToHost = false;
-        this._reconnectAttempts = 0;
+        this.resetReconnect();
         this._takeoverRetries = 0; // Reset retries
 
         // CRITICAL: Reset networking state for fresh host role
@@ -841,7 +1025,7 @@ class SequenceGame {
         console.warn("Reconnection threshold reached. Room marked as lost.");
         this.started = false;
         this._reconnecting = false;
-        this._reconnectAttempts = 0;
+        this.resetReconnect();
 
         if (this.peer && !this.peer.destroyed) {
             this.peer.destroy();
@@ -901,8 +1085,15 @@ class SequenceGame {
         });
 
         conn.on('data', (payload) => {
-            if (payload && payload.type) {
-                this.handleData(payload.type, payload.data, conn.peer);
+            if (!payload || !payload.type) return;
+            // Messages queued in the same tick arrive as one batch, in order
+            const messages = payload.type === 'batch' && Array.isArray(payload.data) ? payload.data : [payload];
+            for (const msg of messages) {
+                if (!msg || !msg.type) continue;
+                this.perf.count(`in:${msg.type}`);
+                const done = this.perf.start(`handleData:${msg.type}`);
+                this.handleData(msg.type, msg.data, conn.peer);
+                done();
             }
         });
 
@@ -918,14 +1109,14 @@ class SequenceGame {
                 }
             } else {
                 if (ui) ui.status.innerText = "Connection lost. Attempting reconnect...";
-                this.attemptReconnect();
+                this.scheduleReconnect('host-closed');
             }
         });
 
         conn.on('error', (err) => {
             console.error("Connection error:", err);
             if (!this.isHost) {
-                this.attemptReconnect();
+                this.scheduleReconnect('connection-error');
             }
         });
     }
@@ -933,9 +1124,9 @@ class SequenceGame {
     sendTo(peerId, type, data) {
         if (this.isSinglePlayer) return;
         if (this.connections[peerId] && this.connections[peerId].open) {
-            this.connections[peerId].send({ type, data });
+            this.enqueue(this.connections[peerId], type, data);
         } else if (!this.isHost && this.hostConnection && this.hostConnection.open) {
-            this.hostConnection.send({ type, data });
+            this.enqueue(this.hostConnection, type, data);
         }
 
     }
@@ -950,10 +1141,43 @@ class SequenceGame {
             }
         } else {
             if (this.hostConnection && this.hostConnection.open) {
-                this.hostConnection.send({ type, data });
+                this.enqueue(this.hostConnection, type, data);
+            }
+        }
+
+    }
+
+    // Messages for one connection produced in the same tick (a relayed move,
+    // the sync after it, a state backup...) go out as a single batch once
+    // the current task is done; a superseded full-state message is dropped.
+    enqueue(conn, type, data) {
+        let queue = this.outbox.get(conn);
+        if (!queue) {
+            queue = [];
+            this.outbox.set(conn, queue);
+        } else if (SUPERSEDED_MESSAGES.has(type)) {
+            const i = queue.findIndex(msg => msg.type === type);
+            if (i !== -1) {
+                queue.splice(i, 1);
+                this.perf.count(`drop:${type}`);
             }
         }
+        queue.push({ type, data });
+        this.perf.count(`out:${type}`);
+        if (!this.outboxFlushQueued) {
+            this.outboxFlushQueued = true;
+            queueMicrotask(() => this.flushOutbox());
+        }
+    }
 
+    flushOutbox() {
+        this.outboxFlushQueued = false;
+        this.outbox.forEach((queue, conn) => {
+            if (!conn.open) return;
+            this.perf.count('out:frame');
+            conn.send(queue.length === 1 ? queue[0] : { type: 'batch', data: queue });
+        });
+        this.outbox.clear();
     }
 
     sendEmoji(emoji) {
@@ -1018,20 +1242,7 @@ class SequenceGame {
         assignments.push({ peerId: null, playerID: this.playerID, color: colors[0], name: this.myName || 'Host' });
 
         if (this.isSinglePlayer) {
-            // Add automated computers for remaining teams
-            for (let i = 1; i < this.teamCount; i++) {
-                const botId = `bot-${i}`;
-                const botPeer = `COMPUTER_${i}`;
-                assignments.push({
-                    peerId: botPeer,
-                    playerID: botId,
-                    color: colors[i],
-                    name: 'Computer'
-                });
-                this.peerNames[botPeer] = 'Computer';
-                this.playerIDMap[botPeer] = botId;
-            }
-            this.peers = assignments.filter(a => a.peerId).map(a => a.peerId);
+            this.addComputerPlayers(assignments, colors);
         } else {
             this.peers.forEach((pid, i) => {
                 assignments.push({
@@ -1064,7 +1275,7 @@ class SequenceGame {
         this.sequenceGrid = Array(10).fill(null).map(() => Array(10).fill(false));
         this.lockedSequences = [];
         this.lastMove = null;
-        if (this.ui && this.ui.seqLines) this.ui.seqLines.innerHTML = '';
+        if (this.ui) this.redrawSequenceLines();
 
         // Host setup
         const hostState = this.playerStates[this.playerID];
@@ -1179,13 +1390,15 @@ class SequenceGame {
         // Preserve the SVG if it exists
         const svg = ui.seqLines || document.getElementById('sequence-lines');
 
-        if (!forceFullRedraw && !animateEntrance && ui.board.querySelectorAll('.cell').length === 100) {
+        if (!forceFullRedraw && !animateEntrance && this.cellEls && this.cellEls[0].cell.parentNode === ui.board) {
             this.syncBoardState();
             return;
         }
 
+        const done = this.perf.start('renderBoard');
         ui.board.innerHTML = '';
         if (svg) ui.board.appendChild(svg);
+        this.cellEls = [];
 
         for (let r = 0; r < 10; r++) {
             for (let c = 0; c < 10; c++) {
@@ -1226,8 +1439,9 @@ class SequenceGame {
                     cell.appendChild(simpleCard);
                 }
 
+                let chipEl = null;
                 if (chip) {
-                    const chipEl = document.createElement('div');
+                    chipEl = document.createElement('div');
                     const isLocked = this.sequenceGrid && this.sequenceGrid[r][c];
                     chipEl.className = `chip ${chip}${isLocked ? ' locked' : ''}`;
                     cell.appendChild(chipEl);
@@ -1235,8 +1449,13 @@ class SequenceGame {
 
                 cell.onclick = () => this.handleCellClick(r, c);
                 ui.board.appendChild(cell);
+                this.cellEls.push({ cell, chip: chipEl, cellClass: cell.className, chipClass: chipEl ? chipEl.className : '' });
             }
         }
+        // The last-move marker is left for the next sync, as before
+        this.painted = { ...this.paintState(), lastMove: -1 };
+        this.dirtyCells.clear();
+        done();
     }
 
     calculateCellClass(r, c) {
@@ -1252,182 +1471,338 @@ class SequenceGame {
             const hoveredCard = this.hoveredCardIndex !== null ? this.hand[this.hoveredCardIndex] : null;
             if ((val === selectedCard || val === hoveredCard) && !chip) highlight = ' highlight-hint';
         }
+        if (highlight && !chip && this.hintsEnabled) highlight += this.threatClass(r * 10 + c);
 
         return `${val === 'FREE' ? ' free' : ''}${highlight}`;
     }
 
+    // What cell and chip classes depend on besides the chips themselves
+    paintState() {
+        const hintCards = [];
+        if (this.hintsEnabled && !this.jackMode && this.hand) {
+            if (this.selectedCardIndex !== null) hintCards.push(this.hand[this.selectedCardIndex]);
+            if (this.hoveredCardIndex !== null) hintCards.push(this.hand[this.hoveredCardIndex]);
+        }
+        return {
+            chips: this.chips,
+            sequenceGrid: this.sequenceGrid,
+            myColor: this.myColor,
+            jackMode: this.jackMode,
+            hintCards,
+            lastMove: this.lastMove ? this.lastMove.r * 10 + this.lastMove.c : -1
+        };
+    }
+
+    markCellDirty(r, c) {
+        this.dirtyCells.add(r * 10 + c);
+    }
+
+    setChip(r, c, color) {
+        const card = this.board[r][c];
+        if (this.openCellsFor === this.chips && card in this.openCells) {
+            this.openCells[card] += !!this.chips[r][c] - !!color;
+        }
+        if (this.threatsFor === this.chips) {
+            // Gaps whose threat status may change get repainted with the cell
+            const through = WINDOWS_THROUGH[r * 10 + c];
+            through.forEach(w => this.dirtyCells.add(this.countThreat(w, -1)));
+            this.chips[r][c] = color;
+            through.forEach(w => this.dirtyCells.add(this.countThreat(w, 1)));
+            this.dirtyCells.delete(-1);
+        } else {
+            this.chips[r][c] = color;
+        }
+        this.markCellDirty(r, c);
+    }
+
+    // Cells a jack mode highlights: opponents' chips (one-eye) or empty cells (two-eye)
+    markJackCells(mode) {
+        if (!mode) return;
+        for (let i = 0; i < 100; i++) {
+            const chip = this.chips[Math.floor(i / 10)][i % 10];
+            if (mode === 'one-eye' ? chip && chip !== this.myColor : !chip && this.board[Math.floor(i / 10)][i % 10] !== 'FREE') {
+                this.dirtyCells.add(i);
+            }
+        }
+    }
+
+    // Repaint only the cells touched since the last sync: moves mark their
+    // cells, and last-move, jack-mode and hint changes are diffed here.
     syncBoardState() {
-        const ui = this.ui;
-        for (let r = 0; r < 10; r++) {
-            for (let c = 0; c < 10; c++) {
-                const cell = document.getElementById(`cell-${r}-${c}`);
-                if (!cell) continue;
-                const chip = this.chips[r][c];
+        if (!this.cellEls) return;
+        const done = this.perf.start('syncBoardState');
+        const now = this.paintState();
+        const was = this.painted;
+        const dirty = this.dirtyCells;
+
+        if (!was || now.chips !== was.chips || now.sequenceGrid !== was.sequenceGrid || now.myColor !== was.myColor) {
+            for (let i = 0; i < 100; i++) dirty.add(i); // state was replaced wholesale
+        } else {
+            if (now.lastMove !== was.lastMove) {
+                if (was.lastMove >= 0) dirty.add(was.lastMove);
+                if (now.lastMove >= 0) dirty.add(now.lastMove);
+            }
+            if (now.jackMode !== was.jackMode) {
+                this.markJackCells(was.jackMode);
+                this.markJackCells(now.jackMode);
+            }
+            if (now.hintCards.join() !== was.hintCards.join()) {
+                [...was.hintCards, ...now.hintCards].forEach(card => (CARD_CELLS[card] || []).forEach(i => dirty.add(i)));
+            }
+        }
+        this.painted = now;
 
-                const targetClass = `cell ${this.calculateCellClass(r, c)}`;
-                if (cell.className !== targetClass) cell.className = targetClass;
+        dirty.forEach(i => this.paintCell(i));
+        dirty.clear();
+        done();
+    }
 
-                let chipEl = cell.querySelector('.chip');
-                if (chip) {
-                    if (!chipEl) {
-                        chipEl = document.createElement('div');
-                        cell.appendChild(chipEl);
-                    }
-                    const isLastMove = this.lastMove && this.lastMove.r === r && this.lastMove.c === c;
-                    const isLocked = this.sequenceGrid && this.sequenceGrid[r][c];
-                    const chipClass = `chip ${chip}${isLastMove ? ' last-move' : ''}${isLocked ? ' locked' : ''}`;
-                    if (chipEl.className !== chipClass) chipEl.className = chipClass;
-                } else if (chipEl) {
-                    chipEl.remove();
-                }
+    paintCell(i) {
+        const r = Math.floor(i / 10), c = i % 10;
+        const el = this.cellEls[i];
+        const chip = this.chips[r][c];
+
+        const cellClass = `cell ${this.calculateCellClass(r, c)}`;
+        if (el.cellClass !== cellClass) el.cell.className = el.cellClass = cellClass;
+
+        if (chip) {
+            if (!el.chip) {
+                el.chip = document.createElement('div');
+                el.cell.appendChild(el.chip);
+                el.chipClass = '';
             }
+            const isLastMove = this.lastMove && this.lastMove.r === r && this.lastMove.c === c;
+            const isLocked = this.sequenceGrid && this.sequenceGrid[r][c];
+            const chipClass = `chip ${chip}${isLastMove ? ' last-move' : ''}${isLocked ? ' locked' : ''}`;
+            if (el.chipClass !== chipClass) el.chip.className = el.chipClass = chipClass;
+        } else if (el.chip) {
+            el.chip.remove();
+            el.chip = null;
+            el.chipClass = '';
         }
     }
 
     renderHand(animate = false) {
         const ui = this.ui;
         if (!ui.hand) return;
-        ui.hand.innerHTML = '';
+        // Card elements are keyed by card (plus '#2' for a second copy) and
+        // reused across renders; only moved, restyled, added or removed ones
+        // touch the DOM. Dealing starts from fresh elements so it animates.
+        if (animate) {
+            ui.hand.innerHTML = '';
+            this.handEls.clear();
+        }
+        const previous = this.handEls;
+        const current = this.spareHandEls;
         let hasAnyDead = false;
-        this.hand.forEach((card, index) => {
-            const isOneEye = ONE_EYE.has(card);
-            const isTwoEye = TWO_EYE.has(card);
-            let isDead = false;
-
-            if (!isOneEye && !isTwoEye && this.board && this.chips) {
-                isDead = true;
-                for (let r = 0; r < 10; r++) {
-                    for (let c = 0; c < 10; c++) {
-                        if (this.board[r][c] === card && this.chips[r][c] === null) {
-                            isDead = false;
-                            break;
-                        }
-                    }
-                    if (!isDead) break;
-                }
-                if (isDead) hasAnyDead = true;
-            }
 
-            const cardEl = document.createElement('div');
+        this.hand.forEach((card, index) => {
+            let key = card;
+            for (let n = 2; current.has(key); n++) key = `${card}#${n}`;
+            const entry = previous.get(key) || this.createHandCard(card);
+            previous.delete(key);
+            current.set(key, entry);
+            entry.index = index;
+
+            const isDead = this.isDeadCard(card);
+            if (isDead) hasAnyDead = true;
             if (this.selectedCardIndex === index) {
                 this.selectedIsDead = isDead;
             }
 
-            cardEl.className = [
-                'card',
-                this.selectedCardIndex === index ? 'selected' : '',
-                isOneEye ? 'jack-one-eye' : '',
-                isTwoEye ? 'jack-two-eye' : '',
-                isDead ? 'dead-card' : '',
-                animate ? 'dealing' : '',
-                (this.newCardIndex === index) ? 'card-drawn' : ''
-            ].filter(Boolean).join(' ');
+            let className = 'card';
+            if (this.selectedCardIndex === index) className += ' selected';
+            if (ONE_EYE.has(card)) className += ' jack-one-eye';
+            if (TWO_EYE.has(card)) className += ' jack-two-eye';
+            if (isDead) className += ' dead-card';
+            if (animate) className += ' dealing';
+            if (this.newCardIndex === index) className += ' card-drawn';
+            if (entry.className !== className) {
+                entry.el.className = className;
+                entry.className = className;
+            }
 
             if (animate) {
-                cardEl.style.animationDelay = `${index * 0.1}s`;
+                entry.el.style.animationDelay = `${index * 0.1}s`;
             }
 
-            const img = document.createElement('img');
-            img.src = getCardImagePath(card);
-            img.className = 'hand-card-img';
-            cardEl.appendChild(img);
-
-            if (isOneEye || isTwoEye) {
-                const badge = document.createElement('span');
-                badge.className = 'jack-badge';
-                badge.innerText = isOneEye ? '👁' : '👁👁';
-                cardEl.appendChild(badge);
-            } else if (isDead) {
-                const badge = document.createElement('span');
-                badge.className = 'dead-badge';
-                badge.innerText = '💀';
-                cardEl.appendChild(badge);
+            if (entry.dead !== isDead) {
+                entry.dead = isDead;
+                if (isDead) {
+                    if (!entry.deadBadge) {
+                        entry.deadBadge = document.createElement('span');
+                        entry.deadBadge.className = 'dead-badge';
+                        entry.deadBadge.innerText = '💀';
+                    }
+                    entry.el.appendChild(entry.deadBadge);
+                } else {
+                    entry.deadBadge.remove();
+                }
             }
+        });
 
-            cardEl.onpointerdown = (e) => {
-                if (this.currentTurn !== this.myColor) return;
-                // prevent selection ghosting/drag
-                if (e.pointerType === 'touch') e.preventDefault();
-
-                // Check if card is dead (no empty spots left on the board)
-                if (!isOneEye && !isTwoEye) {
-                    let dead = true;
-                    for (let r = 0; r < 10; r++) {
-                        for (let c = 0; c < 10; c++) {
-                            if (this.board[r][c] === card && this.chips[r][c] === null) {
-                                dead = false;
-                                break;
-                            }
-                        }
-                        if (!dead) break;
-                    }
+        // Drop cards that left the hand first, so the survivors mostly stay put
+        previous.forEach(entry => entry.el.remove());
+        previous.clear();
+        current.forEach(entry => {
+            const at = ui.hand.children[entry.index];
+            if (at !== entry.el) ui.hand.insertBefore(entry.el, at || null);
+        });
+        this.handEls = current;
+        this.spareHandEls = previous;
 
-                    if (dead) {
-                        if (this.exchangedThisTurn) {
-                            this.log("⚠ Already exchanged a dead card this turn.");
-                            return;
-                        }
+        this.hasDeadCards = hasAnyDead;
+        this.updateJackHint();
+        this.newCardIndex = null; // Reset after render
+    }
 
-                        const newCard = this.deck.length > 0 ? this.deck.shift() : null;
-                        this.hand.splice(index, 1);
-                        if (newCard) this.hand.push(newCard);
-
-                        const rank = card.slice(0, -1);
-                        const suit = card.slice(-1);
-                        const cardName = rank + SUITS[suit];
-
-                        this.log(`♻️ Exchanged dead card: ${cardName}`);
-                        this.exchangedThisTurn = true;
-
-                        if (this.sendMove) {
-                            this.sendMove({
-                                row: 0, col: 0,
-                                color: this.myColor,
-                                moveType: 'exchange',
-                                drew: newCard !== null,
-                                nextTurn: this.myColor, // Still my turn
-                                cardName
-                            });
-                        }
+    createHandCard(card) {
+        const isOneEye = ONE_EYE.has(card);
+        const isTwoEye = TWO_EYE.has(card);
+        const entry = { card, index: -1, el: document.createElement('div'), className: '', dead: false, deadBadge: null };
+
+        const img = document.createElement('img');
+        img.src = getCardImagePath(card);
+        img.className = 'hand-card-img';
+        entry.el.appendChild(img);
+
+        if (isOneEye || isTwoEye) {
+            const badge = document.createElement('span');
+            badge.className = 'jack-badge';
+            badge.innerText = isOneEye ? '👁' : '👁👁';
+            entry.el.appendChild(badge);
+        }
 
-                        this.selectedCardIndex = null;
-                        this.jackMode = null;
-                        this.renderHand();
-                        this.renderBoard();
-                        this.updateJackHint();
-                        // Turn continues
-                        return;
-                    }
-                }
+        entry.el.onpointerdown = (e) => this.onHandCardPointerDown(entry, e);
 
-                this.selectedCardIndex = index;
-                this.jackMode = isOneEye ? 'one-eye' : isTwoEye ? 'two-eye' : null;
-                this.renderHand();
-                this.renderBoard();
-                this.updateJackHint();
-            };
+        entry.el.onpointerenter = () => {
+            this.hoveredCardIndex = entry.index;
+            if (this.hintsEnabled) {
+                this.syncBoardState();
+            }
+        };
 
-            cardEl.onpointerenter = () => {
-                this.hoveredCardIndex = index;
+        entry.el.onpointerleave = () => {
+            if (this.hoveredCardIndex === entry.index) {
+                this.hoveredCardIndex = null;
                 if (this.hintsEnabled) {
                     this.syncBoardState();
                 }
-            };
+            }
+        };
+        return entry;
+    }
 
-            cardEl.onpointerleave = () => {
-                if (this.hoveredCardIndex === index) {
-                    this.hoveredCardIndex = null;
-                    if (this.hintsEnabled) {
-                        this.syncBoardState();
-                    }
+    onHandCardPointerDown(entry, e) {
+        const { card, index } = entry;
+        const isOneEye = ONE_EYE.has(card);
+        const isTwoEye = TWO_EYE.has(card);
+
+        if (this.currentTurn !== this.myColor) return;
+        // prevent selection ghosting/drag
+        if (e.pointerType === 'touch') e.preventDefault();
+
+        // Dead card: no empty cell showing it is left on the board
+        if (!isOneEye && !isTwoEye) {
+            const dead = this.openCellCount(card) === 0;
+            if (dead) {
+                if (this.exchangedThisTurn) {
+                    this.log("⚠ Already exchanged a dead card this turn.");
+                    return;
                 }
-            };
 
-            ui.hand.appendChild(cardEl);
-        });
-        this.hasDeadCards = hasAnyDead;
+                const newCard = this.deck.length > 0 ? this.deck.shift() : null;
+                this.hand.splice(index, 1);
+                if (newCard) this.hand.push(newCard);
+
+                const rank = card.slice(0, -1);
+                const suit = card.slice(-1);
+                const cardName = rank + SUITS[suit];
+
+                this.log(`♻️ Exchanged dead card: ${cardName}`);
+                this.exchangedThisTurn = true;
+
+                if (this.sendMove) {
+                    this.sendMove({
+                        row: 0, col: 0,
+                        color: this.myColor,
+                        moveType: 'exchange',
+                        drew: newCard !== null,
+                        nextTurn: this.myColor, // Still my turn
+                        cardName
+                    });
+                }
+
+                this.selectedCardIndex = null;
+                this.jackMode = null;
+                this.renderHand();
+                this.renderBoard();
+                this.updateJackHint();
+                // Turn continues
+                return;
+            }
+        }
+
+        this.selectedCardIndex = index;
+        this.jackMode = isOneEye ? 'one-eye' : isTwoEye ? 'two-eye' : null;
+        this.renderHand();
+        this.renderBoard();
         this.updateJackHint();
-        this.newCardIndex = null; // Reset after render
+    }
+
+    // Empty cells showing `card`, counted once per chips array and kept
+    // current by setChip, so dead-card checks never scan the board
+    openCellCount(card) {
+        if (this.openCellsFor !== this.chips) {
+            this.openCells = {};
+            for (const name in CARD_CELLS) {
+                this.openCells[name] = CARD_CELLS[name].filter(i => !this.chips[Math.floor(i / 10)][i % 10]).length;
+            }
+            this.openCellsFor = this.chips;
+        }
+        return this.openCells[card] || 0;
+    }
+
+    // Per team, how many open windows (no other team's chip) have cell i as
+    // their only gap: a chip of that color there makes five. Built once per
+    // chips array and kept current by setChip through the windows touching
+    // the changed cell; engine/threats.py keeps the same map for the AI.
+    threatMap() {
+        if (this.threatsFor !== this.chips) {
+            this.threats = {};
+            TEAM_COLORS.forEach(color => { this.threats[color] = new Uint8Array(100); });
+            this.threatsFor = this.chips;
+            SEQ_WINDOWS.forEach((_, w) => this.countThreat(w, 1));
+        }
+        return this.threats;
+    }
+
+    // Add (sign 1) or retract (-1) window w's completing cell; returns it, or -1
+    countThreat(w, sign) {
+        let owner = null, gap = -1;
+        for (const { r, c } of SEQ_WINDOWS[w]) {
+            if (this.board[r][c] === 'FREE') continue;
+            const chip = this.chips[r][c];
+            if (!chip) {
+                if (gap !== -1) return -1;
+                gap = r * 10 + c;
+            } else if (!owner) owner = chip;
+            else if (chip !== owner) return -1;
+        }
+        if (gap === -1 || !owner) return -1;
+        this.threats[owner][gap] += sign;
+        return gap;
+    }
+
+    // ' hint-win' when playing cell i completes five for us, ' hint-block' when it stops an opponent's
+    threatClass(i) {
+        const threats = this.threatMap();
+        if (threats[this.myColor] && threats[this.myColor][i]) return ' hint-win';
+        return TEAM_COLORS.some(color => color !== this.myColor && threats[color][i]) ? ' hint-block' : '';
+    }
+
+    isDeadCard(card) {
+        return !ONE_EYE.has(card) && !TWO_EYE.has(card) && this.openCellCount(card) === 0;
     }
 
 
@@ -1507,7 +1882,7 @@ class SequenceGame {
         }
 
         // Apply locally
-        this.chips[r][c] = moveType === 'place' ? this.myColor : null;
+        this.setChip(r, c, moveType === 'place' ? this.myColor : null);
         if (moveType === 'place') {
             this.lastMove = { r, c };
         } else if (moveType === 'remove') {
@@ -1569,18 +1944,20 @@ class SequenceGame {
 
     checkAndTriggerAITurn() {
         if (this.isSinglePlayer && this.currentTurn) {
-            const playerState = Object.values(this.playerStates).find(s => s.color === this.currentTurn);
-            if (playerState && playerState.peerId && playerState.peerId.startsWith('COMPUTER_')) {
-                // Clear any existing timeout to prevent overlapping turns
-                if (this.aiTurnTimeout) clearTimeout(this.aiTurnTimeout);
-
-                this.aiTurnTimeout = setTimeout(() => {
-                    this.playAITurn();
-                }, 1000); // 1s thinking delay
-            }
+            this.loadAI().then(() => this.scheduleAITurn());
         }
     }
 
+    // The computer player lives in ai.js, fetched the first time single-player is chosen
+    loadAI() {
+        if (!this.aiLoaded) {
+            this.aiLoaded = import('./ai.js').then(mod => {
+                Object.assign(SequenceGame.prototype, mod.aiMethods);
+            });
+        }
+        return this.aiLoaded;
+    }
+
     applyOpponentMove(data, peerId) {
         const { row, col, color, moveType, drew, cardName, nextTurn, newHand } = data;
 
@@ -1603,7 +1980,9 @@ class SequenceGame {
             return; // Turn continues for them
         }
 
-        this.chips[row][col] = moveType === 'place' ? color : null;
+        this.setChip(row, col, moveType === 'place' ? color : null);
+        // Cells the server reports as changed (game.changed_cells in the engine)
+        if (data.changed) data.changed.forEach(i => this.dirtyCells.add(i));
         if (drew && !newHand && this.deck.length > 0) this.deck.shift();
 
         const name = (this.colorNames && this.colorNames[color]) || color;
@@ -1617,26 +1996,28 @@ class SequenceGame {
     // SEQUENCE DETECTION
     // ══════════════════════════════════════
     checkSequences() {
+        const done = this.perf.start('checkSequences');
         let updated = false;
         const colors = TEAM_COLORS.slice(0, this.teamCount);
 
-        // Rebuild sequenceGrid from locked sequences
-        this.sequenceGrid = Array(10).fill(null).map(() => Array(10).fill(false));
-        this.lockedSequences.forEach(ls => {
-            ls.cells.forEach(cell => {
-                this.sequenceGrid[cell.r][cell.c] = true;
+        if (!this.sequenceGrid) {
+            this.sequenceGrid = Array(10).fill(null).map(() => Array(10).fill(false));
+            this.lockedSequences.forEach(ls => {
+                ls.cells.forEach(cell => {
+                    this.sequenceGrid[cell.r][cell.c] = true;
+                });
             });
-        });
+        }
 
         const winTarget = this.winTarget || (this.teamCount === 3 ? 1 : 2);
         const newlyFormed = [];
 
-        for (const color of colors) {
-            const lockedCount = this.lockedSequences.filter(ls => ls.color === color).length;
-            const result = this.countSequencesForColor(color);
+        // Only the chip just placed can complete a new sequence (removals never do)
+        const changed = this.lastMove;
+        const color = changed ? this.chips[changed.r][changed.c] : null;
 
-            // Only newly found sequences (beyond what's locked) are new
-            const newSeqs = result.sequences.slice(lockedCount);
+        if (color && colors.includes(color)) {
+            const newSeqs = this.findNewSequencesAt(changed.r, changed.c, color);
 
             if (newSeqs.length > 0) {
                 // Lock new sequences permanently
@@ -1644,8 +2025,10 @@ class SequenceGame {
                     this.lockedSequences.push({ color, cells: seq });
                     seq.forEach(cell => {
                         this.sequenceGrid[cell.r][cell.c] = true;
+                        this.markCellDirty(cell.r, cell.c);
                     });
                 });
+                this.syncBoardState();
 
                 this.sequences[color] = this.lockedSequences.filter(ls => ls.color === color).length;
                 this.log(`🎉 ${color} formed sequence #${this.sequences[color]}!`);
@@ -1672,23 +2055,56 @@ class SequenceGame {
             if (this.isHost) this.saveGameState();
         }
 
-        // Delayed UI line drawing from locked sequences only
-        this.redrawSequenceLines();
+        // Draw lines for sequences locked by this move only
+        this.drawNewSequenceLines();
+        done();
     }
 
     redrawSequenceLines() {
-        setTimeout(() => {
-            if (this.ui.seqLines) {
-                this.ui.seqLines.innerHTML = '';
-                this.lockedSequences.forEach(ls => {
-                    this.drawSequenceLine(ls.cells, ls.color);
-                });
-            }
-        }, 150);
+        if (!this.ui.seqLines) return;
+        this.ui.seqLines.replaceChildren();
+        this.drawnSequences = 0;
+        this.drawNewSequenceLines();
+    }
+
+    drawNewSequenceLines() {
+        // Lines are appended as sequences lock; only a replaced (shorter) list needs a full redraw
+        if (this.drawnSequences > this.lockedSequences.length) return this.redrawSequenceLines();
+        for (let i = this.drawnSequences; i < this.lockedSequences.length; i++) {
+            const ls = this.lockedSequences[i];
+            this.drawSequenceLine(ls.cells, ls.color);
+        }
+        this.drawnSequences = this.lockedSequences.length;
     }
 
+    // Marks the host state dirty. Saves requested within the same idle period
+    // (a move, its sequence check, the AI's reply...) collapse into one
+    // flushGameState; hiding or leaving the page flushes immediately.
     saveGameState() {
         if (!this.isHost || !this.started || !this.currentRoomId) return;
+        this.stateVersion++;
+        this.stateDirty = true;
+        this.perf.count('state:save');
+        if (this.saveHandle) return;
+        const flush = () => {
+            this.saveHandle = null;
+            this.flushGameState();
+        };
+        this.saveHandle = typeof requestIdleCallback === 'function'
+            ? { idle: requestIdleCallback(flush, { timeout: SAVE_IDLE_TIMEOUT_MS }) }
+            : { timer: setTimeout(flush, SAVE_FALLBACK_DELAY_MS) };
+    }
+
+    flushGameState() {
+        if (this.saveHandle) {
+            if (this.saveHandle.idle) cancelIdleCallback(this.saveHandle.idle);
+            else clearTimeout(this.saveHandle.timer);
+            this.saveHandle = null;
+        }
+        if (!this.stateDirty) return;
+        this.stateDirty = false;
+        if (!this.isHost || !this.started || !this.currentRoomId) return;
+        this.perf.count('state:flush');
         const state = {
             chips: this.chips,
             sequences: this.sequences,
@@ -1702,319 +2118,58 @@ class SequenceGame {
             started: this.started,
             lastMove: this.lastMove,
             sequenceGrid: this.sequenceGrid,
-            lockedSequences: this.lockedSequences
+            lockedSequences: this.lockedSequences,
+            version: this.stateVersion
         };
-        localStorage.setItem(`sequence_gameState_${this.currentRoomId}`, JSON.stringify(state));
+        const done = this.perf.start('flushGameState.stringify');
+        const json = JSON.stringify(state);
+        done();
+        localStorage.setItem(`sequence_gameState_${this.currentRoomId}`, json);
         this.broadcast('hostStateBackup', state);
     }
 
-    countSequencesForColor(color) {
-        if (!this.ui.seqLines) return { count: 0, sequences: [] };
-
-        const directions = [[0, 1], [1, 0], [1, 1], [1, -1]];
-        const grid = this.chips.map((row, r) =>
-            row.map((cell, c) => this.board[r][c] === 'FREE' ? color : cell)
-        );
-
-        // foundSequences is initialized below after pre-seeding locked sequences
-        let usedInSequence = Array(10).fill(null).map(() => Array(10).fill(false));
-
-        // Pre-seed with already-locked sequences for this color
-        const lockedForColor = (this.lockedSequences || []).filter(ls => ls.color === color);
-        lockedForColor.forEach(ls => {
-            ls.cells.forEach(cell => { usedInSequence[cell.r][cell.c] = true; });
-        });
-        let foundSequences = lockedForColor.map(ls => ls.cells); // Start with locked
-
-        for (let r = 0; r < 10; r++) {
-            for (let c = 0; c < 10; c++) {
-                for (const [dr, dc] of directions) {
-                    let cells = [];
-                    let possible = true;
-                    for (let i = 0; i < 5; i++) {
-                        const nr = r + i * dr, nc = c + i * dc;
-                        if (nr < 0 || nr >= 10 || nc < 0 || nc >= 10 || grid[nr][nc] !== color) {
-                            possible = false;
-                            break;
-                        }
-                        cells.push({ r: nr, c: nc });
-                    }
-
-                    if (possible) {
-                        let usedCount = 0;
-                        cells.forEach(cell => {
-                            // Corners (FREE) don't count towards the shared chip limit
-                            if (this.board[cell.r][cell.c] !== 'FREE' && usedInSequence[cell.r][cell.c]) {
-                                usedCount++;
-                            }
-                        });
-
-                        if (usedCount <= 1) { // Standard Sequence rule: max 1 shared non-corner chip
-                            foundSequences.push(cells);
-                            cells.forEach(cell => usedInSequence[cell.r][cell.c] = true);
-                        }
-                    }
+    findNewSequencesAt(r, c, color) {
+        // Sequences completed by the chip on (r, c). Every other window was already
+        // judged on an earlier move, so only the (at most 20) windows through this
+        // cell are visited, in full-scan order so overlapping windows resolve the same.
+        const claimed = new Set();
+        const found = [];
+
+        for (const id of WINDOWS_THROUGH[r * 10 + c]) {
+            const cells = SEQ_WINDOWS[id];
+            let complete = true;
+            let usedCount = 0;
+            for (const cell of cells) {
+                // Corners (FREE) count for everyone and never towards the shared chip limit
+                if (this.board[cell.r][cell.c] === 'FREE') continue;
+                if (this.chips[cell.r][cell.c] !== color) {
+                    complete = false;
+                    break;
                 }
+                if (this.sequenceGrid[cell.r][cell.c] || claimed.has(cell.r * 10 + cell.c)) usedCount++;
+            }
+
+            if (complete && usedCount <= 1) { // Standard Sequence rule: max 1 shared non-corner chip
+                found.push(cells.map(cell => ({ r: cell.r, c: cell.c })));
+                cells.forEach(cell => claimed.add(cell.r * 10 + cell.c));
             }
         }
 
-        return { count: foundSequences.length, sequences: foundSequences };
+        return found;
     }
 
     drawSequenceLine(cells, color) {
-        // Always re-query to ensure we have the live element in the board
-        const svg = document.getElementById('sequence-lines');
-        if (!svg) return;
-
-        // Cache the SVG bounding rect once outside the loop to prevent layout thrashing
-        const boardRect = svg.getBoundingClientRect();
-
-        const points = cells.map(pos => {
-            const cell = document.getElementById(`cell-${pos.r}-${pos.c}`);
-            if (!cell) return null;
-
-            // Getting bounding rect of each cell still causes slight layout thrashing, 
-            // but caching the boardRect above saves 5 iterations per sequence line.
-            const rect = cell.getBoundingClientRect();
-
-            const x = rect.left - boardRect.left + (rect.width / 2);
-            const y = rect.top - boardRect.top + (rect.height / 2);
-            return `${x},${y}`;
-        }).filter(p => p !== null).join(' ');
-
-        if (!points) return;
+        const svg = this.ui.seqLines;
+        if (!svg || !cells.length) return;
 
+        // The SVG's viewBox is the 10x10 grid, so cell centres need no layout reads
+        const points = cells.map(pos => `${pos.c + 0.5},${pos.r + 0.5}`).join(' ');
         const polyline = document.createElementNS("http://www.w3.org/2000/svg", "polyline");
         polyline.setAttribute("points", points);
         polyline.setAttribute("class", `sequence-line ${color}`);
         svg.appendChild(polyline);
     }
 
-    // ══════════════════════════════════════
-    // AI LOGIC
-    // ══════════════════════════════════════
-    playAITurn() {
-        if (this.aiTurnTimeout) {
-            clearTimeout(this.aiTurnTimeout);
-            this.aiTurnTimeout = null;
-        }
-
-        const colors = TEAM_COLORS.slice(0, this.teamCount);
-        const myColor = this.currentTurn;
-        const playerState = Object.values(this.playerStates).find(s => s.color === myColor);
-        if (!playerState || !playerState.peerId || !playerState.peerId.startsWith('COMPUTER_')) return;
-
-        const name = (this.colorNames && this.colorNames[myColor]) || 'Computer';
-        this.log(`🤔 ${name} is thinking...`);
-
-        const hand = playerState.hand;
-
-        let bestMove = null;
-        let bestScore = -Infinity;
-        let deadCardIndex = -1;
-
-        for (let i = 0; i < hand.length; i++) {
-            const card = hand[i];
-            const isOneEye = ONE_EYE.has(card);
-            const isTwoEye = TWO_EYE.has(card);
-
-            let possibleCells = [];
-
-            if (isOneEye) {
-                for (let r = 0; r < 10; r++) {
-                    for (let c = 0; c < 10; c++) {
-                        const chip = this.chips[r][c];
-                        if (chip && chip !== myColor && !this.isChipInSequence(r, c, chip)) {
-                            possibleCells.push({ r, c, type: 'remove' });
-                        }
-                    }
-                }
-            } else if (isTwoEye) {
-                for (let r = 0; r < 10; r++) {
-                    for (let c = 0; c < 10; c++) {
-                        if (this.board[r][c] !== 'FREE' && this.chips[r][c] === null) {
-                            possibleCells.push({ r, c, type: 'place' });
-                        }
-                    }
-                }
-            } else {
-                let dead = true;
-                for (let r = 0; r < 10; r++) {
-                    for (let c = 0; c < 10; c++) {
-                        if (this.board[r][c] === card && this.chips[r][c] === null) {
-                            possibleCells.push({ r, c, type: 'place' });
-                            dead = false;
-                        }
-                    }
-                }
-                if (dead) deadCardIndex = i;
-            }
-
-            for (const cell of possibleCells) {
-                const score = this.evaluateMove(cell.r, cell.c, cell.type, myColor);
-                const jitter = Math.random() * 0.1;
-                const finalScore = score + jitter;
-
-                if (finalScore > bestScore) {
-                    bestScore = finalScore;
-                    bestMove = { r: cell.r, c: cell.c, cardIndex: i, type: cell.type, cardName: card };
-                }
-            }
-        }
-
-        if (!bestMove) {
-            if (deadCardIndex !== -1) {
-                const newCard = this.deck.length > 0 ? this.deck.shift() : null;
-                const deadCard = hand[deadCardIndex];
-                hand.splice(deadCardIndex, 1);
-                if (newCard) hand.push(newCard);
-
-                const rank = deadCard.slice(0, -1);
-                const suit = deadCard.slice(-1);
-                this.log(`♻️ ${name} exchanged dead card: ${rank + SUITS[suit]}`);
-                this.checkAndTriggerAITurn();
-            } else {
-                this.log(`⚠ ${name} has no valid moves!`);
-                const nextIdx = (colors.indexOf(myColor) + 1) % colors.length;
-                this.currentTurn = colors[nextIdx];
-                this.updateTurnUI();
-                this.checkAndTriggerAITurn();
-            }
-            return;
-        }
-
-        const { r, c, cardIndex, type, cardName } = bestMove;
-
-        this.chips[r][c] = type === 'place' ? myColor : null;
-        if (type === 'place') {
-            this.lastMove = { r, c };
-        } else {
-            this.lastMove = null;
-        }
-
-        const drawnCard = this.deck.length > 0 ? this.deck.shift() : null;
-        hand.splice(cardIndex, 1);
-        if (drawnCard) hand.push(drawnCard);
-
-        const rank = cardName.slice(0, -1);
-        const suit = cardName.slice(-1);
-        const displayName = rank + (SUITS[suit] || suit);
-
-        this.log(`${type === 'place' ? '🤖✅' : '🤖❌'} Computer ${type === 'place' ? 'placed on' : 'removed from'} ${displayName}`);
-
-        const nextIdx = (colors.indexOf(myColor) + 1) % colors.length;
-        this.currentTurn = colors[nextIdx];
-        this.renderBoard();
-        this.updateTurnUI();
-        this.checkSequences();
-
-        if (this.isHost) {
-            this.saveGameState(); // CRITICAL: Save state after AI moves
-        }
-
-        this.checkAndTriggerAITurn();
-    }
-
-    evaluateMove(r, c, type, color) {
-        const colors = TEAM_COLORS.slice(0, this.teamCount);
-        const opponents = colors.filter(clr => clr !== color);
-        const testChips = this.chips.map(row => [...row]);
-
-        const countsBefore = this.getLineStats(testChips, color);
-
-        // Sum of all opponents' stats
-        let oppsBefore = { seqs: 0, max4: 0, max3: 0, max2: 0 };
-        opponents.forEach(opp => {
-            const stats = this.getLineStats(testChips, opp);
-            oppsBefore.seqs += stats.seqs;
-            oppsBefore.max4 += stats.max4;
-            oppsBefore.max3 += stats.max3;
-            oppsBefore.max2 += stats.max2;
-        });
-
-        testChips[r][c] = type === 'place' ? color : null;
-
-        const countsAfter = this.getLineStats(testChips, color);
-
-        let oppsAfter = { seqs: 0, max4: 0, max3: 0, max2: 0 };
-        opponents.forEach(opp => {
-            const stats = this.getLineStats(testChips, opp);
-            oppsAfter.seqs += stats.seqs;
-            oppsAfter.max4 += stats.max4;
-            oppsAfter.max3 += stats.max3;
-            oppsAfter.max2 += stats.max2;
-        });
-
-        let score = 0;
-
-        if (type === 'place') {
-            if (countsAfter.seqs > countsBefore.seqs) score += 10000;
-            else {
-                // Check if this move blocks any opponent from finishing a sequence
-                let blockedAnySeq = false;
-                opponents.forEach(opp => {
-                    testChips[r][c] = opp;
-                    const oppIfPlayed = this.getLineStats(testChips, opp);
-                    const statsBefore = this.getLineStats(this.chips, opp);
-                    if (oppIfPlayed.seqs > statsBefore.seqs) blockedAnySeq = true;
-                });
-
-                if (blockedAnySeq) {
-                    score += 8000;
-                } else {
-                    // Score based on blocking opponent's progress and making our own
-                    score += (oppsBefore.max4 - oppsAfter.max4) * 800; // Blocking opponent 4-in-a-row
-                    score += (oppsBefore.max3 - oppsAfter.max3) * 50;
-
-                    score += (countsAfter.max4 - countsBefore.max4) * 100;
-                    score += (countsAfter.max3 - countsBefore.max3) * 10;
-                    score += (countsAfter.max2 - countsBefore.max2) * 1;
-                }
-            }
-        } else if (type === 'remove') {
-            score += (oppsBefore.max4 - oppsAfter.max4) * 800;
-            score += (oppsBefore.max3 - oppsAfter.max3) * 150;
-            score += (oppsBefore.max2 - oppsAfter.max2) * 20;
-        }
-
-        const centerDist = Math.abs(r - 4.5) + Math.abs(c - 4.5);
-        score -= centerDist * 0.1;
-
-        return score;
-    }
-
-    getLineStats(chipsArray, color) {
-        const directions = [[0, 1], [1, 0], [1, 1], [1, -1]];
-        const grid = chipsArray.map((row, r) =>
-            row.map((cell, c) => this.board[r][c] === 'FREE' ? color : cell)
-        );
-        let seqs = 0, max4 = 0, max3 = 0, max2 = 0;
-
-        for (let r = 0; r < 10; r++) {
-            for (let c = 0; c < 10; c++) {
-                for (const [dr, dc] of directions) {
-                    let run = 0, gaps = 0;
-                    for (let i = 0; i < 5; i++) {
-                        const nr = r + i * dr, nc = c + i * dc;
-                        if (nr >= 0 && nr < 10 && nc >= 0 && nc < 10) {
-                            if (grid[nr][nc] === color) run++;
-                            else if (grid[nr][nc] !== null && this.board[nr][nc] !== 'FREE') gaps = 10;
-                        } else {
-                            gaps = 10;
-                        }
-                    }
-                    if (gaps < 10) {
-                        if (run === 5) seqs++;
-                        else if (run === 4) max4++;
-                        else if (run === 3) max3++;
-                        else if (run === 2) max2++;
-                    }
-                }
-            }
-        }
-        return { seqs, max4, max3, max2 };
-    }
-
     isChipInSequence(r, c, color) {
         return this.sequenceGrid[r][c] === true;
     }
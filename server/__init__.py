@@ -0,0 +1 @@
+"""Authoritative room server for Sequence, built on the headless engine."""
@@ -0,0 +1,94 @@
+"""Token-bucket admission control for joins.
+
+When the server restarts (or a proxy in front of it drops every
+connection), all clients come back at once and each ``join`` costs a
+room lookup, possibly a snapshot load, a full ``gameStart`` for
+reconnecting players and a ``players_sync`` broadcast. The bucket admits
+``rate`` joins per second with bursts of up to ``burst``. Joins beyond
+that wait in one of two queues:
+
+  * resumes: the playerID already holds a hand in a started game, so
+    admitting it lets a game in progress continue. This queue always
+    drains first.
+  * new joins: everything else.
+
+A join that has waited ``max_wait`` seconds is refused with ``busy`` and
+a ``retryAfter`` hint sized to the backlog, so the client backs off.
+"""
+import asyncio
+import time
+from collections import deque
+
+
+class Admission:
+    def __init__(self, rate, burst, max_wait=5.0):
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.resumes = deque()   # (queued at, admit, refuse)
+        self.fresh = deque()
+        self.handle = None
+        self.admitted = 0
+        self.resumed = 0
+        self.queued = 0
+        self.refused = 0
+        self.max_queue = 0
+        self.waits = deque(maxlen=10000)
+
+    def stats(self):
+        waits = sorted(self.waits)
+        return {"admitted": self.admitted, "resumed": self.resumed, "queued": self.queued,
+                "refused": self.refused, "waiting": len(self.resumes) + len(self.fresh),
+                "maxQueue": self.max_queue,
+                "waitMsP99": waits[int(0.99 * (len(waits) - 1))] * 1e3 if waits else 0.0}
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return now
+
+    def request(self, resume, admit, refuse):
+        """Call ``admit()`` now or once a token frees up, else ``refuse(retry_after)``."""
+        self.refill()
+        # Resumes only wait behind other resumes; new joins wait behind everyone
+        ahead = self.resumes if resume else self.resumes or self.fresh
+        if self.tokens >= 1 and not ahead:
+            self.tokens -= 1
+            self.grant(resume, admit, 0.0)
+            return
+        (self.resumes if resume else self.fresh).append((time.monotonic(), resume, admit, refuse))
+        self.queued += 1
+        self.max_queue = max(self.max_queue, len(self.resumes) + len(self.fresh))
+        self.schedule()
+
+    def grant(self, resume, admit, waited):
+        self.admitted += 1
+        self.resumed += resume
+        self.waits.append(waited)
+        admit()
+
+    def schedule(self):
+        if self.handle is None and (self.resumes or self.fresh):
+            delay = max(0.0, (1 - self.tokens) / self.rate)
+            self.handle = asyncio.get_running_loop().call_later(delay, self.drain)
+
+    def drain(self):
+        self.handle = None
+        now = self.refill()
+        for queue in (self.resumes, self.fresh):
+            while queue and now - queue[0][0] > self.max_wait:
+                _, _, _, refuse = queue.popleft()
+                self.refused += 1
+                refuse(self.retry_after())
+        while self.tokens >= 1 and (self.resumes or self.fresh):
+            queued_at, resume, admit, _ = (self.resumes or self.fresh).popleft()
+            self.tokens -= 1
+            self.grant(resume, admit, now - queued_at)
+        self.schedule()
+
+    def retry_after(self):
+        """Seconds until the current backlog would have been admitted."""
+        return round((len(self.resumes) + len(self.fresh) + 1) / self.rate, 2)
@@ -0,0 +1,571 @@
+"""Load generator: many simulated rooms of bot clients against one server.
+
+Each room gets 2-3 bots that join, configure, start and play a full game
+through the room server's ``join``/``config``/``gameStart``/``move``/``sync``
+protocol, choosing moves with the headless AI. Reports message
+throughput, move round-trip latency and the server's CPU and RSS.
+
+    python -m server.loadgen --spawn --rooms 500 --procs 4
+    python -m server.loadgen --spawn --shards 4 --rooms 2000 --procs 4
+    python -m server.loadgen --port 8765 --rooms 2000 --ai random --pace 0.2
+    python -m server.loadgen --spawn --rooms 500 --no-batch   # baseline for batching
+
+With --storm SECONDS the spawned server is restarted (after flushing its
+snapshots) that far into the run, and every bot reconnects and resumes
+its game. --reconnect picks the bots' retry schedule: ``fixed`` retries
+every --retry-base seconds in lockstep (like game.js used to), and
+``jitter`` uses decorrelated exponential backoff. --admission-rate turns
+on the server's join admission control. The report shows how the surge
+of join attempts was spread out and how long players took to resume:
+
+    python -m server.loadgen --spawn --rooms 300 --pace 0.2 --storm 3 --reconnect fixed
+    python -m server.loadgen --spawn --rooms 300 --pace 0.2 --storm 3 --reconnect jitter --admission-rate 300
+
+--spectators N adds N watchers to every room. A --stalled fraction of
+them shrink their receive buffer and stop reading mid-game, so the
+server's slow-consumer handling (dropped frames, resyncs, cut viewers)
+shows up in the report:
+
+    python -m server.loadgen --spawn --rooms 2 --spectators 2000 --stalled 0.1
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import random
+import secrets
+import socket
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from engine import Game, choose_move
+
+from .protocol import decode, encode, gen_id, unbatch
+
+LOCALHOST = ("127.0.0.1", "localhost", "::1")
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+
+class Metrics:
+    def __init__(self):
+        self.sent = 0
+        self.received = 0
+        self.frames_received = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.rtts = []
+        self.rejects = 0
+        self.games = 0
+        self.errors = 0
+        self.join_attempts = []   # wall-clock time of every connect attempt
+        self.refused = 0          # connects refused while the server was down
+        self.busy = 0             # joins the server refused as busy
+        self.resume_times = []    # seconds from losing the server to a resumed game
+        self.spectator_frames = 0
+        self.spectator_bytes = 0
+        self.spectator_resyncs = 0  # ``spectate`` states received after the first
+
+    def merge(self, other):
+        for key, value in vars(other).items():
+            if isinstance(value, list):
+                getattr(self, key).extend(value)
+            else:
+                setattr(self, key, getattr(self, key) + value)
+
+
+class Bot:
+    def __init__(self, room_id, seat, args, metrics, rng):
+        self.room_id = room_id
+        self.seat = seat
+        self.args = args
+        self.metrics = metrics
+        self.rng = rng
+        self.player_id = gen_id(12)
+        self.name = f"Bot {seat + 1}"
+        self.writer = None
+        self.game = None
+        self.color = None
+        self.started = False
+        self.pending_since = None
+        self.moves = 0
+        self.passes = 0
+        self.done = asyncio.Event()
+        self.lost_at = None      # when the connection to the server dropped
+        self.retry_delay = 0.0
+        self.retry_after = 0.0   # the server's busy hint
+
+    def send(self, type, data=None):
+        frame = encode(type, data)
+        self.metrics.sent += 1
+        self.metrics.bytes_sent += len(frame)
+        self.writer.write(frame)
+
+    async def run(self):
+        while not self.done.is_set():
+            self.metrics.join_attempts.append(time.time())
+            try:
+                reader, self.writer = await asyncio.open_connection(
+                    self.args.host, self.args.port, limit=1 << 20)
+            except OSError:
+                if not self.args.storm:
+                    raise
+                self.metrics.refused += 1
+                await asyncio.sleep(self.next_retry_delay())
+                continue
+            self.send("join", {"room": self.room_id, "name": self.name, "playerID": self.player_id})
+            try:
+                while not self.done.is_set():
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    self.metrics.frames_received += 1
+                    self.metrics.bytes_received += len(line)
+                    for type, data in unbatch(*decode(line)):
+                        self.metrics.received += 1
+                        self.handle(type, data)
+            except ConnectionError:
+                pass
+            finally:
+                self.writer.close()
+            if self.done.is_set() or not (self.args.storm or self.retry_after):
+                break
+            # Lost the server (or refused as busy): back off, then rejoin
+            if self.started and self.lost_at is None:
+                self.lost_at = time.perf_counter()
+            await asyncio.sleep(self.next_retry_delay())
+
+    def next_retry_delay(self):
+        base, cap = self.args.retry_base, self.args.retry_cap
+        if self.args.reconnect == "fixed":
+            delay = base
+        else:
+            # Decorrelated jitter: random in [base, 3 x the previous wait]
+            delay = min(cap, self.rng.uniform(base, 3 * (self.retry_delay or base)))
+        self.retry_delay = delay
+        delay = max(delay, self.retry_after)
+        self.retry_after = 0.0
+        return delay
+
+    # ── Protocol ──
+    def handle(self, type, data):
+        if type == "players_sync":
+            # Whoever the server made owner starts (not always seat 0 when joins are refused as busy)
+            if data["hostName"] == self.name and not self.started and len(data["peers"]) >= self.args.players:
+                self.started = True
+                self.send("config", {"teamCount": self.args.players})
+                self.send("gameStart")
+        elif type == "gameStart":
+            self.started = True
+            self.color = data["myColor"]
+            state = dict(data, chips=data["boardChips"]) if "boardChips" in data else data
+            self.game = Game.from_state(state, hands={self.color: data["myHand"]},
+                                        seed=self.rng.random())
+            if self.lost_at is not None:
+                self.metrics.resume_times.append(time.perf_counter() - self.lost_at)
+                self.lost_at = None
+                self.retry_delay = 0.0
+                self.pending_since = None
+            self.maybe_move()
+        elif type == "move":
+            self.on_move(data)
+        elif type == "sync":
+            self.game.sequences.update(data["sequences"])
+            self.game.sequence_grid = data["sequenceGrid"]
+            if data.get("winner"):
+                self.finish()
+        elif type == "reject" and data.get("reason") == "busy":
+            self.metrics.busy += 1
+            self.retry_after = data.get("retryAfter") or 0.0
+            self.writer.close()
+        elif type == "reject":
+            self.metrics.rejects += 1
+            self.finish()
+
+    def on_move(self, data):
+        game = self.game
+        if "myHand" in data:
+            if self.pending_since is not None:
+                self.metrics.rtts.append(time.perf_counter() - self.pending_since)
+                self.pending_since = None
+            game.hands[self.color] = data["myHand"]
+        if data["moveType"] in ("place", "remove"):
+            r, c = data["row"], data["col"]
+            game.set_chip(r, c, data["color"] if data["moveType"] == "place" else None)
+        self.passes = self.passes + 1 if data["moveType"] == "pass" else 0
+        game.current_turn = data["nextTurn"]
+        self.moves += 1
+        if self.passes >= self.args.players or self.moves >= self.args.max_moves:
+            self.finish()
+        else:
+            self.maybe_move()
+
+    def maybe_move(self):
+        if self.game.current_turn == self.color and not self.done.is_set() and self.lost_at is None:
+            asyncio.get_running_loop().call_later(self.args.pace, self.play)
+
+    def play(self):
+        if self.done.is_set() or self.writer.is_closing():
+            return
+        game = self.game
+        if self.args.ai == "greedy":
+            action = choose_move(game, self.color, self.rng)
+        else:
+            moves = game.legal_moves(self.color)
+            action = None
+            if moves:
+                i, r, c, move_type = self.rng.choice(moves)
+                action = (move_type, i, r, c)
+            else:
+                dead = [i for i, card in enumerate(game.hands[self.color]) if game.is_dead(card)]
+                action = ("exchange", dead[0]) if dead else None
+
+        hand = game.hands[self.color]
+        if action is None:
+            move = {"moveType": "pass"}
+        elif action[0] == "exchange":
+            move = {"moveType": "exchange", "card": hand[action[1]]}
+        else:
+            move_type, i, r, c = action
+            move = {"row": r, "col": c, "color": self.color, "moveType": move_type, "card": hand[i]}
+        self.pending_since = time.perf_counter()
+        self.send("move", move)
+
+    def finish(self):
+        if not self.done.is_set():
+            if self.seat == 0:
+                self.metrics.games += 1
+            self.done.set()
+
+
+class Spectator:
+    """Watches a room until its bots are done; a stalled one stops reading."""
+
+    def __init__(self, room_id, args, metrics, stalled, done):
+        self.room_id = room_id
+        self.args = args
+        self.metrics = metrics
+        self.stalled = stalled
+        self.done = done
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        sock = socket.socket()
+        sock.setblocking(False)
+        if self.stalled:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        await loop.sock_connect(sock, (self.args.host, self.args.port))
+        reader, writer = await asyncio.open_connection(sock=sock, limit=1 << 20)
+        writer.write(encode("join", {"room": self.room_id, "spectate": True}))
+        states = 0
+        try:
+            while not self.done.is_set():
+                if self.stalled and states:
+                    await self.done.wait()
+                    break
+                line = await reader.readline()
+                if not line:
+                    break
+                self.metrics.spectator_frames += 1
+                self.metrics.spectator_bytes += len(line)
+                if line.startswith(b'{"type":"spectate"'):
+                    states += 1
+                    self.metrics.spectator_resyncs += states > 1
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def run_room(room_id, args, metrics, rng, delay):
+    await asyncio.sleep(delay)
+    bots = [Bot(room_id, seat, args, metrics, random.Random(rng.random())) for seat in range(args.players)]
+    tasks = []
+    for bot in bots:
+        tasks.append(asyncio.create_task(bot.run()))
+        await asyncio.sleep(0.01)   # let the owner's join land first
+    done = asyncio.Event()
+    watchers = [asyncio.create_task(Spectator(room_id, args, metrics, rng.random() < args.stalled, done).run())
+                for _ in range(args.spectators)]
+    for result in await asyncio.gather(*tasks, return_exceptions=True):
+        if isinstance(result, Exception):
+            metrics.errors += 1
+    done.set()
+    for result in await asyncio.gather(*watchers, return_exceptions=True):
+        if isinstance(result, Exception):
+            metrics.errors += 1
+
+
+async def run_rooms(room_ids, args, seed):
+    metrics = Metrics()
+    rng = random.Random(seed)
+    await asyncio.gather(*(
+        run_room(room_id, args, metrics, rng, args.ramp * i / max(1, len(room_ids)))
+        for i, room_id in enumerate(room_ids)
+    ))
+    return metrics
+
+
+def worker(job):
+    room_ids, args, seed = job
+    return asyncio.run(run_rooms(room_ids, args, seed))
+
+
+async def server_stats(host, port, token=None):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(encode("stats", {"token": token} if token else None))
+    _, data = decode(await reader.readline())
+    writer.close()
+    return data
+
+
+def wait_for_port(host, port, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"server did not come up on {host}:{port}")
+
+
+class ServerProcess:
+    """The spawned server, which --storm restarts mid-run."""
+
+    def __init__(self, cmd):
+        self.cmd = cmd
+        self.proc = None
+        self.restarted_at = None   # wall-clock time the restart began
+
+    def start(self):
+        self.proc = subprocess.Popen(self.cmd, cwd=Path(__file__).resolve().parent.parent)
+
+    def restart(self, host, port):
+        self.restarted_at = time.time()
+        self.proc.send_signal(signal.SIGINT)   # flushes snapshots on the way out
+        self.proc.wait()
+        self.start()
+        wait_for_port(host, port)
+
+    def stop(self):
+        self.proc.terminate()
+        self.proc.wait()
+
+
+def storm_report(metrics, restarted_at, admission):
+    attempts = sorted(t - restarted_at for t in metrics.join_attempts if t >= restarted_at)
+    per_tick = Counter(int(t * 10) for t in attempts)
+    resumes = sorted(metrics.resume_times)
+    return {
+        "joinAttempts": len(attempts),
+        "peakAttemptsPer100ms": max(per_tick.values(), default=0),
+        "attemptSpreadSec": {"p50": percentile(attempts, 50), "p99": percentile(attempts, 99)},
+        "refusedConnects": metrics.refused,
+        "busy": metrics.busy,
+        "resumed": len(resumes),
+        "resumeSec": {"p50": percentile(resumes, 50), "p90": percentile(resumes, 90),
+                      "max": resumes[-1] if resumes else 0.0},
+        "admission": admission,
+    }
+
+
+def run(args, server=None):
+    room_ids = [gen_id(8) for _ in range(args.rooms)]
+    jobs = [(room_ids[i::args.procs], args, args.seed + i) for i in range(args.procs)]
+
+    before = asyncio.run(server_stats(args.host, args.port, args.admin_token))
+    storm = None
+    if args.storm:
+        storm = threading.Timer(args.storm, server.restart, (args.host, args.port))
+        storm.start()
+    start = time.perf_counter()
+    if args.procs == 1:
+        results = [worker(jobs[0])]
+    else:
+        with multiprocessing.Pool(args.procs) as pool:
+            results = pool.map(worker, jobs)
+    elapsed = time.perf_counter() - start
+    if storm:
+        storm.join()
+        # The restarted server's counters start from zero
+        before = dict.fromkeys(before, 0)
+    after = asyncio.run(server_stats(args.host, args.port, args.admin_token))
+
+    metrics = Metrics()
+    for result in results:
+        metrics.merge(result)
+    rtts = sorted(metrics.rtts)
+    server_msgs = after["messagesIn"] + after["messagesOut"] - before["messagesIn"] - before["messagesOut"]
+    server_out = after["messagesOut"] - before["messagesOut"]
+    server_frames = after["framesOut"] - before["framesOut"]
+    return {
+        "rooms": args.rooms,
+        "playersPerRoom": args.players,
+        "gamesFinished": metrics.games,
+        "elapsedSec": elapsed,
+        "clientMessages": {"sent": metrics.sent, "received": metrics.received,
+                           "framesReceived": metrics.frames_received},
+        "messagesPerSec": (metrics.sent + metrics.received) / elapsed,
+        "serverMessagesPerSec": server_msgs / elapsed,
+        "serverFramesOutPerSec": server_frames / elapsed,
+        "serverOut": {"messages": server_out, "frames": server_frames,
+                      "bytes": after["bytesOut"] - before["bytesOut"]},
+        "serverMessagesDropped": after["messagesDropped"] - before["messagesDropped"],
+        "bytesPerSec": (metrics.bytes_sent + metrics.bytes_received) / elapsed,
+        "moves": len(rtts),
+        "moveRttMs": {"p50": percentile(rtts, 50) * 1e3, "p99": percentile(rtts, 99) * 1e3,
+                      "max": (rtts[-1] * 1e3) if rtts else 0.0},
+        "rejects": metrics.rejects,
+        "errors": metrics.errors,
+        "server": {
+            "cpuPercent": 100 * (after["cpuSeconds"] - before["cpuSeconds"]) / elapsed,
+            "rssBytes": after["rssBytes"],
+            "rooms": after["rooms"],
+            "snapshots": after.get("snapshots"),
+        },
+        "spectators": {
+            "perRoom": args.spectators,
+            "framesReceived": metrics.spectator_frames,
+            "bytesReceived": metrics.spectator_bytes,
+            "resyncsReceived": metrics.spectator_resyncs,
+            "serverFramesPerSec": (after["spectatorFrames"] - before["spectatorFrames"]) / elapsed,
+            "serverDropped": after["spectatorDropped"] - before["spectatorDropped"],
+            "serverResyncs": after["spectatorResyncs"] - before["spectatorResyncs"],
+            "serverCut": after["spectatorsCut"] - before["spectatorsCut"],
+        } if args.spectators and not args.shards else None,
+        "storm": storm_report(metrics, server.restarted_at, after.get("admission")) if storm else None,
+    }
+
+
+def parser():
+    p = argparse.ArgumentParser(description="Simulate many concurrent rooms against a local room server")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--spawn", action="store_true", help="start a local room server for the run")
+    p.add_argument("--shards", type=int, default=0,
+                   help="with --spawn, start the sharded server with this many workers")
+    p.add_argument("--snapshots", metavar="DIR", help="with --spawn, have the server snapshot rooms into DIR")
+    p.add_argument("--no-batch", action="store_true",
+                   help="with --spawn, disable the server's per-tick batching (for before/after runs)")
+    p.add_argument("--rooms", type=int, default=100)
+    p.add_argument("--players", type=int, choices=(2, 3), default=2, help="bots (and teams) per room")
+    p.add_argument("--ai", choices=("greedy", "random"), default="greedy")
+    p.add_argument("--pace", type=float, default=0.05, help="seconds a bot waits before moving")
+    p.add_argument("--ramp", type=float, default=2.0, help="seconds over which rooms are started")
+    p.add_argument("--max-moves", type=int, default=400)
+    p.add_argument("--procs", type=int, default=1, help="client processes to spread bots over")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--storm", type=float, default=0, metavar="SECONDS",
+                   help="with --spawn, restart the server this far into the run; bots reconnect and resume")
+    p.add_argument("--reconnect", choices=("jitter", "fixed"), default="jitter",
+                   help="bot retry schedule after losing the server")
+    p.add_argument("--retry-base", type=float, default=0.5, help="seconds; the fixed interval or jitter floor")
+    p.add_argument("--retry-cap", type=float, default=10.0, help="longest jittered retry wait, in seconds")
+    p.add_argument("--admission-rate", type=float, default=0,
+                   help="with --spawn, the server's join admission rate per second (0 = off)")
+    p.add_argument("--admission-burst", type=int, default=20)
+    p.add_argument("--spectators", type=int, default=0, help="spectators watching each room")
+    p.add_argument("--stalled", type=float, default=0.0, help="fraction of spectators that stop reading")
+    p.add_argument("--spectator-buffer", type=int, default=0,
+                   help="with --spawn, the server's per-spectator unsent-byte limit (0 = its default)")
+    p.add_argument("--admin-token", help="token for the server's stats (generated with --spawn)")
+    p.add_argument("--json", action="store_true", help="print the report as JSON")
+    return p
+
+
+def main(argv=None):
+    args = parser().parse_args(argv)
+    if args.host not in LOCALHOST:
+        print("loadgen only targets a server on localhost", file=sys.stderr)
+        return 2
+
+    if args.storm and (not args.spawn or args.shards):
+        print("--storm needs --spawn without --shards", file=sys.stderr)
+        return 2
+
+    server = None
+    scratch = None
+    if args.spawn:
+        args.admin_token = args.admin_token or secrets.token_hex(16)
+        cmd = [sys.executable, "-m", "server.room_server", "--host", args.host, "--port", str(args.port),
+               "--admin-token", args.admin_token]
+        if args.storm and not args.snapshots:
+            # Games only survive the restart through their snapshots
+            scratch = tempfile.TemporaryDirectory(prefix="loadgen-rooms-")
+            args.snapshots = scratch.name
+        if args.shards:
+            cmd[2:3] = ["server.sharding", "--workers", str(args.shards)]
+        if args.snapshots:
+            cmd += ["--snapshots", args.snapshots]
+        if args.no_batch and not args.shards:
+            cmd.append("--no-batch")
+        if args.admission_rate and not args.shards:
+            cmd += ["--admission-rate", str(args.admission_rate), "--admission-burst", str(args.admission_burst)]
+        if args.spectator_buffer and not args.shards:
+            cmd += ["--spectator-buffer", str(args.spectator_buffer)]
+        server = ServerProcess(cmd)
+        server.start()
+    try:
+        wait_for_port(args.host, args.port)
+        report = run(args, server)
+    finally:
+        if server:
+            server.stop()
+        if scratch:
+            scratch.cleanup()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['rooms']} rooms x {report['playersPerRoom']} bots, "
+              f"{report['gamesFinished']} games finished in {report['elapsedSec']:.1f}s")
+        print(f"client msgs/s {report['messagesPerSec']:.0f}   server msgs/s {report['serverMessagesPerSec']:.0f}"
+              f"   server frames out/s {report['serverFramesOutPerSec']:.0f}   bytes/s {report['bytesPerSec']:.0f}")
+        out = report["serverOut"]
+        per_move = max(report["moves"], 1)
+        print(f"server out: {out['messages']} messages in {out['frames']} frames, {out['bytes']} bytes"
+              f"   ({out['frames'] / per_move:.2f} frames, {out['bytes'] / per_move:.0f} bytes per move;"
+              f" {report['serverMessagesDropped']} superseded dropped)")
+        print(f"move RTT p50 {report['moveRttMs']['p50']:.2f} ms   p99 {report['moveRttMs']['p99']:.2f} ms"
+              f"   ({report['moves']} moves, {report['rejects']} rejects, {report['errors']} errors)")
+        print(f"server CPU {report['server']['cpuPercent']:.0f}%   RSS {report['server']['rssBytes'] / 2**20:.1f} MiB")
+        snaps = report["server"]["snapshots"]
+        if snaps:
+            print(f"snapshots: {snaps['requests']} saves requested, {snaps['writes']} written "
+                  f"({snaps['bytes'] / 2**10:.0f} KiB), {snaps['pending']} pending")
+        watch = report["spectators"]
+        if watch:
+            print(f"spectators: {watch['perRoom']} per room received {watch['framesReceived']} frames "
+                  f"({watch['bytesReceived'] / 2**20:.1f} MiB); server wrote {watch['serverFramesPerSec']:.0f} "
+                  f"spectator frames/s, dropped {watch['serverDropped']}, resynced {watch['serverResyncs']}, "
+                  f"cut {watch['serverCut']}")
+        storm = report["storm"]
+        if storm:
+            spread = storm["attemptSpreadSec"]
+            print(f"storm: {storm['joinAttempts']} join attempts after the restart, peak "
+                  f"{storm['peakAttemptsPer100ms']} per 100 ms, p50 {spread['p50']:.2f}s p99 {spread['p99']:.2f}s "
+                  f"after it ({storm['refusedConnects']} connects refused, {storm['busy']} busy)")
+            resume = storm["resumeSec"]
+            print(f"  {storm['resumed']} players resumed: p50 {resume['p50']:.2f}s  p90 {resume['p90']:.2f}s"
+                  f"  max {resume['max']:.2f}s")
+            admission = storm["admission"]
+            if admission:
+                print(f"  admission: {admission['admitted']} admitted ({admission['resumed']} resumes), "
+                      f"{admission['queued']} queued, {admission['refused']} refused, max queue "
+                      f"{admission['maxQueue']}, p99 wait {admission['waitMsP99']:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
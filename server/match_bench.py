@@ -0,0 +1,170 @@
+"""Quick-match benchmark: synthetic arrivals against ``Matchmaker``.
+
+Players arrive as a Poisson process at --rate per second, for --seconds
+of simulated time. Their formats are drawn from --mix. Each player gives
+up after an exponentially distributed patience (mean --patience
+seconds), unless matched first. The queue runs on the simulated clock,
+so waits are what players would see at that arrival rate. Every match
+builds a real ``Room`` and deals its ``Game``, as the room server does;
+--no-rooms leaves that out to time the queues alone.
+
+Reported:
+- throughput: arrivals handled per wall-clock second, against --rate;
+- the wall-clock cost of each ``enqueue``, split by whether it made a
+  match;
+- simulated queue wait per format.
+
+    python -m server.match_bench --rate 5000 --seconds 10
+    python -m server.match_bench --rate 20000 --no-rooms --mix 1v1=1
+    python -m server.match_bench --rate 200 --patience 5 --json
+"""
+import argparse
+import heapq
+import json
+import random
+import sys
+import time
+
+from .loadgen import percentile
+from .matchmaking import FORMATS, Matchmaker
+from .protocol import gen_id
+from .rooms import Room
+
+
+class NullConnection:
+    """Just enough of a connection for ``Room``; frames are discarded."""
+
+    def __init__(self, id):
+        self.id = id
+
+    def send(self, frame, type=None):
+        pass
+
+    def send_shared(self, frame, resync):
+        pass
+
+    def close(self):
+        pass
+
+
+def parse_mix(text):
+    mix = {}
+    for item in text.split(","):
+        format, _, weight = item.partition("=")
+        if format not in FORMATS:
+            raise ValueError(f"unknown format {format!r}")
+        mix[format] = float(weight or 1)
+    return mix
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    now = 0.0
+    rooms = []
+    formats, weights = zip(*args.mix.items())
+    waits = {format: [] for format in formats}
+
+    def matched(format, tickets):
+        waits[format].extend(now - ticket.queued_at for ticket in tickets)
+        if args.no_rooms:
+            return
+        room = Room(gen_id(8))
+        room.team_count = FORMATS[format][0]
+        for ticket in tickets:
+            room.join(NullConnection(ticket.player_id), {"playerID": ticket.player_id})
+        room.start_game(room.owner)
+        rooms.append(room.id)
+
+    matchmaker = Matchmaker(matched, clock=lambda: now)
+
+    # (time, order, kind, player): the next arrival is drawn when one is reached
+    events = [(rng.expovariate(args.rate), 0, "arrive", None)]
+    order = 1
+    arrivals = 0
+    call_match, call_queue = [], []
+    start = time.perf_counter()
+    while events:
+        now, _, kind, player = heapq.heappop(events)
+        if kind == "cancel":
+            matchmaker.cancel(player)
+            continue
+        if now < args.seconds:
+            heapq.heappush(events, (now + rng.expovariate(args.rate), order, "arrive", None))
+            order += 1
+        else:
+            continue
+        arrivals += 1
+        player = gen_id(12)
+        format = rng.choices(formats, weights)[0]
+        before = matchmaker.matches
+        t0 = time.perf_counter()
+        matchmaker.enqueue(player, format)
+        elapsed = time.perf_counter() - t0
+        if matchmaker.matches > before:
+            call_match.append(elapsed)
+        else:
+            call_queue.append(elapsed)
+            heapq.heappush(events, (now + rng.expovariate(1 / args.patience), order, "cancel", player))
+            order += 1
+    wall = time.perf_counter() - start
+
+    call_match.sort()
+    call_queue.sort()
+    stats = matchmaker.stats()
+    return {
+        "rate": args.rate,
+        "seconds": args.seconds,
+        "arrivals": arrivals,
+        "wallSec": wall,
+        "arrivalsPerSec": arrivals / wall if wall else 0.0,
+        "headroom": arrivals / wall / args.rate if wall else 0.0,
+        "matches": stats["matches"],
+        "matched": stats["matched"],
+        "cancelled": stats["cancelled"],
+        "stillWaiting": stats["waiting"],
+        "rooms": len(rooms),
+        "enqueueUs": {
+            "queued": {"p50": percentile(call_queue, 50) * 1e6, "p99": percentile(call_queue, 99) * 1e6},
+            "matched": {"p50": percentile(call_match, 50) * 1e6, "p99": percentile(call_match, 99) * 1e6,
+                        "max": call_match[-1] * 1e6 if call_match else 0.0},
+        },
+        "waitMs": {format: {"matched": len(w), "p50": percentile(sorted(w), 50) * 1e3,
+                            "p99": percentile(sorted(w), 99) * 1e3}
+                   for format, w in waits.items()},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive the quick-match queues with synthetic arrivals")
+    parser.add_argument("--rate", type=float, default=5000, help="arrivals per simulated second")
+    parser.add_argument("--seconds", type=float, default=10, help="simulated seconds of arrivals")
+    parser.add_argument("--mix", default="1v1=50,2v2=25,1v1v1=15,3v3=5,2v2v2=5",
+                        help="format=weight list players are drawn from")
+    parser.add_argument("--patience", type=float, default=30, help="mean seconds before a player gives up")
+    parser.add_argument("--no-rooms", action="store_true", help="skip building a room for each match")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+    try:
+        args.mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    print(f"{report['arrivals']} arrivals at {report['rate']:.0f}/s over {report['seconds']:.0f}s simulated: "
+          f"handled {report['arrivalsPerSec']:.0f}/s wall-clock ({report['headroom']:.1f}x the arrival rate)")
+    print(f"{report['matches']} matches ({report['matched']} players, {report['rooms']} rooms built), "
+          f"{report['cancelled']} gave up, {sum(report['stillWaiting'].values())} still queued")
+    queued, matched = report["enqueueUs"]["queued"], report["enqueueUs"]["matched"]
+    print(f"enqueue: {queued['p50']:.1f} us p50 / {queued['p99']:.1f} us p99 when queued, "
+          f"{matched['p50']:.0f} us p50 / {matched['p99']:.0f} us p99 when it makes a match")
+    for format, wait in report["waitMs"].items():
+        print(f"  {format:<7}{wait['matched']:>8} matched   wait p50 {wait['p50']:8.1f} ms   p99 {wait['p99']:8.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
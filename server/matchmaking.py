@@ -0,0 +1,127 @@
+"""Quick-match queues.
+
+Without quick match, a game only starts when someone shares the
+``#roomId`` invite link. A connection can instead send
+
+    {"type": "quickMatch", "data": {"format": "2v2", "name": "Ann", "playerID": "..."}}
+
+and wait in that format's queue. ``FORMATS`` maps each format to the
+room's ``teamCount`` and the number of seats. Seats alternate teams, as
+in ``Room.start_game``, so "2v2" is four players on two teams.
+
+Each format keeps a heap ordered by the time the player first queued.
+Ticket lookups go through an index by playerID. So:
+- queueing is O(log n);
+- a match of k players is O(k log n);
+- ``cancel`` is O(1), since it only marks the ticket dead and the heap
+  skips dead tickets when it reaches them.
+
+A player who queues again under the same playerID replaces their old
+ticket. ``requeue`` puts players back under their original time, so a
+player whose match fell through is first in line for the next one.
+
+``on_match(format, tickets)`` is called as soon as a queue holds a full
+room. The room server then creates the room under a ``gen_id()`` id.
+match_bench.py drives this class with synthetic arrivals.
+"""
+import heapq
+import itertools
+import time
+from collections import deque
+
+FORMATS = {
+    "1v1": (2, 2),       # format -> (teamCount, players)
+    "1v1v1": (3, 3),
+    "2v2": (2, 4),
+    "2v2v2": (3, 6),
+    "3v3": (2, 6),
+}
+
+
+class Ticket:
+    __slots__ = ("player_id", "format", "queued_at", "seq", "payload", "live")
+
+    def __init__(self, player_id, format, queued_at, seq, payload):
+        self.player_id = player_id
+        self.format = format
+        self.queued_at = queued_at
+        self.seq = seq
+        self.payload = payload   # whatever the caller needs back on a match
+        self.live = True
+
+    def __lt__(self, other):
+        return (self.queued_at, self.seq) < (other.queued_at, other.seq)
+
+
+class Matchmaker:
+    def __init__(self, on_match, clock=time.monotonic):
+        self.on_match = on_match
+        self.clock = clock
+        self.queues = {format: [] for format in FORMATS}
+        self.waiting = dict.fromkeys(FORMATS, 0)   # live tickets per queue
+        self.tickets = {}                          # playerID -> live Ticket
+        self.seq = itertools.count()
+        self.queued = 0
+        self.cancelled = 0
+        self.matches = 0
+        self.matched = 0
+        self.waits = deque(maxlen=10000)
+
+    def stats(self):
+        waits = sorted(self.waits)
+        return {"queued": self.queued, "cancelled": self.cancelled, "matches": self.matches,
+                "matched": self.matched, "waiting": dict(self.waiting),
+                "waitMsP50": waits[len(waits) // 2] * 1e3 if waits else 0.0,
+                "waitMsP99": waits[int(0.99 * (len(waits) - 1))] * 1e3 if waits else 0.0}
+
+    def enqueue(self, player_id, format, payload=None, queued_at=None):
+        """Queue ``player_id`` for ``format``; matches as soon as a room is full."""
+        if not isinstance(format, str) or format not in FORMATS:
+            raise ValueError(f"unknown format {format!r}")
+        self.cancel(player_id, counted=False)
+        ticket = Ticket(player_id, format, self.clock() if queued_at is None else queued_at,
+                        next(self.seq), payload)
+        self.tickets[player_id] = ticket
+        heapq.heappush(self.queues[format], ticket)
+        self.waiting[format] += 1
+        self.queued += 1
+        self.match(format)
+        return ticket
+
+    def cancel(self, player_id, counted=True):
+        ticket = self.tickets.pop(player_id, None)
+        if ticket is None:
+            return False
+        ticket.live = False
+        self.waiting[ticket.format] -= 1
+        self.cancelled += counted
+        return True
+
+    def requeue(self, tickets):
+        """Put matched players back in line, ahead of anyone who queued after them."""
+        for ticket in tickets:
+            self.enqueue(ticket.player_id, ticket.format, ticket.payload, ticket.queued_at)
+
+    def match(self, format):
+        seats = FORMATS[format][1]
+        queue = self.queues[format]
+        while self.waiting[format] >= seats:
+            tickets = []
+            while len(tickets) < seats:
+                ticket = heapq.heappop(queue)
+                if ticket.live:
+                    tickets.append(ticket)
+                    del self.tickets[ticket.player_id]
+                    ticket.live = False
+            self.waiting[format] -= seats
+            self.matches += 1
+            self.matched += seats
+            now = self.clock()
+            self.waits.extend(now - ticket.queued_at for ticket in tickets)
+            self.on_match(format, tickets)
+        while queue and not queue[0].live:
+            heapq.heappop(queue)
+        # Cancelled tickets behind a long wait are dropped in one O(n) pass
+        if len(queue) > 2 * self.waiting[format] + 64:
+            queue[:] = [ticket for ticket in queue if ticket.live]
+            heapq.heapify(queue)
@@ -0,0 +1,48 @@
+"""Wire format shared by the room server and its clients.
+
+Every message is the same ``{type, data}`` envelope the PeerJS data
+connections in game.js carry, JSON-encoded on one line (NDJSON). Messages
+sent to one connection in the same event-loop tick may travel as a
+single ``{"type": "batch", "data": [message, ...]}`` frame, as in
+game.js's outbox; ``unbatch`` expands either form.
+"""
+import json
+import secrets
+
+
+def encode(type, data=None):
+    return json.dumps({"type": type, "data": data}, separators=(",", ":")).encode() + b"\n"
+
+
+def decode(line):
+    payload = json.loads(line)
+    if not isinstance(payload, dict) or not payload.get("type"):
+        raise ValueError("message without a type")
+    return payload["type"], payload.get("data")
+
+
+def encode_batch(frames):
+    """One ``batch`` frame carrying already-encoded messages, in order."""
+    return b'{"type":"batch","data":[' + b",".join(frame[:-1] for frame in frames) + b"]}\n"
+
+
+def unbatch(type, data):
+    """The ``(type, data)`` messages one decoded frame carries."""
+    if type != "batch":
+        return [(type, data)]
+    return [(m["type"], m.get("data")) for m in data or () if isinstance(m, dict) and m.get("type")]
+
+
+def gen_id(length=8):
+    # Same alphabet and shape as genId() in game.js
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+    def base36(b):
+        out = ""
+        while True:
+            b, d = divmod(b, 36)
+            out = digits[d] + out
+            if not b:
+                return out.rjust(2, "0")
+
+    return "".join(base36(b) for b in secrets.token_bytes(length))[:length]
@@ -0,0 +1,111 @@
+"""Per-room memory of idle rooms, live vs parked.
+
+Builds ``--rooms`` started two-player rooms, each some random moves in,
+and reports the growth in RSS per room. In ``live`` mode every room
+holds a full ``Game``; in ``parked`` mode each is packed as the room
+server does after ``--park-after`` idle seconds (see compact.py). Each
+mode runs in a fresh process, since freed memory rarely goes back to
+the OS. A parked room is also checked to round-trip to the same
+snapshot, and timed while it unpacks.
+
+    python -m server.room_bench --rooms 20000
+    python -m server.room_bench --rooms 100000 --json
+"""
+import argparse
+import gc
+import json
+import random
+import subprocess
+import sys
+import time
+
+from engine import Game
+
+from .room_server import process_usage
+from .rooms import Room
+
+
+def idle_room(i, rng, moves):
+    """A started room ``moves`` random moves in, with two players seated."""
+    room = Room(f"room{i:06d}")
+    for seat in range(2):
+        peer_id = f"peer{i:06d}{seat}"
+        room.peers[peer_id] = None
+        room.player_ids[peer_id] = f"player{i:06d}{seat}"
+        room.names[peer_id] = f"Player {seat + 1}"
+    room.owner = next(iter(room.peers))
+    room.color_names = {"red": "Player 1", "blue": "Player 2"}
+    room.game = game = Game(2, players=[(room.player_ids[p], c) for p, c in zip(room.peers, ("red", "blue"))])
+    for _ in range(moves):
+        if game.over:
+            break
+        player = next(key for key, color in game.players if color == game.current_turn)
+        legal = game.legal_moves(player)
+        if not legal:
+            game.pass_turn()
+            continue
+        i, r, c, move_type = rng.choice(legal)
+        game.apply_move(i, r, c, move_type, player)
+    return room
+
+
+def measure(mode, count, moves, seed):
+    rng = random.Random(seed)
+    gc.collect()
+    _, before = process_usage()
+    start = time.perf_counter()
+    rooms = []
+    for i in range(count):
+        room = idle_room(i, rng, moves)
+        if mode == "parked":
+            room.park()
+        rooms.append(room)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    _, after = process_usage()
+
+    # Round trip: a parked room must come back as the same game
+    sample = idle_room(count, random.Random(seed + 1), moves)
+    state = sample.snapshot()
+    sample.park()
+    start_unpack = time.perf_counter()
+    restored = sample.snapshot()
+    unpack_us = (time.perf_counter() - start_unpack) * 1e6
+    if restored != state:
+        raise AssertionError("parked room did not round-trip")
+    return {"mode": mode, "rooms": count, "rssBytes": after - before,
+            "bytesPerRoom": (after - before) / count, "buildSec": elapsed, "unpackUs": unpack_us}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-room memory, live vs parked")
+    parser.add_argument("--rooms", type=int, default=20000)
+    parser.add_argument("--moves", type=int, default=30, help="random moves played in each room")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--mode", choices=("live", "parked"), help="measure one mode in this process")
+    parser.add_argument("--target", type=int, default=100000, help="rooms to project memory for")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.mode:
+        print(json.dumps(measure(args.mode, args.rooms, args.moves, args.seed)))
+        return 0
+
+    results = []
+    for mode in ("live", "parked"):
+        cmd = [sys.executable, "-m", "server.room_bench", "--mode", mode, "--rooms", str(args.rooms),
+               "--moves", str(args.moves), "--seed", str(args.seed)]
+        results.append(json.loads(subprocess.run(cmd, capture_output=True, text=True, check=True).stdout))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    print(f"{args.rooms} idle rooms, {args.moves} moves in")
+    for r in results:
+        print(f"  {r['mode']:<8}{r['bytesPerRoom'] / 1024:8.2f} KiB/room   "
+              f"{r['bytesPerRoom'] * args.target / 2 ** 20:8.0f} MiB per {args.target} rooms")
+    print(f"  unpacking a parked room: {results[1]['unpackUs']:.0f} us")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,497 @@
+"""Asyncio room server.
+
+Clients open a TCP connection and speak NDJSON ``{type, data}`` envelopes
+(see protocol.py). The first message must be ``join`` with the room id:
+
+    {"type": "join", "data": {"room": "k3x9a0b2", "name": "Ann", "playerID": "..."}}
+
+after which the connection belongs to that room. A ``stats`` message
+carrying the --admin-token (or $SEQUENCE_ADMIN_TOKEN) may be sent
+instead of ``join`` to read server counters, CPU time and RSS; without
+a configured token it is refused.
+
+Outgoing messages are queued per connection and written once per
+event-loop tick; several become one ``batch`` frame, and a newer
+``sync``/``players_sync`` replaces a queued one (--no-batch turns this
+off for comparison).
+
+With --snapshots DIR, game state is saved per room with coalesced writes
+(see snapshots.py) and rooms resume from it after a restart.
+
+With --admission-rate, joins pass a token bucket (see admission.py) so a
+reconnect surge after a restart is spread out; players resuming a game
+in progress are admitted ahead of new joins, and joins that wait too
+long are refused with ``busy`` and a ``retryAfter`` hint.
+
+A join with ``"spectate": true`` watches the room instead (see rooms.py).
+Spectator frames skip the per-tick batching, so every viewer is written
+the very ``bytes`` object the room encoded once. A viewer whose socket
+has more than --spectator-buffer bytes unsent is skipped until it drains,
+then gets the current public state in place of the frames it missed,
+whether or not another broadcast follows. One that stays behind for
+--spectator-lag seconds is disconnected.
+
+Instead of joining a known room, a connection may send ``quickMatch``
+with a format such as ``1v1`` or ``2v2`` (see matchmaking.py). Once its
+queue holds a full room, the server creates one under a fresh id, sends
+each player ``matched`` with that id, joins them in queue order and
+starts the game. ``cancelMatch`` leaves the queue.
+
+Rooms idle for --park-after seconds pack their game into a few hundred
+bytes (see compact.py), so one process can hold many waiting games. The
+next message to the room unpacks it.
+
+    python -m server.room_server --port 8765 --admin-token s3cret
+    python -m server.room_server --snapshots /var/lib/sequence/rooms
+    python -m server.room_server --snapshots rooms/ --admission-rate 200 --admission-burst 50
+    python -m server.room_server --park-after 10
+    python -m server.room_server --spectator-buffer 65536 --spectator-lag 10
+"""
+import argparse
+import asyncio
+import logging
+import os
+import resource
+import secrets
+import signal
+import socket
+import sys
+import time
+
+from .admission import Admission
+from .matchmaking import FORMATS, Matchmaker
+from .protocol import decode, encode, encode_batch, gen_id, unbatch
+from .rooms import Room
+from .snapshots import SnapshotStore
+
+log = logging.getLogger("room_server")
+
+MAX_LINE = 1 << 20
+
+# Kernel send buffer for spectators, so a stalled viewer shows up in the
+# transport's buffer (and is skipped) instead of hiding in megabytes of socket
+SPECTATOR_SNDBUF = 16 * 1024
+
+# Full-state messages: only the newest queued one per connection is sent
+SUPERSEDED = frozenset(("sync", "players_sync"))
+
+
+def process_usage():
+    """CPU seconds and current RSS in bytes for this process."""
+    ru = resource.getrusage(resource.RUSAGE_SELF)
+    rss = ru.ru_maxrss * 1024
+    try:
+        with open("/proc/self/statm") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        pass
+    return ru.ru_utime + ru.ru_stime, rss
+
+
+class Connection:
+    def __init__(self, writer, server):
+        self.id = gen_id(12)
+        self.writer = writer
+        self.server = server
+        self.room = None
+        self.joining = False  # join waiting for admission
+        self.queued = None    # playerID while waiting for a quick match
+        self.outbox = []     # (type, frame) queued this tick
+        self.behind_since = None  # when a slow spectator started missing frames
+
+    def send(self, frame, type=None):
+        if self.writer.is_closing():
+            return
+        server = self.server
+        server.messages_out += 1
+        if not server.batching:
+            return self.write(frame)
+        if not self.outbox:
+            server.schedule_flush(self)
+        elif type in SUPERSEDED:
+            for i, (queued, _) in enumerate(self.outbox):
+                if queued == type:
+                    del self.outbox[i]
+                    server.messages_dropped += 1
+                    break
+        self.outbox.append((type, frame))
+
+    def send_shared(self, frame, resync):
+        """Write a frame shared by all spectators, or skip it while this one lags."""
+        if self.writer.is_closing():
+            return
+        server = self.server
+        if self.writer.transport.get_write_buffer_size() > server.spectator_buffer:
+            server.spectator_dropped += 1
+            if self.behind_since is None:
+                self.behind_since = time.monotonic()
+                asyncio.ensure_future(self.catch_up(resync))
+            return
+        if self.behind_since is not None:
+            frame = self.caught_up(resync)
+        server.spectator_frames += 1
+        self.write(frame)
+
+    async def catch_up(self, resync):
+        """Resync a lagging spectator once it drains, even if no broadcast follows."""
+        server = self.server
+        transport = self.writer.transport
+        deadline = self.behind_since + server.spectator_lag
+        try:
+            while transport.get_write_buffer_size() > server.spectator_buffer:
+                # drain() waits while the transport is paused; below its high-water mark, poll
+                await asyncio.wait_for(self.writer.drain(), max(0.0, deadline - time.monotonic()))
+                await asyncio.sleep(0.05)
+                if time.monotonic() > deadline:
+                    raise asyncio.TimeoutError
+        except asyncio.TimeoutError:
+            server.spectators_cut += 1
+            self.close()
+            return
+        except ConnectionError:
+            return
+        # A broadcast may have resynced it first
+        if self.behind_since is not None and not self.writer.is_closing():
+            server.spectator_frames += 1
+            self.write(self.caught_up(resync))
+
+    def caught_up(self, resync):
+        # The room's current state replaces whatever was skipped
+        self.behind_since = None
+        self.server.spectator_resyncs += 1
+        return resync()
+
+    def flush(self):
+        queued, self.outbox = self.outbox, []
+        if queued and not self.writer.is_closing():
+            self.write(queued[0][1] if len(queued) == 1 else encode_batch([frame for _, frame in queued]))
+
+    def write(self, frame):
+        self.server.frames_out += 1
+        self.server.bytes_out += len(frame)
+        self.writer.write(frame)
+
+    def close(self):
+        self.writer.close()
+
+
+class RoomServer:
+    def __init__(self, snapshots=None, batching=True, admission=None, park_after=30.0,
+                 spectator_buffer=256 * 1024, spectator_lag=30.0, admin_token=None):
+        self.rooms = {}
+        self.snapshots = snapshots   # SnapshotStore or None
+        self.admission = admission   # Admission or None
+        self.batching = batching
+        self.park_after = park_after # idle seconds before a room is packed; 0 never packs
+        self.parks = 0
+        self.spectator_buffer = spectator_buffer  # unsent bytes before a viewer's frames are dropped
+        self.spectator_lag = spectator_lag        # seconds a viewer may stay behind
+        self.admin_token = admin_token            # stats need it; None refuses them
+        self.spectator_frames = 0
+        self.spectator_dropped = 0
+        self.spectator_resyncs = 0
+        self.spectators_cut = 0
+        self.unflushed = []          # connections with queued messages
+        self.open = set()            # live Connections
+        self.connections = 0
+        self.messages_in = 0
+        self.messages_out = 0
+        self.frames_out = 0
+        self.messages_dropped = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.started_at = time.monotonic()
+        self.on_room_closed = None   # callback(room_id), used by shard workers
+        self.on_room_opened = None   # callback(room_id) for rooms the server names itself
+        self.matchmaker = Matchmaker(self.matched)
+
+    def stats(self):
+        cpu, rss = process_usage()
+        stats = {
+            "rooms": len(self.rooms),
+            "parkedRooms": sum(room.parked for room in self.rooms.values()),
+            "parks": self.parks,
+            "spectators": sum(len(room.spectators) for room in self.rooms.values()),
+            "spectatorFrames": self.spectator_frames,
+            "spectatorDropped": self.spectator_dropped,
+            "spectatorResyncs": self.spectator_resyncs,
+            "spectatorsCut": self.spectators_cut,
+            "connections": self.connections,
+            "messagesIn": self.messages_in,
+            "messagesOut": self.messages_out,
+            "framesOut": self.frames_out,
+            "messagesDropped": self.messages_dropped,
+            "bytesIn": self.bytes_in,
+            "bytesOut": self.bytes_out,
+            "uptime": time.monotonic() - self.started_at,
+            "cpuSeconds": cpu,
+            "rssBytes": rss,
+        }
+        if self.snapshots:
+            stats["snapshots"] = self.snapshots.stats()
+        if self.admission:
+            stats["admission"] = self.admission.stats()
+        stats["matchmaking"] = self.matchmaker.stats()
+        return stats
+
+    def schedule_flush(self, conn):
+        if not self.unflushed:
+            asyncio.get_running_loop().call_soon(self.flush)
+        self.unflushed.append(conn)
+
+    def flush(self):
+        unflushed, self.unflushed = self.unflushed, []
+        for conn in unflushed:
+            conn.flush()
+
+    async def park_idle(self):
+        """Pack the games of rooms nobody has touched for ``park_after`` seconds."""
+        while True:
+            await asyncio.sleep(self.park_after / 2)
+            cutoff = time.monotonic() - self.park_after
+            for room in self.rooms.values():
+                if room.touched < cutoff and room.live_game is not None:
+                    room.park()
+                    self.parks += 1
+
+    def room_for(self, room_id):
+        room = self.rooms.get(room_id)
+        if room is None:
+            saved = self.snapshots.load(room_id) if self.snapshots else None
+            room = self.rooms[room_id] = Room.from_snapshot(saved) if saved else Room(room_id)
+            if self.snapshots:
+                room.on_change = self.snapshots.mark_dirty
+        return room
+
+    def is_resume(self, room_id, player_id):
+        """Whether ``player_id`` holds a hand in a started game in the room."""
+        if not isinstance(player_id, str):
+            return False
+        room = self.rooms.get(room_id)
+        if room is not None:
+            return room.started and player_id in room.game.hands
+        # Read the snapshot without creating the room: that waits for admission
+        saved = self.snapshots.peek(room_id) if self.snapshots else None
+        game = saved and saved.get("game")
+        return bool(game) and player_id in (game.get("hands") or {})
+
+    def join(self, conn, data):
+        room_id = str(data["room"])
+        if self.admission is None:
+            return self.admit(conn, room_id, data)
+        conn.joining = True
+        self.admission.request(self.is_resume(room_id, data.get("playerID")),
+                               lambda: self.admit(conn, room_id, data),
+                               lambda retry_after: self.refuse(conn, retry_after))
+
+    def admit(self, conn, room_id, data):
+        conn.joining = False
+        if conn.writer.is_closing():
+            return
+        conn.room = self.room_for(room_id)
+        if data.get("spectate"):
+            sock = conn.writer.get_extra_info("socket")
+            if sock is not None:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SPECTATOR_SNDBUF)
+            conn.room.watch(conn)
+        else:
+            conn.room.join(conn, data)
+
+    # ── Quick match ──
+    def quick_match(self, conn, data):
+        format = data.get("format")
+        if not isinstance(format, str) or format not in FORMATS:
+            return conn.send(encode("reject", {"reason": "unknown format", "formats": list(FORMATS)}))
+        player_id = data.get("playerID")
+        player_id = player_id if isinstance(player_id, str) and player_id else conn.id
+        self.unqueue(conn)
+        # The same player queueing from a new connection takes over the ticket
+        old = self.matchmaker.tickets.get(player_id)
+        if old and old.payload[0] is not conn:
+            old.payload[0].queued = None
+            old.payload[0].send(encode("cancelled", {"reason": "queued from another connection"}))
+        conn.queued = player_id
+        conn.send(encode("queued", {"format": format, "waiting": self.matchmaker.waiting[format] + 1}))
+        self.matchmaker.enqueue(player_id, format, (conn, dict(data, playerID=player_id)))
+
+    def cancel_match(self, conn):
+        self.unqueue(conn)
+        conn.send(encode("cancelled"))
+
+    def unqueue(self, conn):
+        # Only this connection's own ticket: the playerID may have queued again elsewhere
+        ticket = self.matchmaker.tickets.get(conn.queued)
+        if ticket and ticket.payload[0] is conn:
+            self.matchmaker.cancel(conn.queued)
+        conn.queued = None
+
+    def matched(self, format, tickets):
+        # A player whose socket is already closing gives up their seat
+        gone = [t for t in tickets if t.payload[0].writer.is_closing()]
+        if gone:
+            self.matchmaker.requeue(t for t in tickets if t not in gone)
+            return
+        room_id = gen_id(8)
+        while room_id in self.rooms:
+            room_id = gen_id(8)
+        room = self.room_for(room_id)
+        room.team_count = FORMATS[format][0]
+        if self.on_room_opened:
+            self.on_room_opened(room_id)
+        for ticket in tickets:
+            conn, data = ticket.payload
+            conn.queued = None
+            conn.room = room
+            conn.send(encode("matched", {"room": room_id, "format": format, "teamCount": room.team_count}))
+            room.join(conn, data)
+        room.start_game(room.owner)
+
+    def refuse(self, conn, retry_after):
+        conn.joining = False
+        conn.send(encode("reject", {"reason": "busy", "retryAfter": retry_after}), "reject")
+
+    def dispatch(self, conn, type, data):
+        if conn.room is not None:
+            if type in ("quickMatch", "cancelMatch"):
+                return conn.send(encode("reject", {"reason": "already in a room"}))
+            conn.room.handle(conn.id, type, data)
+        elif conn.joining:
+            pass   # nothing else counts until the join is admitted
+        elif type == "join" and isinstance(data, dict) and data.get("room"):
+            self.unqueue(conn)   # a direct join leaves the quick-match queue
+            self.join(conn, data)
+        elif type == "quickMatch" and isinstance(data, dict):
+            self.quick_match(conn, data)
+        elif type == "cancelMatch":
+            self.cancel_match(conn)
+        elif type == "stats":
+            if not self.is_admin(data):
+                conn.send(encode("reject", {"reason": "admin token required"}))
+            else:
+                conn.send(encode("stats", self.stats()))
+        else:
+            conn.send(encode("reject", {"reason": "join a room first"}))
+
+    def is_admin(self, data):
+        token = data.get("token") if isinstance(data, dict) else None
+        return bool(self.admin_token) and isinstance(token, str) and secrets.compare_digest(
+            token.encode(), self.admin_token.encode())
+
+    def disconnect(self, conn):
+        self.unqueue(conn)
+        room = conn.room
+        if room is None:
+            return
+        room.leave(conn.id)
+        if room.empty and self.rooms.get(room.id) is room:
+            del self.rooms[room.id]
+            if self.snapshots:
+                self.snapshots.closed(room)
+            if self.on_room_closed:
+                self.on_room_closed(room.id)
+
+    async def handle_connection(self, reader, writer):
+        conn = Connection(writer, self)
+        self.connections += 1
+        self.open.add(conn)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self.bytes_in += len(line)
+                try:
+                    messages = unbatch(*decode(line))
+                except (ValueError, TypeError):
+                    self.messages_in += 1
+                    conn.send(encode("reject", {"reason": "malformed message"}))
+                    continue
+                for type, data in messages:
+                    self.messages_in += 1
+                    self.dispatch(conn, type, data)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        except ValueError:
+            # readline() reports a line over MAX_LINE as ValueError
+            pass
+        finally:
+            self.connections -= 1
+            self.open.discard(conn)
+            self.disconnect(conn)
+            conn.flush()
+            writer.close()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        log.info("room server listening on %s:%s", host, port)
+        parker = asyncio.create_task(self.park_idle()) if self.park_after > 0 else None
+        try:
+            async with server:
+                await stop.wait()
+            # Close every client so rooms close (and snapshot) normally
+            log.info("shutting down %d connections", len(self.open))
+            for conn in list(self.open):
+                conn.close()
+            for _ in range(100):
+                if not self.open:
+                    break
+                await asyncio.sleep(0.01)
+            # Rooms of clients still open after the grace period close (and snapshot) now
+            for conn in list(self.open):
+                self.disconnect(conn)
+        finally:
+            if parker:
+                parker.cancel()
+            if self.snapshots:
+                self.snapshots.flush_now()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sequence room server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--no-batch", action="store_true", help="write every message as its own frame")
+    parser.add_argument("--snapshots", metavar="DIR", help="save and resume room state in DIR")
+    parser.add_argument("--snapshot-delay", type=float, default=0.5,
+                        help="seconds a room must be quiet before its snapshot is written")
+    parser.add_argument("--snapshot-max-delay", type=float, default=2.0,
+                        help="longest a change waits to be written")
+    parser.add_argument("--admission-rate", type=float, default=0,
+                        help="joins admitted per second (0 admits every join at once)")
+    parser.add_argument("--admission-burst", type=int, default=20, help="joins admitted back to back")
+    parser.add_argument("--admission-wait", type=float, default=5.0,
+                        help="seconds a join may wait before it is refused as busy")
+    parser.add_argument("--park-after", type=float, default=30.0,
+                        help="idle seconds before a room's game is packed (0 keeps every game live)")
+    parser.add_argument("--spectator-buffer", type=int, default=256 * 1024,
+                        help="unsent bytes after which a spectator's frames are dropped")
+    parser.add_argument("--spectator-lag", type=float, default=30.0,
+                        help="seconds a spectator may miss frames before it is disconnected")
+    parser.add_argument("--admin-token", default=os.environ.get("SEQUENCE_ADMIN_TOKEN"),
+                        help="token that stats requests must carry (default: $SEQUENCE_ADMIN_TOKEN)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    snapshots = None
+    if args.snapshots:
+        snapshots = SnapshotStore(args.snapshots, args.snapshot_delay, args.snapshot_max_delay)
+    admission = None
+    if args.admission_rate > 0:
+        admission = Admission(args.admission_rate, args.admission_burst, args.admission_wait)
+    try:
+        asyncio.run(RoomServer(snapshots, batching=not args.no_batch, admission=admission,
+                               park_after=args.park_after, spectator_buffer=args.spectator_buffer,
+                               spectator_lag=args.spectator_lag,
+                               admin_token=args.admin_token).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,390 @@
+"""Room state and message handling.
+
+A ``Room`` plays the part the host browser plays in game.js: it owns the
+deck and every hand, validates moves against the headless engine and
+relays the same ``join``/``config``/``gameStart``/``move``/``sync``
+messages ``handleData`` understands. The room's first player (its
+"owner") configures and starts the game, like the P2P host does.
+
+While hints are on, a player may send ``threats`` and gets back the
+game's threat map (``ThreatMap.to_json()``, see engine/threats.py): per
+color, the empty cells that complete a five and those that build one.
+
+Connections only need an ``id``, ``send(frame, type)`` and ``close()``;
+the message type lets a connection drop superseded state messages.
+
+Spectators join with ``"spectate": true`` and only ever see public state:
+a ``spectate`` message with the board, sequences, turn, deck size and
+each seat's hand size but no cards, then the same ``move``/``sync``/``players_sync``
+broadcasts the players get. Each broadcast is encoded once and that one
+``bytes`` object goes to every spectator through
+``send_shared(frame, resync)``. A spectator connection that cannot keep up
+drops frames and calls ``resync()`` for the room's current public state
+once it has caught up; that frame is cached until the next broadcast, so
+a thousand lagging viewers still cost one encode.
+
+Rooms use ``__slots__``, and an idle room can ``park()`` its game as a
+``PackedGame`` of a few hundred bytes (see compact.py). ``room.game``
+unpacks it again on first use.
+"""
+import time
+
+from engine import BOARD_LAYOUT, ONE_EYE, TWO_EYE, Game, team_colors
+
+from .compact import PackedGame
+from .protocol import encode
+
+SUITS = {"H": "♥", "D": "♦", "S": "♠", "C": "♣"}
+MAX_NAME = 20   # the name input's maxlength in index.html
+
+
+def card_name(card):
+    return card[:-1] + SUITS.get(card[-1], card[-1])
+
+
+class Room:
+    __slots__ = ("id", "peers", "player_ids", "names", "owner", "team_count", "hints_enabled",
+                 "color_names", "live_game", "packed_game", "on_change", "touched", "spectators",
+                 "public_frame")
+
+    def __init__(self, room_id):
+        self.id = room_id
+        self.peers = {}          # peerId -> connection, in join order
+        self.player_ids = {}     # peerId -> playerID
+        self.names = {}          # peerId -> name
+        self.owner = None
+        self.team_count = 2
+        self.hints_enabled = False
+        self.color_names = {}
+        self.live_game = None    # Game, or None while parked or not started
+        self.packed_game = None  # PackedGame while parked
+        self.on_change = None    # callback(room) after the game state changes
+        self.touched = time.monotonic()
+        self.spectators = {}     # peerId -> connection of a watcher
+        self.public_frame = None # encoded ``spectate`` state, until the next broadcast
+
+    @property
+    def game(self):
+        if self.packed_game is not None:
+            self.live_game = self.packed_game.unpack()
+            self.packed_game = None
+        return self.live_game
+
+    @game.setter
+    def game(self, game):
+        self.live_game = game
+        self.packed_game = None
+
+    @property
+    def started(self):
+        return self.live_game is not None or self.packed_game is not None
+
+    @property
+    def parked(self):
+        return self.packed_game is not None
+
+    def park(self):
+        """Swap the game for its packed form until someone touches it again."""
+        if self.live_game is not None:
+            self.packed_game = PackedGame.pack(self.live_game)
+            self.live_game = None
+
+    @property
+    def empty(self):
+        return not self.peers and not self.spectators
+
+    def send(self, peer_id, type, data):
+        conn = self.peers.get(peer_id)
+        if conn:
+            conn.send(encode(type, data), type)
+
+    def broadcast(self, type, data, exclude=None):
+        frame = encode(type, data)
+        for peer_id, conn in self.peers.items():
+            if peer_id != exclude:
+                conn.send(frame, type)
+        self.public_frame = None
+        self.publish(frame)
+
+    def publish(self, frame):
+        """Send one encoded public frame to every spectator."""
+        for conn in self.spectators.values():
+            conn.send_shared(frame, self.public_state_frame)
+
+    def public_state_frame(self):
+        if self.public_frame is None:
+            self.public_frame = encode("spectate", self.public_state())
+        return self.public_frame
+
+    def public_state(self):
+        """What anyone may see: no deck order and no cards in hand."""
+        state = {
+            "teamCount": self.team_count,
+            "hintsEnabled": self.hints_enabled,
+            "colorNames": self.color_names,
+            "players": list(self.names.values()),
+            "spectators": len(self.spectators),
+            "started": self.started,
+        }
+        if self.started:
+            game = self.game
+            full = game.to_state()
+            state.update({
+                "winTarget": game.win_target,
+                "currentTurn": game.current_turn,
+                "winner": game.winner,
+                "boardChips": full["chips"],
+                "sequences": full["sequences"],
+                "sequenceGrid": full["sequenceGrid"],
+                "lockedSequences": full["lockedSequences"],
+                "lastMove": full["lastMove"],
+                "deckSize": len(game.deck),
+                # In seat order: teammates share a color, so it cannot be the key
+                "seatColors": [color for _, color in game.players],
+                "handSizes": [len(game.hands[key]) for key, _ in game.players],
+            })
+        return state
+
+    def reject(self, peer_id, reason, data=None):
+        self.send(peer_id, "reject", {"reason": reason, "request": data})
+
+    def changed(self):
+        if self.on_change:
+            self.on_change(self)
+
+    # ── Membership ──
+    def sync_players(self):
+        owner_name = self.names.get(self.owner, "Host")
+        self.broadcast("players_sync", {
+            "hostName": owner_name,
+            "peers": list(self.peers),
+            "allPeers": list(self.peers),
+            "peerNames": self.names,
+        })
+
+    def join(self, conn, data):
+        self.touched = time.monotonic()
+        peer_id = conn.id
+        player_id = data.get("playerID")
+        player_id = player_id if isinstance(player_id, str) and player_id else peer_id
+        name = data.get("name")
+        name = name[:MAX_NAME] if isinstance(name, str) and name else f"Player {len(self.peers) + 1}"
+
+        # Remove ghost connections for the same playerID
+        for pid in [p for p, plid in self.player_ids.items() if plid == player_id and p != peer_id]:
+            ghost = self.peers.get(pid)
+            self.leave(pid, sync=False)
+            if ghost:
+                ghost.close()
+
+        self.peers[peer_id] = conn
+        self.player_ids[peer_id] = player_id
+        self.names[peer_id] = name
+        if self.owner is None:
+            self.owner = peer_id
+
+        self.send(peer_id, "config", {"teamCount": self.team_count, "hintsEnabled": self.hints_enabled})
+        if self.started and player_id in self.game.hands:
+            # Reconnection: resend the whole game with this player's hand
+            self.send(peer_id, "gameStart", self.game_start_payload(player_id, full=True))
+        self.sync_players()
+
+    def watch(self, conn):
+        """Add a spectator and send it the public state."""
+        self.spectators[conn.id] = conn
+        conn.send_shared(self.public_state_frame(), self.public_state_frame)
+
+    def leave(self, peer_id, sync=True):
+        if self.spectators.pop(peer_id, None) is not None:
+            return
+        if self.peers.pop(peer_id, None) is None:
+            return
+        self.player_ids.pop(peer_id, None)
+        self.names.pop(peer_id, None)
+        if self.owner == peer_id:
+            self.owner = next(iter(self.peers), None)
+        if sync and self.peers:
+            self.sync_players()
+
+    # ── Game flow ──
+    def start_game(self, peer_id):
+        if peer_id != self.owner:
+            return self.reject(peer_id, "only the room owner can start")
+        if len(self.peers) < 2:
+            return self.reject(peer_id, "need at least 2 players")
+
+        colors = team_colors(self.team_count)
+        players = []
+        self.color_names = {}
+        for i, pid in enumerate(self.peers):
+            color = colors[i % len(colors)]
+            players.append((self.player_ids[pid], color))
+            self.color_names.setdefault(color, self.names[pid])
+        self.game = Game(self.team_count, players=players)
+        self.changed()
+
+        for pid in self.peers:
+            self.send(pid, "gameStart", self.game_start_payload(self.player_ids[pid]))
+        self.public_frame = None
+        self.publish(self.public_state_frame())
+
+    def game_start_payload(self, player_id, full=False):
+        game = self.game
+        payload = {
+            "deck": list(game.deck),
+            "myHand": game.hands[player_id],
+            "myColor": game.player_colors[player_id],
+            "currentTurn": game.current_turn,
+            "teamCount": game.team_count,
+            "winTarget": game.win_target,
+            "colorNames": self.color_names,
+            "hintsEnabled": self.hints_enabled,
+            "lastMove": None,
+        }
+        if full:
+            state = game.to_state()
+            payload.update({
+                "boardChips": state["chips"],
+                "sequences": state["sequences"],
+                "sequenceGrid": state["sequenceGrid"],
+                "lockedSequences": state["lockedSequences"],
+                "lastMove": state["lastMove"],
+            })
+        return payload
+
+    def card_for(self, hand, color, r, c, move_type, card=None):
+        """Index of the card that makes the move legal, preferring exact matches."""
+        candidates = [card] if card else sorted(set(hand), key=lambda k: k in ONE_EYE or k in TWO_EYE)
+        for k in candidates:
+            if k in hand and (r, c, move_type) in self.game.targets(k, color):
+                return hand.index(k)
+        return None
+
+    def play(self, peer_id, data):
+        game = self.game
+        player = self.player_ids.get(peer_id)
+        if not game or game.over or player not in game.hands:
+            return self.reject(peer_id, "no game in progress", data)
+        color = game.player_colors[player]
+        if color != game.current_turn:
+            return self.reject(peer_id, "not your turn", data)
+
+        hand = game.hands[player]
+        move_type = data.get("moveType")
+        move = {"color": color, "moveType": move_type}
+
+        if move_type == "pass":
+            if game.legal_moves(player):
+                return self.reject(peer_id, "legal moves remain", data)
+            game.pass_turn()
+            self.changed()
+            move.update({"row": 0, "col": 0, "drew": False, "nextTurn": game.current_turn})
+        elif move_type == "exchange":
+            card = data.get("card")
+            if card not in hand or not game.is_dead(card):
+                return self.reject(peer_id, "not a dead card", data)
+            drawn = game.exchange_dead(hand.index(card), player)
+            self.changed()
+            move.update({"row": 0, "col": 0, "drew": drawn is not None,
+                         "nextTurn": color, "cardName": card_name(card)})
+        elif move_type in ("place", "remove"):
+            r, c = data.get("row"), data.get("col")
+            if not (isinstance(r, int) and isinstance(c, int) and 0 <= r < 10 and 0 <= c < 10):
+                return self.reject(peer_id, "bad cell", data)
+            index = self.card_for(hand, color, r, c, move_type, data.get("card"))
+            if index is None:
+                return self.reject(peer_id, "illegal move", data)
+            deck_before = len(game.deck)
+            new_seqs = game.apply_move(index, r, c, move_type, player)
+            move.update({"row": r, "col": c, "drew": len(game.deck) < deck_before,
+                         "nextTurn": game.current_turn,
+                         "cardName": card_name(BOARD_LAYOUT[r][c]),
+                         "changed": sorted(game.changed_cells)})
+            self.changed()
+            if new_seqs:
+                self.broadcast_move(peer_id, move, hand)
+                state = game.to_state()
+                self.broadcast("sync", {
+                    "sequences": state["sequences"],
+                    "winner": game.winner,
+                    "sequenceGrid": state["sequenceGrid"],
+                    "lockedSequences": state["lockedSequences"],
+                })
+                return
+        else:
+            return self.reject(peer_id, "unknown move type", data)
+
+        self.broadcast_move(peer_id, move, hand)
+
+    def broadcast_move(self, peer_id, move, hand):
+        # The mover also gets the move back, with the hand the server dealt
+        self.broadcast("move", move, exclude=peer_id)
+        self.send(peer_id, "move", dict(move, myHand=hand))
+
+    # ── Snapshots ──
+    def snapshot(self):
+        """Everything needed to resume the room after a server restart."""
+        game = self.game
+        return {
+            "room": self.id,
+            "teamCount": self.team_count,
+            "hintsEnabled": self.hints_enabled,
+            "colorNames": self.color_names,
+            "game": None if game is None else dict(
+                game.to_state(), deck=game.deck, hands=game.hands, players=game.players, turns=game.turns),
+        }
+
+    @classmethod
+    def from_snapshot(cls, data):
+        room = cls(data["room"])
+        room.team_count = data.get("teamCount", 2)
+        room.hints_enabled = data.get("hintsEnabled", False)
+        room.color_names = data.get("colorNames") or {}
+        state = data.get("game")
+        if state:
+            game = Game.from_state(state, hands=state["hands"], deck=state["deck"])
+            game.players = [tuple(p) for p in state["players"]]
+            game.player_colors = dict(game.players)
+            game.turns = state.get("turns", 0)
+            room.game = game
+        return room
+
+    # ── Dispatch ──
+    def handle(self, peer_id, type, data):
+        self.touched = time.monotonic()
+        if peer_id in self.spectators:
+            self.spectators[peer_id].send(encode("reject", {"reason": "spectators cannot play"}), "reject")
+        elif type == "name":
+            if not isinstance(data, str) or not 0 < len(data) <= MAX_NAME:
+                return self.reject(peer_id, "bad name", data)
+            self.names[peer_id] = data
+            self.sync_players()
+        elif type == "config":
+            if not isinstance(data, dict):
+                return self.reject(peer_id, "bad config", data)
+            if peer_id != self.owner or self.started and not self.game.over:
+                return self.reject(peer_id, "cannot configure now", data)
+            if data.get("teamCount") in (2, 3):
+                self.team_count = data["teamCount"]
+            if "hintsEnabled" in data:
+                self.hints_enabled = bool(data["hintsEnabled"])
+            self.broadcast("config", {"teamCount": self.team_count, "hintsEnabled": self.hints_enabled},
+                           exclude=peer_id)
+        elif type == "gameStart":
+            if self.started and not self.game.over:
+                return self.reject(peer_id, "game already running")
+            self.start_game(peer_id)
+        elif type == "move":
+            if not isinstance(data, dict):
+                return self.reject(peer_id, "bad move", data)
+            self.play(peer_id, data)
+        elif type == "threats":
+            if not self.started:
+                return self.reject(peer_id, "no game running")
+            if not self.hints_enabled:
+                return self.reject(peer_id, "hints are off")
+            self.send(peer_id, "threats", self.game.threats.to_json())
+        elif type == "emoji":
+            self.broadcast("emoji", data, exclude=peer_id)
+        else:
+            self.reject(peer_id, f"unknown message type {type!r}")
@@ -0,0 +1,408 @@
+"""Sharded room server: one acceptor, N worker processes.
+
+The acceptor owns the listening socket. For each new connection it reads
+the first message (a ``join`` naming the room), picks the shard that owns
+that room and hands the socket itself, plus the bytes already read, to
+the worker over a Unix ``SOCK_SEQPACKET`` pair with ``SCM_RIGHTS``. From
+then on the client talks to the worker directly; each worker runs its own
+``RoomServer`` and event loop, so rooms scale across cores.
+
+Rooms map to shards by rendezvous hashing over the live shards, and a
+room stays pinned to its shard until the worker reports it closed. A
+draining shard takes no new rooms; its worker exits once its last room
+closes (and is replaced when ``--respawn`` is set).
+
+A ``quickMatch`` goes to the shard its format hashes to, so everyone
+queueing for one format meets in the same queue. The worker reports the
+rooms it creates for matches, and the acceptor pins them there.
+
+Each worker parks its idle rooms after --park-after seconds, like the
+single-process server (see compact.py). With --snapshots DIR every
+worker keeps its own ``SnapshotStore`` over the same directory: a room
+lives on one shard at a time, so no two workers write the same file,
+and a room whose shard drained or died resumes on its new shard.
+
+``stats`` and ``drain`` are admin commands: they must carry the token
+given with --admin-token (or $SEQUENCE_ADMIN_TOKEN), and are refused
+when the acceptor was started without one. Shards that do not answer
+a ``stats`` request within ``STATS_WAIT`` are listed under ``missing``.
+
+    python -m server.sharding --port 8765 --workers 4 --admin-token s3cret
+    python -m server.sharding --port 8765 --snapshots /var/lib/sequence/rooms
+    python -m server.sharding --port 8765 --admin-token s3cret --drain 2     # drain shard 2
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import secrets
+import socket
+import sys
+
+from .protocol import decode, encode
+from .room_server import MAX_LINE, RoomServer, process_usage
+from .snapshots import SnapshotStore
+
+log = logging.getLogger("sharding")
+
+PACKET = 1 << 16
+HAND_OFF_WAIT = 2.0   # seconds to wait for room on a worker's control socket
+STATS_WAIT = 5.0      # seconds to wait for every shard's stats reply
+
+# Workers must not inherit the listener or other shards' control sockets,
+# or a dead acceptor would never show up as EOF on their control channel.
+MP = multiprocessing.get_context("spawn")
+
+
+def shard_for(room_id, shards):
+    """Rendezvous hash: the live shard with the highest score wins."""
+    def score(index):
+        return hashlib.blake2b(f"{room_id}:{index}".encode(), digest_size=8).digest()
+    return max(shards, key=score)
+
+
+# ── Worker ────────────────────────────────────────────────────
+class ShardWorker:
+    def __init__(self, index, control, options):
+        self.index = index
+        self.control = control
+        snapshots = None
+        if options["snapshots"]:
+            snapshots = SnapshotStore(options["snapshots"], options["snapshot_delay"],
+                                      options["snapshot_max_delay"])
+        self.server = RoomServer(snapshots, park_after=options["park_after"])
+        self.server.on_room_closed = lambda room_id: self.emit("room_closed", room=room_id)
+        self.server.on_room_opened = lambda room_id: self.emit("room_opened", room=room_id)
+        self.draining = False
+        self.stopped = None
+
+    def emit(self, event, **data):
+        self.control.send(json.dumps(dict(data, event=event)).encode())
+
+    def on_control(self):
+        try:
+            msg, fds, _, _ = socket.recv_fds(self.control, PACKET, 1)
+        except BlockingIOError:
+            return
+        if not msg and not fds:
+            # Acceptor went away
+            self.stopped.set()
+            return
+        if fds:
+            asyncio.ensure_future(self.adopt(fds[0], msg))
+            return
+        cmd = json.loads(msg)
+        if cmd["cmd"] == "stats":
+            self.emit("stats", id=cmd["id"], stats=self.server.stats())
+        elif cmd["cmd"] == "drain":
+            self.draining = True
+            self.check_drained()
+
+    def check_drained(self):
+        if self.draining and not self.server.rooms and not self.server.connections:
+            self.emit("drained", stats=self.server.stats())
+            self.stopped.set()
+
+    async def adopt(self, fd, prefix):
+        loop = asyncio.get_running_loop()
+        sock = socket.socket(fileno=fd)
+        sock.setblocking(False)
+        reader = asyncio.StreamReader(limit=MAX_LINE)
+        reader.feed_data(prefix)    # bytes the acceptor already consumed
+        protocol = asyncio.StreamReaderProtocol(reader)
+        transport, _ = await loop.create_connection(lambda: protocol, sock=sock)
+        writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+        await self.server.handle_connection(reader, writer)
+        self.check_drained()
+
+    async def run(self):
+        self.stopped = asyncio.Event()
+        self.control.setblocking(False)
+        asyncio.get_running_loop().add_reader(self.control.fileno(), self.on_control)
+        parker = asyncio.create_task(self.server.park_idle()) if self.server.park_after > 0 else None
+        try:
+            await self.stopped.wait()
+        finally:
+            if parker:
+                parker.cancel()
+            if self.server.snapshots:
+                self.server.snapshots.flush_now()
+
+
+def worker_main(index, control, options):
+    logging.basicConfig(level=logging.INFO, format=f"%(asctime)s shard-{index} %(message)s")
+    try:
+        asyncio.run(ShardWorker(index, control, options).run())
+    except KeyboardInterrupt:
+        pass
+
+
+# ── Acceptor ──────────────────────────────────────────────────
+class Shard:
+    def __init__(self, index, options):
+        self.index = index
+        parent, child = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        self.control = parent
+        self.process = MP.Process(target=worker_main, args=(index, child, options), daemon=True)
+        self.process.start()
+        child.close()
+        self.control.setblocking(False)
+        self.draining = False
+        self.rooms = set()
+
+
+class Acceptor:
+    def __init__(self, workers, respawn=False, admin_token=None, worker_options=None):
+        # Passed to every ShardWorker: park_after, snapshots, snapshot_delay, snapshot_max_delay
+        self.worker_options = dict({"park_after": 30.0, "snapshots": None, "snapshot_delay": 0.5,
+                                    "snapshot_max_delay": 2.0}, **(worker_options or {}))
+        self.shards = {i: Shard(i, self.worker_options) for i in range(workers)}
+        self.respawn = respawn
+        self.admin_token = admin_token
+        self.pins = {}          # room id -> shard index
+        self.pending = {}       # stats request id -> (shard, future)
+        self.retired = dict.fromkeys(
+            ("messagesIn", "messagesOut", "framesOut", "messagesDropped", "bytesIn", "bytesOut"), 0)
+        self.next_request = 0
+
+    def live_shards(self):
+        return [i for i, shard in self.shards.items() if not shard.draining]
+
+    def route(self, room_id):
+        index = self.pins.get(room_id)
+        if index is None or index not in self.shards:
+            index = shard_for(room_id, self.live_shards() or list(self.shards))
+            self.pins[room_id] = index
+            self.shards[index].rooms.add(room_id)
+        return index
+
+    # ── Worker events ──
+    def watch(self, shard):
+        asyncio.get_running_loop().add_reader(shard.control.fileno(), self.on_event, shard)
+
+    def on_event(self, shard):
+        try:
+            msg = shard.control.recv(PACKET)
+        except BlockingIOError:
+            return
+        if not msg:
+            self.retire(shard)
+            return
+        event = json.loads(msg)
+        if event["event"] == "room_opened":
+            self.pins[event["room"]] = shard.index
+            shard.rooms.add(event["room"])
+        elif event["event"] == "room_closed":
+            shard.rooms.discard(event["room"])
+            if self.pins.get(event["room"]) == shard.index:
+                del self.pins[event["room"]]
+        elif event["event"] == "stats":
+            _, future = self.pending.pop(event["id"], (None, None))
+            if future and not future.done():
+                future.set_result(event["stats"])
+        elif event["event"] == "drained":
+            # Keep the traffic counters of drained workers in the totals
+            for key in self.retired:
+                self.retired[key] += event["stats"][key]
+            log.info("shard %d drained", shard.index)
+
+    def retire(self, shard):
+        asyncio.get_running_loop().remove_reader(shard.control.fileno())
+        shard.control.close()
+        shard.process.join(timeout=1)
+        del self.shards[shard.index]
+        for request, (owner, future) in list(self.pending.items()):
+            if owner is shard:
+                del self.pending[request]
+                future.cancel()
+        for room_id in shard.rooms:
+            self.pins.pop(room_id, None)
+        if self.respawn:
+            log.info("respawning shard %d", shard.index)
+            self.shards[shard.index] = Shard(shard.index, self.worker_options)
+            self.watch(self.shards[shard.index])
+
+    def drain(self, index):
+        shard = self.shards.get(index)
+        if shard is None or shard.draining or len(self.live_shards()) < 2 and not self.respawn:
+            return False
+        shard.draining = True
+        shard.control.send(json.dumps({"cmd": "drain"}).encode())
+        log.info("draining shard %d (%d rooms)", index, len(shard.rooms))
+        return True
+
+    async def stats(self):
+        loop = asyncio.get_running_loop()
+        requests = []
+        for shard in list(self.shards.values()):
+            self.next_request += 1
+            future = loop.create_future()
+            self.pending[self.next_request] = (shard, future)
+            shard.control.send(json.dumps({"cmd": "stats", "id": self.next_request}).encode())
+            requests.append((self.next_request, shard, future))
+        if requests:
+            await asyncio.wait([future for _, _, future in requests], timeout=STATS_WAIT)
+
+        replies, missing = [], []
+        for request, shard, future in requests:
+            self.pending.pop(request, None)
+            if self.shards.get(shard.index) is not shard:
+                continue   # retired meanwhile; a drained worker's counters are in self.retired
+            if future.done():
+                replies.append((shard, future.result()))
+            else:
+                future.cancel()
+                missing.append(shard.index)
+        if missing:
+            log.warning("no stats from shards %s within %.0fs", missing, STATS_WAIT)
+
+        total = {key: sum(stats[key] for _, stats in replies)
+                 for key in ("rooms", "connections", "messagesIn", "messagesOut", "framesOut",
+                             "messagesDropped", "bytesIn", "bytesOut", "cpuSeconds", "rssBytes")}
+        for key, value in self.retired.items():
+            total[key] += value
+        snapshots = [stats["snapshots"] for _, stats in replies if "snapshots" in stats]
+        if snapshots:
+            total["snapshots"] = {key: sum(s[key] for s in snapshots) for key in snapshots[0]}
+        cpu, rss = process_usage()
+        total["cpuSeconds"] += cpu
+        total["rssBytes"] += rss
+        total["shards"] = {shard.index: dict(stats, draining=shard.draining) for shard, stats in replies}
+        total["missing"] = missing
+        return total
+
+    def is_admin(self, data):
+        token = data.get("token") if isinstance(data, dict) else None
+        return bool(self.admin_token) and isinstance(token, str) and secrets.compare_digest(
+            token.encode(), self.admin_token.encode())
+
+    # ── Connections ──
+    async def handle(self, sock):
+        loop = asyncio.get_running_loop()
+        buf = b""
+        try:
+            while b"\n" not in buf:
+                chunk = await loop.sock_recv(sock, PACKET)
+                if not chunk:
+                    sock.close()
+                    return
+                buf += chunk
+                # Everything read so far rides along in one SEQPACKET message
+                if len(buf) > PACKET:
+                    await loop.sock_sendall(sock, encode("reject", {"reason": "first message too large"}))
+                    sock.close()
+                    return
+            type, data = decode(buf[:buf.index(b"\n") + 1])
+        except (ValueError, OSError):
+            sock.close()
+            return
+
+        if type == "join" and isinstance(data, dict) and data.get("room"):
+            await self.hand_off(self.shards[self.route(str(data["room"]))], buf, sock)
+        elif type == "quickMatch" and isinstance(data, dict):
+            live = self.live_shards() or list(self.shards)
+            await self.hand_off(self.shards[shard_for(f"quickMatch:{data.get('format')}", live)], buf, sock)
+        else:
+            try:
+                await loop.sock_sendall(sock, await self.command(type, data))
+            except (OSError, asyncio.TimeoutError):
+                pass
+            finally:
+                sock.close()
+
+    async def hand_off(self, shard, buf, sock):
+        """Pass the client socket and the bytes read from it to ``shard``'s worker."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + HAND_OFF_WAIT
+        try:
+            while True:
+                try:
+                    socket.send_fds(shard.control, [buf], [sock.fileno()])
+                    return
+                except BlockingIOError:
+                    # The worker is behind on its control socket (a join surge)
+                    if loop.time() > deadline:
+                        break
+                    await asyncio.sleep(0.005)
+            log.warning("shard %d control socket full; refusing a join", shard.index)
+            await loop.sock_sendall(sock, encode("reject", {"reason": "busy", "retryAfter": 1.0}))
+        except OSError as e:
+            log.warning("hand-off to shard %d failed: %s", shard.index, e)
+        finally:
+            sock.close()
+
+    async def command(self, type, data):
+        """Reply frame for a first message that is not a join."""
+        if type not in ("stats", "drain"):
+            return encode("reject", {"reason": "join a room first"})
+        if not self.is_admin(data):
+            return encode("reject", {"reason": "admin token required"})
+        if type == "stats":
+            return encode("stats", await self.stats())
+        shard = data.get("shard")
+        if not isinstance(shard, int) or isinstance(shard, bool):
+            return encode("reject", {"reason": "drain needs an integer shard"})
+        return encode("drain", {"shard": shard, "ok": self.drain(shard)})
+
+    async def serve(self, host, port):
+        loop = asyncio.get_running_loop()
+        for shard in self.shards.values():
+            self.watch(shard)
+        listener = socket.create_server((host, port), backlog=4096, reuse_port=False)
+        listener.setblocking(False)
+        log.info("acceptor listening on %s:%s with %d shards", host, port, len(self.shards))
+        while True:
+            sock, _ = await loop.sock_accept(listener)
+            sock.setblocking(False)
+            asyncio.ensure_future(self.handle(sock))
+
+
+async def send_drain(host, port, index, token):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(encode("drain", {"shard": index, "token": token}))
+    _, data = decode(await reader.readline())
+    writer.close()
+    return data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sharded Sequence room server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--respawn", action="store_true", help="replace drained workers")
+    parser.add_argument("--drain", type=int, metavar="SHARD", help="ask a running acceptor to drain a shard")
+    parser.add_argument("--admin-token", default=os.environ.get("SEQUENCE_ADMIN_TOKEN"),
+                        help="token that stats and drain requests must carry (default: $SEQUENCE_ADMIN_TOKEN)")
+    parser.add_argument("--park-after", type=float, default=30.0,
+                        help="idle seconds before a room's game is packed (0 keeps every game live)")
+    parser.add_argument("--snapshots", metavar="DIR", help="save and resume room state in DIR")
+    parser.add_argument("--snapshot-delay", type=float, default=0.5,
+                        help="seconds a room must be quiet before its snapshot is written")
+    parser.add_argument("--snapshot-max-delay", type=float, default=2.0,
+                        help="longest a change waits to be written")
+    args = parser.parse_args(argv)
+
+    if args.drain is not None:
+        if not args.admin_token:
+            parser.error("--drain needs --admin-token")
+        result = asyncio.run(send_drain(args.host, args.port, args.drain, args.admin_token))
+        print(json.dumps(result))
+        return 0 if result.get("ok") else 1
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s acceptor %(message)s")
+    try:
+        acceptor = Acceptor(args.workers, args.respawn, args.admin_token, {
+            "park_after": args.park_after, "snapshots": args.snapshots,
+            "snapshot_delay": args.snapshot_delay, "snapshot_max_delay": args.snapshot_max_delay})
+        asyncio.run(acceptor.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""Join-latency benchmark for the signaling server.
+
+Simulates what peerjs.min.js does when rooms form: each room's host
+registers the room id as its peer id, then its joiners fetch an id
+(``GET /peerjs/id``), open the signaling socket, send an ``OFFER`` plus
+ICE candidates to the host and wait until the host's ``ANSWER`` and
+candidates arrive. That is everything a join needs from the broker;
+WebRTC's own ICE checks come after it and are not simulated.
+
+Per joiner it reports time-to-open (id request to ``OPEN``) and
+time-to-connection (id request to the last host candidate), next to the
+server's own view from ``GET /stats``.
+
+    python -m server.signal_bench --spawn --rooms 200
+    python -m server.signal_bench --spawn --rooms 200 --delay 150 --budget-ms 1000
+    python -m server.signal_bench --port 9000 --rooms 50 --joiners 2 --json
+
+With --budget-ms the exit status is 1 when the p95 time-to-connection is
+over budget, so CI can gate on join latency.
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from .loadgen import LOCALHOST, wait_for_port
+from .protocol import gen_id
+from .signaling import summary
+from .websocket import ConnectionClosed, connect, read_http_head
+
+FAKE_SDP = "v=0\r\no=- 0 0 IN IP4 127.0.0.1\r\ns=-\r\nt=0 0\r\n" + "a=x-padding\r\n" * 40
+
+
+async def http_get(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nConnection: close\r\n\r\n".encode())
+    status, headers = await read_http_head(reader)
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    writer.close()
+    if status.split()[1:2] != ["200"]:
+        raise RuntimeError(f"GET {path}: {status}")
+    return body.decode()
+
+
+async def open_peer(args, id):
+    ws = await connect(args.host, args.port, f"/peerjs?key={args.key}&id={id}&token={gen_id(10)}")
+    reply = json.loads(await ws.recv())
+    if reply.get("type") != "OPEN":
+        ws.close()
+        raise RuntimeError(f"{id}: {reply.get('type')}")
+    return ws
+
+
+def send(ws, type, dst, payload):
+    ws.send(json.dumps({"type": type, "dst": dst, "payload": payload}))
+
+
+def candidate(i):
+    return {"candidate": {"candidate": f"candidate:{i} 1 udp 2122260223 127.0.0.1 {50000 + i} typ host",
+                          "sdpMid": "0", "sdpMLineIndex": 0}, "type": "data", "connectionId": "dc"}
+
+
+async def run_host(args, room_id, ready, done):
+    ws = await open_peer(args, room_id)
+    ready.set()
+    try:
+        while not done.is_set():
+            message = json.loads(await ws.recv())
+            if message.get("type") == "OFFER":
+                src = message["src"]
+                send(ws, "ANSWER", src, {"sdp": {"type": "answer", "sdp": FAKE_SDP}, "type": "data",
+                                         "connectionId": message["payload"]["connectionId"]})
+                for i in range(args.candidates):
+                    send(ws, "CANDIDATE", src, candidate(i))
+    except ConnectionClosed:
+        pass
+    finally:
+        ws.close()
+
+
+async def run_joiner(args, room_id, results):
+    start = time.perf_counter()
+    id = await http_get(args.host, args.port, f"/{args.key}/id?ts={time.time()}")
+    ws = await open_peer(args, id)
+    opened = time.perf_counter()
+    connection_id = "dc_" + gen_id(10)
+    send(ws, "OFFER", room_id, {"sdp": {"type": "offer", "sdp": FAKE_SDP}, "type": "data",
+                                "connectionId": connection_id, "reliable": True})
+    for i in range(args.candidates):
+        send(ws, "CANDIDATE", room_id, candidate(i))
+    answered, candidates = False, 0
+    try:
+        while not answered or candidates < args.candidates:
+            message = json.loads(await asyncio.wait_for(ws.recv(), args.timeout))
+            if message.get("type") == "ANSWER":
+                answered = True
+            elif message.get("type") == "CANDIDATE":
+                candidates += 1
+            elif message.get("type") == "EXPIRE":
+                raise RuntimeError(f"{room_id}: host unavailable")
+        connected = time.perf_counter()
+        results["open"].append((opened - start) * 1e3)
+        results["connect"].append((connected - start) * 1e3)
+    finally:
+        ws.close()
+
+
+async def run_room(args, room_id, delay, results):
+    await asyncio.sleep(delay)
+    ready, done = asyncio.Event(), asyncio.Event()
+    host = asyncio.create_task(run_host(args, room_id, ready, done))
+    try:
+        await asyncio.wait_for(ready.wait(), args.timeout)
+        joined = await asyncio.gather(*(run_joiner(args, room_id, results) for _ in range(args.joiners)),
+                                      return_exceptions=True)
+        results["errors"] += sum(isinstance(r, Exception) for r in joined)
+    except (asyncio.TimeoutError, OSError, RuntimeError, ConnectionClosed):
+        results["errors"] += 1
+    finally:
+        done.set()
+        host.cancel()
+
+
+async def run(args):
+    results = {"open": [], "connect": [], "errors": 0}
+    start = time.perf_counter()
+    await asyncio.gather(*(run_room(args, gen_id(8), args.ramp * random.random(), results)
+                           for _ in range(args.rooms)))
+    elapsed = time.perf_counter() - start
+    server = json.loads(await http_get(args.host, args.port, "/stats"))
+    server.pop("recent", None)
+    return {
+        "rooms": args.rooms,
+        "joiners": args.rooms * args.joiners,
+        "elapsedSec": elapsed,
+        "timeToOpenMs": summary(results["open"]),
+        "timeToConnectionMs": summary(results["connect"]),
+        "errors": results["errors"],
+        "server": server,
+    }
+
+
+def print_report(report):
+    print(f"{report['rooms']} rooms, {report['joiners']} joiners in {report['elapsedSec']:.2f}s, "
+          f"{report['errors']} errors")
+    print(f"  {'client view':<22}{'p50':>9}{'p90':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for name, key in (("time to open", "timeToOpenMs"), ("time to connection", "timeToConnectionMs")):
+        s = report[key]
+        print(f"  {name:<22}{s['p50']:>9.2f}{s['p90']:>9.2f}{s['p95']:>9.2f}{s['p99']:>9.2f}{s['max']:>9.2f}")
+    print(f"  {'server view':<22}")
+    for key in ("openMs", "idToOpenMs", "answerMs", "connectMs"):
+        s = report["server"].get(key)
+        if s:
+            print(f"  {key:<22}{s['p50']:>9.2f}{s['p90']:>9.2f}{s['p95']:>9.2f}{s['p99']:>9.2f}{s['max']:>9.2f}")
+    counters = report["server"]["counters"]
+    print("  server counters: " + ", ".join(f"{k} {v}" for k, v in sorted(counters.items())))
+
+
+def parser():
+    p = argparse.ArgumentParser(description="Benchmark join latency against the signaling server")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=9000)
+    p.add_argument("--key", default="peerjs")
+    p.add_argument("--spawn", action="store_true", help="start a local signaling server for the run")
+    p.add_argument("--delay", type=float, default=0.0, help="with --spawn, the server's added latency in ms")
+    p.add_argument("--rooms", type=int, default=100)
+    p.add_argument("--joiners", type=int, choices=(1, 2), default=1, help="joiners per room")
+    p.add_argument("--candidates", type=int, default=4, help="ICE candidates each side sends")
+    p.add_argument("--ramp", type=float, default=1.0, help="seconds over which rooms are started")
+    p.add_argument("--timeout", type=float, default=10.0, help="seconds before a join counts as failed")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--budget-ms", type=float, help="fail when p95 time-to-connection exceeds this")
+    p.add_argument("--json", action="store_true", help="print the report as JSON")
+    return p
+
+
+def main(argv=None):
+    args = parser().parse_args(argv)
+    if args.host not in LOCALHOST:
+        print("signal_bench only targets a server on localhost", file=sys.stderr)
+        return 2
+    random.seed(args.seed)
+
+    server = None
+    if args.spawn:
+        cmd = [sys.executable, "-m", "server.signaling", "--host", args.host, "--port", str(args.port),
+               "--key", args.key, "--delay", str(args.delay)]
+        server = subprocess.Popen(cmd, cwd=Path(__file__).resolve().parent.parent)
+    try:
+        wait_for_port(args.host, args.port)
+        report = asyncio.run(run(args))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    p95 = report["timeToConnectionMs"]["p95"]
+    if args.budget_ms is not None and p95 > args.budget_ms:
+        print(f"FAIL: p95 time to connection {p95:.1f} ms exceeds "
+              f"budget {args.budget_ms:.1f} ms", file=sys.stderr)
+        return 1
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
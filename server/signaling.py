@@ -0,0 +1,361 @@
+"""Local PeerJS-compatible signaling server.
+
+A localhost stand-in for the PeerJS cloud broker that ``startSession``
+uses, so connection setup can run (and be measured) offline and in CI.
+It speaks the PeerJS server protocol that peerjs.min.js expects:
+
+  * ``GET /<key>/id`` hands out a fresh peer id (joiners ask for one).
+  * ``GET /peerjs?key=&id=&token=`` upgrades to a WebSocket. The server
+    answers ``OPEN``, or ``ID-TAKEN`` if another token holds the id. The
+    same token reconnecting takes its id back, like ``peer.reconnect()``.
+  * ``OFFER``/``ANSWER``/``CANDIDATE``/``LEAVE`` are relayed to ``dst``
+    with ``src`` set. Messages for a peer that is not connected wait up
+    to --expire seconds and then come back to the sender as ``EXPIRE``
+    (PeerJS reports that as ``peer-unavailable``).
+  * ``HEARTBEAT`` keeps a client alive; silent ones are dropped after
+    --alive-timeout seconds.
+
+Every client is timed: ``openMs`` from the upgrade request to ``OPEN``,
+``idToOpenMs`` from handing out its id to ``OPEN`` (the client's whole
+registration), ``answerMs`` from relaying an ``OFFER`` to relaying its
+``ANSWER`` and ``connectMs`` from a joiner's ``OPEN`` to the answer that
+completes its signaling (only ICE is left after that). ``GET /stats``
+returns percentiles of each plus counters; --log writes one JSON line
+per client when it leaves. --delay adds latency to everything the
+server sends, to emulate a distant broker when tuning the watchdogs.
+
+    python -m server.signaling --port 9000
+    python -m server.signaling --port 9000 --delay 150 --log signaling.jsonl
+
+Point the game at it with ``?signal=localhost:9000`` (see game.js).
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+import uuid
+from collections import defaultdict, deque
+from urllib.parse import parse_qs, urlsplit
+
+from .websocket import ConnectionClosed, WebSocket, handshake_response, is_upgrade, read_http_head
+
+log = logging.getLogger("signaling")
+
+RELAYED = frozenset(("OFFER", "ANSWER", "CANDIDATE", "LEAVE", "EXPIRE"))
+RECENT_CLIENTS = 200
+SERVER_INFO = {"name": "PeerJS Server", "description": "Local signaling server for Sequence",
+               "website": "https://peerjs.com/"}
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+
+def summary(values):
+    values = sorted(values)
+    return {"count": len(values), "p50": percentile(values, 50), "p90": percentile(values, 90),
+            "p95": percentile(values, 95), "p99": percentile(values, 99),
+            "max": values[-1] if values else 0.0}
+
+
+def ms(start, end):
+    return round((end - start) * 1e3, 3) if start is not None and end is not None else None
+
+
+class Client:
+    def __init__(self, id, token, ws, server):
+        self.id = id
+        self.token = token
+        self.ws = ws
+        self.server = server
+        self.last_seen = time.monotonic()
+        self.upgrade_at = None
+        self.open_at = None
+        self.connect_ms = None
+        self.reconnects = 0
+        self.relayed = 0
+
+    def send(self, message):
+        self.server.send(self.ws, message)
+
+    def record(self):
+        return {"id": self.id, "openMs": ms(self.upgrade_at, self.open_at),
+                "idToOpenMs": ms(self.server.issued.get(self.id), self.open_at),
+                "connectMs": self.connect_ms, "reconnects": self.reconnects, "relayed": self.relayed}
+
+
+class SignalingServer:
+    def __init__(self, key="peerjs", expire=5.0, alive_timeout=60.0, delay=0.0,
+                 allow_discovery=False, log_file=None):
+        self.key = key
+        self.expire = expire
+        self.alive_timeout = alive_timeout
+        self.delay = delay
+        self.allow_discovery = allow_discovery
+        self.log_file = log_file
+        self.clients = {}                 # peer id -> Client
+        self.queues = defaultdict(list)   # offline peer id -> [(queued at, message)]
+        self.issued = {}                  # peer id -> time handed out by GET /<key>/id
+        self.offers = {}                  # (src, dst) -> time the first OFFER was relayed
+        self.recent = deque(maxlen=RECENT_CLIENTS)
+        self.counters = defaultdict(int)
+        self.timings = defaultdict(list)  # openMs, idToOpenMs, answerMs, connectMs
+
+    # ── Sending ──
+    def send(self, ws, message):
+        text = json.dumps(message, separators=(",", ":"))
+        self.counters["messagesOut"] += 1
+        if self.delay:
+            asyncio.get_running_loop().call_later(self.delay, ws.send, text)
+        else:
+            ws.send(text)
+
+    def stats(self):
+        return {
+            "clients": len(self.clients),
+            "queued": sum(map(len, self.queues.values())),
+            "counters": dict(self.counters),
+            **{name: summary(values) for name, values in sorted(self.timings.items())},
+            "recent": list(self.recent),
+        }
+
+    # ── Registration ──
+    def register(self, ws, id, token, upgrade_at):
+        client = self.clients.get(id)
+        if client is not None and client.token != token:
+            self.counters["idTaken"] += 1
+            self.send(ws, {"type": "ID-TAKEN", "payload": {"msg": "ID is taken"}})
+            return None
+        if client is not None:
+            # Same token: the page called peer.reconnect() on a fresh socket
+            client.reconnects += 1
+            self.counters["reconnects"] += 1
+            if client.ws is not ws:
+                client.ws.close()
+            client.ws = ws
+        else:
+            client = self.clients[id] = Client(id, token, ws, self)
+        client.upgrade_at = upgrade_at
+        client.last_seen = time.monotonic()
+        client.send({"type": "OPEN"})
+        client.open_at = time.monotonic()
+        self.counters["opened"] += 1
+        self.timings["openMs"].append(ms(upgrade_at, client.open_at))
+        if id in self.issued:
+            self.timings["idToOpenMs"].append(ms(self.issued[id], client.open_at))
+        for _, message in self.queues.pop(id, ()):
+            client.send(message)
+        return client
+
+    def unregister(self, client, ws):
+        if self.clients.get(client.id) is not client or client.ws is not ws:
+            return   # already replaced by a reconnect
+        del self.clients[client.id]
+        record = client.record()
+        self.issued.pop(client.id, None)
+        for pair in [pair for pair in self.offers if client.id in pair]:
+            del self.offers[pair]
+        self.recent.append(record)
+        if self.log_file:
+            self.log_file.write(json.dumps(record) + "\n")
+            self.log_file.flush()
+
+    # ── Relay ──
+    def handle(self, client, message):
+        client.last_seen = time.monotonic()
+        type = message.get("type")
+        if type == "HEARTBEAT":
+            self.counters["heartbeats"] += 1
+            return
+        if not isinstance(type, str) or type not in RELAYED:
+            self.counters["unknown"] += 1
+            return
+        dst = message.get("dst")
+        if dst is not None and not isinstance(dst, str):
+            self.counters["malformed"] += 1
+            return
+        out = {"type": type, "src": client.id, "dst": dst, "payload": message.get("payload")}
+        self.counters[type.lower()] += 1
+        client.relayed += 1
+        self.time_offer(client.id, dst, type)
+        target = self.clients.get(dst)
+        if target is not None:
+            target.send(out)
+        elif type == "LEAVE" and not dst:
+            self.close(client)
+        elif type not in ("LEAVE", "EXPIRE") and dst:
+            self.queues[dst].append((time.monotonic(), out))
+
+    def time_offer(self, src, dst, type):
+        now = time.monotonic()
+        if type == "OFFER":
+            self.offers.setdefault((src, dst), now)
+        elif type == "ANSWER":
+            # dst made the offer; its signaling is done once this is relayed
+            offered = self.offers.pop((dst, src), None)
+            if offered is None:
+                return
+            self.timings["answerMs"].append(ms(offered, now))
+            joiner = self.clients.get(dst)
+            if joiner is not None and joiner.connect_ms is None:
+                joiner.connect_ms = ms(joiner.open_at, now)
+                self.timings["connectMs"].append(joiner.connect_ms)
+
+    def close(self, client):
+        client.ws.close()
+
+    # ── Housekeeping ──
+    async def sweep(self, interval=1.0):
+        """Expire queued messages and drop clients that stopped heartbeating."""
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            for dst, queue in list(self.queues.items()):
+                expired = [m for queued_at, m in queue if now - queued_at > self.expire]
+                if not expired:
+                    continue
+                self.queues[dst] = [(t, m) for t, m in queue if now - t <= self.expire]
+                if not self.queues[dst]:
+                    del self.queues[dst]
+                notified = set()
+                for message in expired:
+                    src = self.clients.get(message["src"])
+                    self.counters["expired"] += 1
+                    if src is not None and message["src"] not in notified:
+                        notified.add(message["src"])
+                        src.send({"type": "EXPIRE", "src": dst, "dst": message["src"]})
+            for client in list(self.clients.values()):
+                if now - client.last_seen > self.alive_timeout:
+                    self.counters["timedOut"] += 1
+                    self.close(client)
+            cutoff = now - 10 * self.alive_timeout
+            for id in [id for id, t in self.issued.items() if t < cutoff and id not in self.clients]:
+                del self.issued[id]
+
+    # ── HTTP ──
+    def http_response(self, writer, status, body, content_type="application/json"):
+        if not isinstance(body, bytes):
+            body = (body if isinstance(body, str) else json.dumps(body)).encode()
+        writer.write((f"HTTP/1.1 {status}\r\n"
+                      f"Content-Type: {content_type}\r\n"
+                      f"Content-Length: {len(body)}\r\n"
+                      "Access-Control-Allow-Origin: *\r\n"
+                      "Cache-Control: no-store\r\n"
+                      "Connection: close\r\n\r\n").encode() + body)
+
+    def route(self, writer, path):
+        parts = [p for p in path.split("/") if p]
+        if not parts:
+            self.http_response(writer, "200 OK", SERVER_INFO)
+        elif parts == ["stats"]:
+            self.http_response(writer, "200 OK", self.stats())
+        elif parts == [self.key, "id"]:
+            id = str(uuid.uuid4())
+            self.issued[id] = time.monotonic()
+            self.counters["idsIssued"] += 1
+            self.http_response(writer, "200 OK", id, "text/html")
+        elif parts == [self.key, "peers"] and self.allow_discovery:
+            self.http_response(writer, "200 OK", list(self.clients))
+        elif parts == [self.key, "peers"]:
+            self.http_response(writer, "401 Unauthorized", "discovery is disabled", "text/plain")
+        else:
+            self.http_response(writer, "404 Not Found", "not found", "text/plain")
+
+    async def handle_connection(self, reader, writer):
+        try:
+            request, headers = await read_http_head(reader)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        upgrade_at = time.monotonic()
+        method, target = (request.split() + ["", ""])[:2]
+        url = urlsplit(target)
+        if method == "OPTIONS":
+            self.http_response(writer, "204 No Content", b"", "text/plain")
+        elif method != "GET":
+            self.http_response(writer, "405 Method Not Allowed", "GET only", "text/plain")
+        elif not is_upgrade(headers):
+            self.route(writer, url.path)
+        else:
+            writer.write(handshake_response(headers))
+            await self.handle_socket(WebSocket(reader, writer), parse_qs(url.query), upgrade_at)
+            return
+        await writer.drain()
+        writer.close()
+
+    async def handle_socket(self, ws, query, upgrade_at):
+        key, id, token = (query.get(name, [""])[0] for name in ("key", "id", "token"))
+        if not (key and id and token):
+            self.send(ws, {"type": "ERROR", "payload": {"msg": "No id, token, or key supplied to websocket server"}})
+            ws.close()
+            return
+        if key != self.key:
+            self.send(ws, {"type": "ERROR", "payload": {"msg": "Invalid key provided"}})
+            ws.close()
+            return
+        client = self.register(ws, id, token, upgrade_at)
+        if client is None:
+            ws.close()
+            return
+        try:
+            while True:
+                text = await ws.recv()
+                self.counters["messagesIn"] += 1
+                try:
+                    message = json.loads(text)
+                except ValueError:
+                    self.counters["malformed"] += 1
+                    continue
+                if isinstance(message, dict):
+                    self.handle(client, message)
+        except ConnectionClosed:
+            pass
+        finally:
+            self.unregister(client, ws)
+            ws.close()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        sweeper = asyncio.create_task(self.sweep())
+        log.info("signaling server listening on %s:%s (key %s)", host, port, self.key)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            sweeper.cancel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local PeerJS-compatible signaling server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--key", default="peerjs", help="API key clients must present")
+    parser.add_argument("--expire", type=float, default=5.0,
+                        help="seconds a message for an offline peer waits before EXPIRE")
+    parser.add_argument("--alive-timeout", type=float, default=60.0,
+                        help="seconds without a message before a client is dropped")
+    parser.add_argument("--delay", type=float, default=0.0, help="milliseconds added to every message sent")
+    parser.add_argument("--allow-discovery", action="store_true", help="serve GET /<key>/peers")
+    parser.add_argument("--log", metavar="FILE", help="append one JSON line per client that leaves")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    log_file = open(args.log, "a", encoding="utf-8") if args.log else None
+    server = SignalingServer(args.key, args.expire, args.alive_timeout, args.delay / 1e3,
+                             args.allow_discovery, log_file)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if log_file:
+            log_file.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
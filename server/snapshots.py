@@ -0,0 +1,204 @@
+"""Coalesced on-disk room snapshots.
+
+The server-side counterpart of ``saveGameState``/``flushGameState`` in
+game.js. A room that changes is only marked dirty and its version bumps.
+Dirty rooms are written together once the room has been quiet for
+``delay`` seconds, and never later than ``max_delay`` after the first
+unsaved change. A burst of moves, and the sequence sync that follows
+them, costs one write per room. A room that closes, and the server
+shutting down, flush at once. Once ``flush_now`` has run at shutdown,
+the writer thread is gone and any later flush (a connection that closes
+after it) is written on the spot.
+
+Each snapshot is ``<directory>/<room id>.json``, replaced atomically.
+Writes run on one background thread, so they never block the event
+loop and land in order. A room id that comes back after a restart
+resumes from its snapshot. Players rejoining with the same playerID get
+their hands back, as on any reconnect.
+
+A write that fails (disk full, permissions) is logged, and the room is
+marked dirty again, so it is retried with the next flush. The counters
+are only updated on the event loop.
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+log = logging.getLogger("snapshots")
+
+SAFE_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class SnapshotStore:
+    def __init__(self, directory, delay=0.5, max_delay=2.0):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.delay = delay
+        self.max_delay = max_delay
+        self.dirty = {}          # room id -> room with unsaved changes
+        self.versions = {}       # room id -> version of its latest change
+        self.first_dirty = None  # loop time of the oldest unsaved change
+        self.handle = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="snapshots")
+        self.in_flight = {}      # future -> batch being written by the executor
+        self.closing = False
+        self.requests = 0
+        self.writes = 0
+        self.bytes_written = 0
+        self.failures = 0
+
+    def path_for(self, room_id):
+        return self.directory / f"{room_id}.json" if SAFE_ID.match(room_id) else None
+
+    def stats(self):
+        return {"requests": self.requests, "writes": self.writes, "bytes": self.bytes_written,
+                "failures": self.failures, "pending": len(self.dirty)}
+
+    # ── Scheduling ──
+    def mark_dirty(self, room):
+        if not self.path_for(room.id):
+            return
+        self.requests += 1
+        self.versions[room.id] = self.versions.get(room.id, 0) + 1
+        self.dirty[room.id] = room
+        self.schedule()
+
+    def schedule(self):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if self.first_dirty is None:
+            self.first_dirty = now
+        if self.handle:
+            self.handle.cancel()
+        self.handle = loop.call_at(min(now + self.delay, self.first_dirty + self.max_delay), self.flush)
+
+    def flush(self, room_ids=None):
+        """Write the dirty rooms (or just ``room_ids``) in the background."""
+        batch = self.take(room_ids)
+        if not batch:
+            return
+        if self.closing:
+            self.write_now(batch)
+            return
+        loop = asyncio.get_running_loop()
+        future = self.executor.submit(self.write_all, batch)
+        self.in_flight[future] = batch
+        future.add_done_callback(lambda f: loop.call_soon_threadsafe(self.written, f, batch))
+
+    def flush_now(self):
+        """Write everything dirty before returning, e.g. at shutdown."""
+        self.closing = True
+        self.executor.shutdown(wait=True)
+        # The loop may never get to these callbacks; settle them (and their retries) here
+        for future, batch in list(self.in_flight.items()):
+            self.written(future, batch)
+        self.write_now(self.take())
+
+    def write_now(self, batch):
+        writes, size, failed = self.write_all(batch)
+        self.writes += writes
+        self.bytes_written += size
+        for room, _, error in failed:
+            self.failures += 1
+            log.error("snapshot of room %s lost at shutdown: %s", room.id, error)
+
+    def written(self, future, batch):
+        """Back on the loop after a background write: count it, retry what failed."""
+        if self.in_flight.pop(future, None) is None:
+            return   # already settled by flush_now
+        try:
+            writes, size, failed = future.result()
+        except Exception as e:   # not an OSError from one file: treat the whole batch as failed
+            writes, size, failed = 0, 0, [(room, version, e) for room, _, version, _ in batch]
+        self.writes += writes
+        self.bytes_written += size
+        for room, version, error in failed:
+            self.failures += 1
+            log.warning("snapshot of room %s not written, will retry: %s", room.id, error)
+            if room.id not in self.dirty:   # else a newer change is already pending
+                self.versions.setdefault(room.id, version)
+                self.dirty[room.id] = room
+                if self.closing:
+                    self.flush([room.id])
+                else:
+                    self.schedule()
+
+    def take(self, room_ids=None):
+        ids = list(self.dirty) if room_ids is None else [i for i in room_ids if i in self.dirty]
+        # Serialized here, on the loop, so the snapshot is consistent
+        batch = []
+        for i in ids:
+            room = self.dirty.pop(i)
+            batch.append((room, self.path_for(i), self.versions[i], self.encode(room)))
+        if not self.dirty:
+            if self.handle:
+                self.handle.cancel()
+            self.handle = None
+            self.first_dirty = None
+        return batch
+
+    def encode(self, room):
+        return json.dumps(dict(room.snapshot(), version=self.versions[room.id]),
+                          separators=(",", ":")).encode()
+
+    def write_all(self, batch):
+        """Runs on the writer thread; returns ``(writes, bytes, failed)`` for the loop."""
+        writes = size = 0
+        failed = []
+        for room, path, version, data in batch:
+            tmp = path.with_name(path.name + ".tmp")
+            try:
+                tmp.write_bytes(data)
+                os.replace(tmp, path)
+            except OSError as e:
+                failed.append((room, version, e))
+                continue
+            writes += 1
+            size += len(data)
+        return writes, size, failed
+
+    # ── Room lifecycle ──
+    def has(self, room_id):
+        path = self.path_for(room_id)
+        return bool(path and path.exists())
+
+    def peek(self, room_id):
+        """The saved snapshot, without claiming the room (see ``load``)."""
+        path = self.path_for(room_id)
+        if not path or not path.exists():
+            return None
+        try:
+            return json.loads(path.read_bytes())
+        except (OSError, ValueError):
+            return None
+
+    def load(self, room_id):
+        data = self.peek(room_id)
+        if data is not None:
+            self.versions[room_id] = data.get("version", 0)
+        return data
+
+    def closed(self, room):
+        """Flush a closing room; a finished game's snapshot is deleted."""
+        if room.game is not None and room.game.over:
+            self.dirty.pop(room.id, None)
+            path = self.path_for(room.id)
+            if path and self.closing:
+                try:
+                    path.unlink(missing_ok=True)
+                except OSError as e:
+                    log.warning("finished game's snapshot not deleted: %s", e)
+            elif path:
+                self.executor.submit(path.unlink, missing_ok=True).add_done_callback(unlink_done)
+        else:
+            self.flush([room.id])
+        self.versions.pop(room.id, None)
+
+
+def unlink_done(future):
+    if future.exception():
+        log.warning("finished game's snapshot not deleted: %s", future.exception())
@@ -0,0 +1,169 @@
+"""Minimal RFC 6455 WebSocket framing over asyncio streams.
+
+Just enough for the signaling server and its benchmark client: the HTTP
+upgrade handshake on both sides, text/binary messages (fragmented ones
+are reassembled), ping/pong and close. No extensions or subprotocols,
+so browsers fall back to uncompressed frames, which is all PeerJS needs.
+"""
+import asyncio
+import base64
+import hashlib
+import os
+import struct
+
+GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MAX_MESSAGE = 1 << 20
+
+CONTINUATION, TEXT, BINARY, CLOSE, PING, PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+
+
+class ConnectionClosed(Exception):
+    pass
+
+
+def accept_key(key):
+    return base64.b64encode(hashlib.sha1((key + GUID).encode()).digest()).decode()
+
+
+async def read_http_head(reader):
+    """Request/status line and lower-cased headers of an HTTP/1.1 head."""
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    return lines[0], headers
+
+
+def is_upgrade(headers):
+    return (headers.get("upgrade", "").lower() == "websocket"
+            and "sec-websocket-key" in headers)
+
+
+def handshake_response(headers):
+    return ("HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept_key(headers['sec-websocket-key'])}\r\n\r\n").encode()
+
+
+def encode_frame(opcode, payload, mask=False):
+    """One final frame; clients must mask, servers must not."""
+    n = len(payload)
+    head = bytearray([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    if n < 126:
+        head.append(mask_bit | n)
+    elif n < 1 << 16:
+        head.append(mask_bit | 126)
+        head += struct.pack("!H", n)
+    else:
+        head.append(mask_bit | 127)
+        head += struct.pack("!Q", n)
+    if mask:
+        key = os.urandom(4)
+        head += key
+        payload = apply_mask(payload, key)
+    return bytes(head) + payload
+
+
+def apply_mask(data, key):
+    n = len(data)
+    # XOR all of it at once as one big integer instead of byte by byte
+    repeated = (key * (n // 4 + 1))[:n]
+    return (int.from_bytes(data, "big") ^ int.from_bytes(repeated, "big")).to_bytes(n, "big")
+
+
+class WebSocket:
+    def __init__(self, reader, writer, client=False):
+        self.reader = reader
+        self.writer = writer
+        self.client = client   # clients mask what they send
+        self.closed = False
+
+    async def read_frame(self):
+        b0, b1 = await self.reader.readexactly(2)
+        n = b1 & 0x7F
+        if n == 126:
+            n = struct.unpack("!H", await self.reader.readexactly(2))[0]
+        elif n == 127:
+            n = struct.unpack("!Q", await self.reader.readexactly(8))[0]
+        if n > MAX_MESSAGE:
+            raise ConnectionClosed("frame too large")
+        key = await self.reader.readexactly(4) if b1 & 0x80 else None
+        payload = await self.reader.readexactly(n)
+        if key:
+            payload = apply_mask(payload, key)
+        return b0 & 0x80, b0 & 0x0F, payload
+
+    async def recv(self):
+        """The next text (str) or binary (bytes) message; answers pings."""
+        parts, kind = [], None
+        while True:
+            try:
+                fin, opcode, payload = await self.read_frame()
+            except (asyncio.IncompleteReadError, ConnectionError) as e:
+                self.closed = True
+                raise ConnectionClosed(str(e)) from None
+            if opcode == CLOSE:
+                if not self.closed:
+                    self.send_frame(CLOSE, payload[:2])
+                self.closed = True
+                raise ConnectionClosed("closed by peer")
+            if opcode == PING:
+                self.send_frame(PONG, payload)
+                continue
+            if opcode == PONG:
+                continue
+            if opcode != CONTINUATION:
+                kind = opcode
+            parts.append(payload)
+            if sum(map(len, parts)) > MAX_MESSAGE:
+                raise ConnectionClosed("message too large")
+            if fin:
+                data = b"".join(parts)
+                if kind != TEXT:
+                    return data
+                try:
+                    return data.decode()
+                except UnicodeDecodeError:
+                    self.close(1007)   # invalid frame payload data
+                    raise ConnectionClosed("text message is not UTF-8") from None
+
+    def send_frame(self, opcode, payload):
+        if self.writer.is_closing():
+            return
+        self.writer.write(encode_frame(opcode, payload, mask=self.client))
+
+    def send(self, message):
+        if self.closed:
+            return
+        if isinstance(message, str):
+            self.send_frame(TEXT, message.encode())
+        else:
+            self.send_frame(BINARY, message)
+
+    def close(self, code=1000):
+        if not self.closed:
+            self.closed = True
+            self.send_frame(CLOSE, struct.pack("!H", code))
+        self.writer.close()
+
+
+async def connect(host, port, path):
+    """Client side: open ``ws://host:port/path``."""
+    reader, writer = await asyncio.open_connection(host, port)
+    key = base64.b64encode(os.urandom(16)).decode()
+    writer.write((f"GET {path} HTTP/1.1\r\n"
+                  f"Host: {host}:{port}\r\n"
+                  "Upgrade: websocket\r\n"
+                  "Connection: Upgrade\r\n"
+                  f"Sec-WebSocket-Key: {key}\r\n"
+                  "Sec-WebSocket-Version: 13\r\n\r\n").encode())
+    status, headers = await read_http_head(reader)
+    if status.split()[1:2] != ["101"] or headers.get("sec-websocket-accept") != accept_key(key):
+        writer.close()
+        raise ConnectionClosed(f"handshake failed: {status}")
+    return WebSocket(reader, writer, client=True)
@@ -0,0 +1 @@
+"""Build and analysis tools for the static site."""
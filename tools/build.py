@@ -0,0 +1,281 @@
+"""Build the static site into dist/.
+
+JS, CSS and HTML are minified (tools/minify.py). Scripts and stylesheets
+get content-hashed names (``game.3f9a1c2e.js``) so they can be served with
+a long ``Cache-Control: immutable``; the pages keep their names and are
+rewritten to point at the hashed files. PeerJS is vendored instead of
+loaded from unpkg. Every text output also gets precompressed ``.gz``
+and, when the ``brotli`` module is installed, ``.br`` siblings.
+
+Builds are incremental: each output is keyed by the hash of its input
+(plus the hashed names it references), and unchanged outputs are reused
+from the previous build.
+
+    python -m tools.build                       # build dist/
+    python -m tools.build --peerjs peerjs.min.js
+    python -m tools.build --clean
+
+The PeerJS bundle is taken from --peerjs, else .build-cache/, else
+downloaded once from the URL in index.html. With --no-vendor the CDN
+<script> is left alone.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import re
+import shutil
+import sys
+import urllib.request
+from pathlib import Path
+
+from .minify import MINIFIERS
+
+ROOT = Path(__file__).resolve().parent.parent
+CACHE_DIR = ROOT / ".build-cache"
+BUILD_VERSION = "1"          # bump to invalidate every cached output
+
+# Hashed assets, dependencies first: a file may only reference ones above it
+ASSETS = ["style.css", "ai-weights.json", "ai-core.js", "ai-worker.js", "ai.js", "game.js"]
+# Chunks their parent may only load with import(), never statically
+LAZY_CHUNKS = {"ai.js": "game.js"}
+PAGES = ["index.html", "about.html", "privacy.html"]
+STATIC = ["favicon.ico", "CNAME", "ads.txt", "card_images"]   # copied as-is
+COMPRESS = {".js", ".css", ".html", ".json", ".svg", ".txt"}
+MIN_COMPRESS = 256
+
+PEERJS_TAG = re.compile(r'<script src="(https://unpkg\.com/peerjs@([\d.]+)/dist/peerjs\.min\.js)"></script>')
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def digest(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else part.encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def hashed_name(path, content):
+    p = Path(path)
+    return str(p.with_name(f"{p.stem}.{hashlib.sha256(content).hexdigest()[:8]}{p.suffix}"))
+
+
+def rewrite_refs(text, names):
+    """Point quoted references to source files at their hashed outputs."""
+    for src, out in names.items():
+        text = re.sub(rf"""(["'])(\./)?{re.escape(src)}\1""", lambda m: f"{m[1]}{m[2] or ''}{out}{m[1]}", text)
+    return text
+
+
+# ── PeerJS ────────────────────────────────────────────────────
+def vendor_peerjs(page, peerjs_path, allow_download):
+    """Bytes of the PeerJS bundle index.html pins, or None to keep the CDN tag."""
+    m = PEERJS_TAG.search(page)
+    if not m:
+        return None
+    url, version = m.groups()
+    if peerjs_path:
+        return Path(peerjs_path).read_bytes()
+    cached = CACHE_DIR / f"peerjs-{version}.min.js"
+    if not cached.exists():
+        if not allow_download:
+            return None
+        try:
+            with urllib.request.urlopen(url, timeout=30) as resp:
+                data = resp.read()
+        except OSError as e:
+            print(f"warning: could not fetch {url} ({e}); keeping the CDN script", file=sys.stderr)
+            return None
+        CACHE_DIR.mkdir(exist_ok=True)
+        cached.write_bytes(data)
+    return cached.read_bytes()
+
+
+# ── Build ─────────────────────────────────────────────────────
+class Builder:
+    def __init__(self, out_dir, previous):
+        self.out_dir = out_dir
+        self.previous = previous      # cache entries from the last build
+        self.entries = {}
+        self.names = {}               # source path -> hashed output path
+        self.rebuilt = []
+        self.reused = []
+
+    def write(self, rel, content):
+        path = self.out_dir / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        files = [rel]
+        suffix = Path(rel).suffix
+        if suffix in COMPRESS and len(content) >= MIN_COMPRESS:
+            (self.out_dir / f"{rel}.gz").write_bytes(gzip.compress(content, 9, mtime=0))
+            files.append(f"{rel}.gz")
+            if brotli:
+                (self.out_dir / f"{rel}.br").write_bytes(brotli.compress(content, quality=11))
+                files.append(f"{rel}.br")
+        return files
+
+    def reuse(self, src, key):
+        entry = self.previous.get(src)
+        if entry and entry["key"] == key and all((self.out_dir / f).exists() for f in entry["files"]):
+            self.entries[src] = entry
+            self.reused.append(src)
+            return entry
+        return None
+
+    def text(self, src, source, hashed, minify=True):
+        # Only the hashed names this file mentions go into its key
+        refs = sorted(out for name, out in self.names.items() if minify and name.encode() in source)
+        refs = json.dumps(refs)
+        key = digest(BUILD_VERSION, source, refs)
+        entry = self.reuse(src, key)
+        if entry is None:
+            content = source
+            if minify:
+                text = source.decode("utf-8")
+                text = MINIFIERS[Path(src).suffix](text) if Path(src).suffix in MINIFIERS else text
+                content = rewrite_refs(text, self.names).encode("utf-8")
+            rel = hashed_name(src, content) if hashed else src
+            entry = self.entries[src] = {
+                "key": key, "out": rel, "files": self.write(rel, content),
+                "bytes": len(source), "minBytes": len(content),
+            }
+            self.rebuilt.append(src)
+        if hashed:
+            self.names[src] = entry["out"]
+        return entry
+
+    def static(self, src):
+        source = (ROOT / src).read_bytes()
+        key = digest(BUILD_VERSION, source)
+        if self.reuse(src, key) is None:
+            self.entries[src] = {"key": key, "out": src, "files": self.write(src, source),
+                                 "bytes": len(source), "minBytes": len(source)}
+            self.rebuilt.append(src)
+
+
+def static_files(names):
+    for name in names:
+        path = ROOT / name
+        if path.is_dir():
+            yield from (str(p.relative_to(ROOT)) for p in sorted(path.rglob("*")) if p.is_file())
+        elif path.exists():
+            yield name
+
+
+def build(out_dir, peerjs_path=None, vendor=True, allow_download=True):
+    cache_file = out_dir / ".build-cache.json"
+    previous = json.loads(cache_file.read_text()) if cache_file.exists() else {}
+    previous = previous if previous.get("version") == BUILD_VERSION else {}
+    out_dir.mkdir(parents=True, exist_ok=True)
+    builder = Builder(out_dir, previous.get("entries", {}))
+
+    index = (ROOT / "index.html").read_text(encoding="utf-8")
+    peerjs = vendor_peerjs(index, peerjs_path, allow_download) if vendor else None
+    if peerjs is not None:
+        # Already minified upstream; only hashed and compressed
+        builder.text("vendor/peerjs.min.js", peerjs, hashed=True, minify=False)
+
+    for src in ASSETS:
+        builder.text(src, (ROOT / src).read_bytes(), hashed=True)
+    for src in PAGES:
+        source = (ROOT / src).read_text(encoding="utf-8")
+        if peerjs is not None:
+            source = PEERJS_TAG.sub(f'<script src="{builder.names["vendor/peerjs.min.js"]}"></script>', source)
+        builder.text(src, source.encode("utf-8"), hashed=False)
+    for src in static_files(STATIC):
+        builder.static(src)
+
+    # Drop outputs of earlier builds that this one no longer produced
+    keep = {f for entry in builder.entries.values() for f in entry["files"]}
+    for entry in builder.previous.values():
+        for f in entry["files"]:
+            if f not in keep:
+                (out_dir / f).unlink(missing_ok=True)
+
+    manifest = {src: entry["out"] for src, entry in builder.entries.items() if src in builder.names}
+    (out_dir / "manifest.json").write_text(json.dumps(manifest, indent=1) + "\n")
+    cache_file.write_text(json.dumps({"version": BUILD_VERSION, "entries": builder.entries}))
+    return builder
+
+
+def check_chunks(builder):
+    """Confirm each lazy chunk is only reachable through import() and size the split."""
+    problems, lines = [], []
+    for chunk, parent in LAZY_CHUNKS.items():
+        name = builder.names.get(chunk)
+        parent_path = builder.out_dir / builder.names[parent]
+        text = parent_path.read_text(encoding="utf-8")
+        dynamic = re.search(rf"""import\(\s*(["'])(\./)?{re.escape(name)}\1\s*\)""", text)
+        static = re.search(rf"""\bfrom\s*(["'])(\./)?{re.escape(name)}\1|\bimport\s*(["'])(\./)?{re.escape(name)}\3""",
+                           text)
+        if static or not dynamic:
+            problems.append(f"{chunk} must be loaded by {parent} only via import()")
+            continue
+
+        def gz(rel):
+            path = builder.out_dir / f"{rel}.gz"
+            return path.stat().st_size if path.exists() else (builder.out_dir / rel).stat().st_size
+
+        # The chunk plus every hashed file it pulls in (imports, workers)
+        chunk_text = (builder.out_dir / name).read_text(encoding="utf-8")
+        deps = [out for out in builder.names.values() if out != name and out in chunk_text]
+        base, lazy = gz(builder.names[parent]), gz(name) + sum(gz(out) for out in deps)
+        lines.append(f"{parent} without {chunk}: {base:,} gzip bytes on the join path; "
+                     f"{chunk} and {len(deps)} dependencies add {lazy:,} on demand "
+                     f"({100 * lazy / (base + lazy):.0f}% deferred)")
+    return problems, lines
+
+
+def report(builder):
+    out_dir = builder.out_dir
+    print(f"{'file':<34}{'source':>10}{'min':>10}{'gzip':>10}{'brotli':>10}")
+    total = dict.fromkeys(("source", "min", "gzip", "brotli"), 0)
+    for src, entry in builder.entries.items():
+        if Path(src).suffix not in COMPRESS:
+            continue
+        rel = entry["out"]
+        gz = out_dir / f"{rel}.gz"
+        br = out_dir / f"{rel}.br"
+        sizes = {
+            "source": entry["bytes"],
+            "min": entry["minBytes"],
+            "gzip": gz.stat().st_size if gz.exists() else entry["minBytes"],
+            "brotli": br.stat().st_size if br.exists() else 0,
+        }
+        for key in total:
+            total[key] += sizes[key]
+        print(f"{rel:<34}" + "".join(f"{sizes[k]:>10}" for k in total))
+    print(f"{'total':<34}" + "".join(f"{total[k]:>10}" for k in total))
+    print(f"rebuilt {len(builder.rebuilt)}, reused {len(builder.reused)}"
+          + ("" if brotli else "  (brotli module not installed: no .br files)"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the static site into dist/")
+    parser.add_argument("--out", type=Path, default=ROOT / "dist")
+    parser.add_argument("--peerjs", help="local copy of the PeerJS bundle to vendor")
+    parser.add_argument("--no-vendor", action="store_true", help="keep loading PeerJS from the CDN")
+    parser.add_argument("--offline", action="store_true", help="never download PeerJS")
+    parser.add_argument("--clean", action="store_true", help="remove the output directory first")
+    args = parser.parse_args(argv)
+
+    if args.clean and args.out.exists():
+        shutil.rmtree(args.out)
+    builder = build(args.out, args.peerjs, not args.no_vendor, not args.offline)
+    report(builder)
+    problems, lines = check_chunks(builder)
+    for line in lines:
+        print(line)
+    for problem in problems:
+        print(f"error: {problem}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""Static startup critical-path analysis for the site's pages.
+
+Parses a page and the ES module graph it loads, classifies every
+resource (render-blocking, parser-blocking, deferred, async, lazy) and
+sums the bytes the browser must fetch before the game can start: the
+page itself, blocking stylesheets and scripts, and each module's static
+imports. Dynamic ``import()`` targets are listed as deferred. It also
+counts ``document.getElementById`` lookups done in class constructors,
+which run before any setup code.
+
+    python -m tools.critical_path                      # source tree
+    python -m tools.critical_path --root dist          # after tools.build
+    python -m tools.critical_path --root dist --budget 60000 --max-blocking 2
+
+With --budget (gzip bytes of the local critical path) or --max-blocking
+the exit status is 1 when the page is over budget, so CI can gate on it.
+Remote resources are listed but their size is not known offline.
+"""
+import argparse
+import gzip
+import json
+import re
+import sys
+from html.parser import HTMLParser
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+STATIC_IMPORT = re.compile(r"""(?:^|[;\n}])\s*(?:import|export)\b[^'"(]*?from\s*['"]([^'"]+)['"]"""
+                           r"""|(?:^|[;\n])\s*import\s*['"]([^'"]+)['"]""")
+DYNAMIC_IMPORT = re.compile(r"""\bimport\(\s*['"]([^'"]+)['"]\s*\)""")
+
+
+class Resource:
+    def __init__(self, kind, url, mode, via=None):
+        self.kind = kind      # script, module, stylesheet, font, image, page
+        self.url = url
+        self.mode = mode      # blocking, render-blocking, deferred, async, lazy, inline
+        self.via = via
+        self.path = None
+        self.bytes = None
+        self.gzip_bytes = None
+
+    @property
+    def remote(self):
+        return self.url.startswith(("http://", "https://", "//"))
+
+    @property
+    def critical(self):
+        return self.mode in ("page", "blocking", "render-blocking", "module")
+
+    def to_dict(self):
+        return {k: getattr(self, k) for k in ("kind", "url", "mode", "via", "bytes", "remote")} | {
+            "gzipBytes": self.gzip_bytes}
+
+
+class PageParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.resources = []
+        self.inline_scripts = 0
+
+    def handle_starttag(self, tag, attrs):
+        a = dict(attrs)
+        if tag == "link" and "stylesheet" in (a.get("rel") or "").split():
+            media = a.get("media", "all")
+            mode = "render-blocking" if media in ("all", "screen") else "deferred"
+            self.resources.append(Resource("stylesheet", a.get("href", ""), mode))
+        elif tag == "link" and a.get("rel") in ("preload", "modulepreload"):
+            self.resources.append(Resource(a.get("as", "script"), a.get("href", ""), "preload"))
+        elif tag == "script":
+            src = a.get("src")
+            if not src:
+                self.inline_scripts += 1
+                return
+            if a.get("type") == "module":
+                mode = "async" if "async" in a else "module"
+                self.resources.append(Resource("module", src, mode))
+            elif "async" in a:
+                self.resources.append(Resource("script", src, "async"))
+            elif "defer" in a:
+                self.resources.append(Resource("script", src, "deferred"))
+            else:
+                self.resources.append(Resource("script", src, "blocking"))
+        elif tag == "img" and a.get("src"):
+            mode = "lazy" if a.get("loading") == "lazy" else "eager"
+            self.resources.append(Resource("image", a["src"], mode))
+
+
+def strip_comments(js):
+    js = re.sub(r"/\*.*?\*/", "", js, flags=re.S)
+    return re.sub(r"(?m)^\s*//.*$", "", js)
+
+
+def constructor_lookups(js):
+    """``getElementById`` calls inside each ``constructor() { ... }`` body."""
+    counts = []
+    for m in re.finditer(r"\bconstructor\s*\([^)]*\)\s*\{", js):
+        depth, i = 1, m.end()
+        while depth and i < len(js):
+            depth += {"{": 1, "}": -1}.get(js[i], 0)
+            i += 1
+        counts.append(js[m.end():i].count("getElementById"))
+    return counts
+
+
+def resolve(base, url):
+    return (base.parent / url.split("?")[0].split("#")[0]).resolve()
+
+
+def analyze(root, page):
+    page_path = root / page
+    html = page_path.read_text(encoding="utf-8")
+    parser = PageParser()
+    parser.feed(html)
+
+    resources = [Resource("page", page, "page")] + parser.resources
+    resources[0].path = page_path
+    for res in parser.resources:
+        if not res.remote:
+            res.path = resolve(page_path, res.url)
+    lookups = []
+    seen = set()
+
+    # Walk the static module graph; dynamic imports are deferred chunks
+    queue = [r for r in parser.resources if r.kind == "module" and r.path]
+    while queue:
+        res = queue.pop(0)
+        if res.path in seen or not res.path.exists():
+            continue
+        seen.add(res.path)
+        js = strip_comments(res.path.read_text(encoding="utf-8"))
+        lookups.extend(constructor_lookups(js))
+        imports = [(m[1] or m[2], res.mode) for m in STATIC_IMPORT.finditer(js)]
+        imports += [(url, "deferred") for url in DYNAMIC_IMPORT.findall(js)]
+        for url, mode in imports:
+            child = Resource("module", url, mode, via=res.url)
+            if not child.remote:
+                child.path = resolve(res.path, url)
+                queue.append(child)
+            resources.append(child)
+
+    for res in resources:
+        if res.path and res.path.exists():
+            path = res.path
+            data = path.read_bytes()
+            res.bytes = len(data)
+            gz = path.with_name(path.name + ".gz")
+            res.gzip_bytes = gz.stat().st_size if gz.exists() else len(gzip.compress(data, 6))
+    return resources, lookups, parser.inline_scripts
+
+
+def suggestions(resources, lookups):
+    tips = []
+    for res in resources:
+        if res.mode == "blocking":
+            where = "vendor it and " if res.remote else ""
+            tips.append(f"{res.url}: parser-blocking script; {where}add defer (classic deferred "
+                        f"scripts still run before type=module scripts, in document order)")
+        elif res.mode == "render-blocking" and res.remote:
+            tips.append(f"{res.url}: third-party stylesheet blocks first paint; preload it and "
+                        f"apply with media=print onload, or self-host the fonts")
+        elif res.kind == "image" and res.mode == "eager":
+            tips.append(f"{res.url}: eager image; add loading=lazy if below the fold")
+    if lookups and max(lookups) > 10:
+        tips.append(f"constructor does {max(lookups)} getElementById lookups before setup starts; "
+                    f"resolve the ones the setup screen does not need lazily")
+    return tips
+
+
+def fmt(n):
+    return "?" if n is None else f"{n:,}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report a page's startup critical path")
+    parser.add_argument("--root", type=Path, default=ROOT, help="site directory (source tree or dist/)")
+    parser.add_argument("--page", default="index.html")
+    parser.add_argument("--budget", type=int, help="max gzip bytes on the local critical path")
+    parser.add_argument("--max-blocking", type=int, help="max parser/render-blocking resources")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    resources, lookups, inline = analyze(args.root, args.page)
+    critical = [r for r in resources if r.critical]
+    blocking = [r for r in resources if r.mode in ("blocking", "render-blocking")]
+    critical_bytes = sum(r.bytes or 0 for r in critical)
+    critical_gzip = sum(r.gzip_bytes or 0 for r in critical)
+    deferred_gzip = sum(r.gzip_bytes or 0 for r in resources if not r.critical)
+    remote = [r.url for r in critical if r.remote]
+
+    failures = []
+    if args.budget is not None and critical_gzip > args.budget:
+        failures.append(f"critical path {critical_gzip:,} gzip bytes exceeds budget {args.budget:,}")
+    if args.max_blocking is not None and len(blocking) > args.max_blocking:
+        failures.append(f"{len(blocking)} blocking resources exceeds limit {args.max_blocking}")
+
+    if args.json:
+        print(json.dumps({
+            "page": args.page,
+            "resources": [r.to_dict() for r in resources],
+            "criticalBytes": critical_bytes,
+            "criticalGzipBytes": critical_gzip,
+            "deferredGzipBytes": deferred_gzip,
+            "blocking": len(blocking),
+            "remoteCritical": remote,
+            "constructorLookups": lookups,
+            "inlineScripts": inline,
+            "suggestions": suggestions(resources, lookups),
+            "failures": failures,
+        }, indent=2))
+    else:
+        print(f"{'mode':<16}{'kind':<11}{'bytes':>10}{'gzip':>10}  url")
+        for r in resources:
+            via = f"  (via {r.via})" if r.via else ""
+            print(f"{r.mode:<16}{r.kind:<11}{fmt(r.bytes):>10}{fmt(r.gzip_bytes):>10}  {r.url}{via}")
+        print(f"\ncritical path: {critical_bytes:,} bytes, {critical_gzip:,} gzip"
+              f" + {len(remote)} remote of unknown size; {len(blocking)} blocking")
+        print(f"deferred/async: {deferred_gzip:,} gzip bytes; {inline} inline scripts")
+        if lookups:
+            print(f"getElementById calls in constructors: {', '.join(map(str, lookups))}")
+        for tip in suggestions(resources, lookups):
+            print(f"  - {tip}")
+        for failure in failures:
+            print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+// DOM-operation counter for the board and hand rendering paths.
+//
+// Loads game.js against a minimal fake DOM that counts every element
+// lookup, creation, class/style/text write, insertion, removal and layout
+// read, starts a 2-team game, then replays a seeded sequence of opponent
+// moves, card hovers (hints on), jack selections and hand updates (select
+// a card, play it, draw a replacement), and reports the operations per
+// step. Pass a second file to compare, e.g. the previous
+// revision:
+//
+//   node tools/dom_bench.mjs game.js
+//   git show HEAD~1:game.js > /tmp/old.js && node tools/dom_bench.mjs /tmp/old.js game.js
+import { readFileSync } from 'node:fs';
+
+const MOVES = 60;
+
+// ── Fake DOM ─────────────────────────────────────────────────
+let ops = {};
+const count = (kind) => { ops[kind] = (ops[kind] || 0) + 1; };
+
+class ClassList {
+    constructor(el) { this.el = el; }
+    get list() { return this.el._className.split(/\s+/).filter(Boolean); }
+    add(...names) { count('classList'); this.el._className = [...new Set([...this.list, ...names])].join(' '); }
+    remove(...names) { count('classList'); this.el._className = this.list.filter(n => !names.includes(n)).join(' '); }
+    toggle(name, force) {
+        const on = force === undefined ? !this.contains(name) : force;
+        on ? this.add(name) : this.remove(name);
+        return on;
+    }
+    contains(name) { return this.list.includes(name); }
+}
+
+function makeStyle() {
+    const values = {};
+    return new Proxy(values, {
+        get(target, key) {
+            if (key === 'setProperty') return (k, v) => { count('style'); target[k] = v; };
+            return target[key] ?? '';
+        },
+        set(target, key, value) { count('style'); target[key] = value; return true; }
+    });
+}
+
+class Element {
+    constructor(tag) {
+        this.tagName = tag.toUpperCase();
+        this.children = [];
+        this.parentNode = null;
+        this._className = '';
+        this._id = '';
+        this.classList = new ClassList(this);
+        this.style = makeStyle();
+        this.dataset = {};
+        this.attributes = {};
+        this.value = '';
+        this.checked = false;
+    }
+    get id() { return this._id; }
+    set id(v) { this._id = v; document._ids.set(v, this); }
+    get className() { return this._className; }
+    set className(v) { count('className'); this._className = v; }
+    set innerHTML(v) { count('innerHTML'); this.children.forEach(c => { c.parentNode = null; }); this.children = []; }
+    get innerHTML() { return ''; }
+    set innerText(v) { count('text'); this._text = v; }
+    get innerText() { return this._text || ''; }
+    set textContent(v) { count('text'); this._text = v; }
+    get textContent() { return this._text || ''; }
+    set src(v) { count('src'); this._src = v; }
+    get src() { return this._src; }
+    get firstChild() { return this.children[0] || null; }
+    get isConnected() { return true; }
+    appendChild(child) {
+        count('insert');
+        if (child.parentNode) child.parentNode.children = child.parentNode.children.filter(c => c !== child);
+        child.parentNode = this;
+        this.children.push(child);
+        return child;
+    }
+    insertBefore(child, ref) {
+        count('insert');
+        if (child.parentNode) child.parentNode.children = child.parentNode.children.filter(c => c !== child);
+        child.parentNode = this;
+        const i = ref ? this.children.indexOf(ref) : -1;
+        i < 0 ? this.children.push(child) : this.children.splice(i, 0, child);
+        return child;
+    }
+    replaceChildren(...nodes) { count('insert'); this.children = []; nodes.forEach(n => { n.parentNode = this; this.children.push(n); }); }
+    removeChild(child) { count('remove'); this.children = this.children.filter(c => c !== child); child.parentNode = null; return child; }
+    remove() { count('remove'); if (this.parentNode) this.parentNode.children = this.parentNode.children.filter(c => c !== this); this.parentNode = null; }
+    setAttribute(k, v) { count('attribute'); this.attributes[k] = v; }
+    getAttribute(k) { return this.attributes[k]; }
+    addEventListener() {}
+    removeEventListener() {}
+    focus() {}
+    scrollTo() {}
+    select() {}
+    descendants() { return this.children.flatMap(c => [c, ...c.descendants()]); }
+    querySelectorAll(sel) {
+        count('query');
+        const cls = sel.startsWith('.') ? sel.slice(1) : null;
+        return this.descendants().filter(e => cls ? e.classList.contains(cls) : e.tagName === sel.toUpperCase());
+    }
+    querySelector(sel) { const all = this.querySelectorAll(sel); ops.query--; count('query'); return all[0] || null; }
+    getBoundingClientRect() { count('layout'); return { left: 0, top: 0, width: 500, height: 500, right: 500, bottom: 500 }; }
+    get offsetWidth() { count('layout'); return 500; }
+}
+
+const document = {
+    _ids: new Map(),
+    body: new Element('body'),
+    visibilityState: 'visible',
+    getElementById(id) {
+        count('lookup');
+        if (!this._ids.has(id)) {
+            const el = new Element('div');
+            el.id = id;
+        }
+        return this._ids.get(id);
+    },
+    createElement(tag) { count('create'); return new Element(tag); },
+    createElementNS(ns, tag) { count('create'); return new Element(tag); },
+    querySelectorAll(sel) { return this.body.querySelectorAll(sel); },
+    querySelector(sel) { return this.body.querySelector(sel); },
+    addEventListener() {},
+};
+
+const storage = new Map();
+Object.assign(globalThis, {
+    document,
+    window: { location: { hash: '', origin: 'http://localhost', pathname: '/', reload() {} }, addEventListener() {} },
+    localStorage: {
+        getItem: k => (storage.has(k) ? storage.get(k) : null),
+        setItem: (k, v) => storage.set(k, String(v)),
+        removeItem: k => storage.delete(k),
+    },
+    alert() {},
+    requestAnimationFrame: fn => setTimeout(fn, 0),
+    Peer: class { on() {} destroy() {} },
+});
+Object.defineProperty(globalThis, 'navigator', { value: { userAgent: 'node', platform: 'Linux', maxTouchPoints: 0 }, configurable: true });
+// Timers run inline so deferred work (sequence lines etc.) is counted too
+globalThis.setTimeout = (fn) => { fn(); return 0; };
+globalThis.clearTimeout = () => {};
+
+// ── Scenario ─────────────────────────────────────────────────
+function mulberry32(seed) {
+    let a = seed >>> 0;
+    return () => {
+        a = (a + 0x6D2B79F5) >>> 0;
+        let t = a;
+        t = Math.imul(t ^ (t >>> 15), t | 1);
+        t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+        return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+    };
+}
+
+async function load(file) {
+    document._ids.clear();
+    const src = readFileSync(file, 'utf8').replace(/new SequenceGame\(\);\s*$/, 'globalThis.__game = new SequenceGame();\n');
+    await import('data:text/javascript;base64,' + Buffer.from(src + `\n// ${Math.random()}`).toString('base64'));
+    return globalThis.__game;
+}
+
+function total(o) { return Object.values(o).reduce((a, b) => a + b, 0); }
+
+async function run(file) {
+    const game = await load(file);
+    const random = mulberry32(7);
+    Object.assign(game, {
+        myColor: 'red', currentTurn: 'blue', teamCount: 2, winTarget: 2, started: true, hintsEnabled: true,
+        deck: [], hand: ['2S', '5D', 'JD', 'JH', 'KC', 'QH', '7S'], colorNames: { red: 'Red', blue: 'Blue' },
+        sequenceGrid: Array(10).fill(null).map(() => Array(10).fill(false)), lockedSequences: [], lastMove: null,
+        playerStates: {}, isHost: false
+    });
+    game.renderBoard(true);
+    game.renderHand();
+
+    const steps = { move: [], hover: [], jack: [], hand: [] };
+    for (let m = 0; m < MOVES; m++) {
+        const empty = [];
+        for (let r = 0; r < 10; r++) for (let c = 0; c < 10; c++) {
+            if (game.board[r][c] !== 'FREE' && !game.chips[r][c]) empty.push([r, c]);
+        }
+        const [r, c] = empty[Math.floor(random() * empty.length)];
+        const color = m % 2 ? 'red' : 'blue';
+
+        ops = {};
+        game.handleData('move', { row: r, col: c, color, moveType: 'place', drew: false, cardName: game.board[r][c], nextTurn: color === 'red' ? 'blue' : 'red' }, 'peer');
+        steps.move.push(ops);
+
+        ops = {};
+        game.hoveredCardIndex = m % game.hand.length;
+        game.syncBoardState();
+        game.hoveredCardIndex = null;
+        game.syncBoardState();
+        steps.hover.push(ops);
+
+        ops = {};
+        game.selectedCardIndex = 2; game.jackMode = 'two-eye';
+        game.renderBoard();
+        game.selectedCardIndex = null; game.jackMode = null;
+        game.renderBoard();
+        steps.jack.push(ops);
+
+        ops = {};
+        const played = m % game.hand.length;
+        game.selectedCardIndex = played;
+        game.renderHand();
+        game.hand.splice(played, 1);
+        game.hand.push(game.board[1 + Math.floor(random() * 8)][1 + Math.floor(random() * 8)]);
+        game.selectedCardIndex = null;
+        game.newCardIndex = game.hand.length - 1;
+        game.renderHand();
+        steps.hand.push(ops);
+    }
+    return steps;
+}
+
+function summarize(steps) {
+    const out = {};
+    for (const [name, list] of Object.entries(steps)) {
+        const byKind = {};
+        list.forEach(o => Object.entries(o).forEach(([k, v]) => { byKind[k] = (byKind[k] || 0) + v; }));
+        Object.keys(byKind).forEach(k => { byKind[k] = +(byKind[k] / list.length).toFixed(1); });
+        out[name] = { total: +(list.reduce((a, o) => a + total(o), 0) / list.length).toFixed(1), ...byKind };
+    }
+    return out;
+}
+
+const files = process.argv.slice(2);
+if (!files.length) files.push('game.js');
+const results = [];
+for (const file of files) results.push([file, summarize(await run(file))]);
+
+for (const [file, summary] of results) {
+    console.log(`${file}: DOM operations per step (${MOVES} steps)`);
+    for (const [step, kinds] of Object.entries(summary)) {
+        const detail = Object.entries(kinds).filter(([k]) => k !== 'total').map(([k, v]) => `${k} ${v}`).join(', ');
+        console.log(`  ${step.padEnd(6)} ${String(kinds.total).padStart(7)}   ${detail}`);
+    }
+}
+if (results.length === 2) {
+    const [[, a], [, b]] = results;
+    for (const step of Object.keys(a)) {
+        console.log(`${step}: ${a[step].total} -> ${b[step].total} (${(a[step].total / Math.max(b[step].total, 0.1)).toFixed(1)}x fewer)`);
+    }
+}
@@ -0,0 +1,199 @@
+"""Dependency-free minifiers for the site's JS, CSS and HTML.
+
+They are deliberately conservative: comments and indentation go, but
+nothing is renamed or reordered, and JS keeps a newline wherever one
+could matter for automatic semicolon insertion.
+
+    python -m tools.minify game.js > /tmp/game.min.js
+"""
+import re
+import sys
+
+IDENT = re.compile(r"[\w$\\]")
+# A '/' after one of these starts a regex literal rather than a division
+REGEX_AFTER_PUNCT = set("(,=:[!&|?{};+-*%<>~^")
+REGEX_AFTER_WORD = {"return", "typeof", "case", "do", "else", "in", "of", "new", "delete",
+                    "void", "throw", "instanceof", "yield", "await"}
+# A newline after these can never end a statement
+JOIN_AFTER = set("{;,([=:&|?<>!*%")
+JOIN_BEFORE = set("})];,")
+
+
+def _is_ident(ch):
+    return bool(ch) and bool(IDENT.match(ch))
+
+
+def _regex_allowed(out):
+    i = len(out) - 1
+    while i >= 0 and out[i] in " \n":
+        i -= 1
+    if i < 0:
+        return True
+    if out[i] in REGEX_AFTER_PUNCT:
+        return True
+    j = i
+    while j >= 0 and _is_ident(out[j]):
+        j -= 1
+    return "".join(out[j + 1:i + 1]) in REGEX_AFTER_WORD
+
+
+def _skip_string(src, i, quote):
+    j = i + 1
+    while src[j] != quote:
+        if src[j] == "\\":
+            j += 1
+        j += 1
+    return j + 1
+
+
+def _skip_regex(src, i):
+    j, in_class = i + 1, False
+    while True:
+        ch = src[j]
+        if ch == "\\":
+            j += 2
+            continue
+        if ch == "[":
+            in_class = True
+        elif ch == "]":
+            in_class = False
+        elif ch == "/" and not in_class:
+            break
+        j += 1
+    j += 1
+    while j < len(src) and _is_ident(src[j]):
+        j += 1   # flags
+    return j
+
+
+def minify_js(src):
+    out = []
+    pending = ""          # whitespace seen since the last token: "", " " or "\n"
+    templates = []        # brace depth at each open ${ ... }
+    depth = 0
+    i, n = 0, len(src)
+
+    def emit(text):
+        nonlocal pending
+        if pending and out:
+            prev, nxt = out[-1], text[0]
+            if pending == "\n" and prev not in JOIN_AFTER and nxt not in JOIN_BEFORE:
+                out.append("\n")
+            elif _is_ident(prev) and _is_ident(nxt) or prev in "+-" and nxt in "+-" \
+                    or prev == "/" and nxt in "/*":
+                out.append(" ")
+        pending = ""
+        out.extend(text)
+
+    def template_from(i):
+        # Copy template text up to the closing backtick or the next ${
+        j = i
+        while j < n:
+            if src[j] == "\\":
+                j += 2
+                continue
+            if src[j] == "`":
+                return j + 1, False
+            if src.startswith("${", j):
+                return j + 2, True
+            j += 1
+        raise ValueError("unterminated template literal")
+
+    while i < n:
+        ch = src[i]
+        if ch in " \t\r\n":
+            if ch == "\n" or pending == "\n":
+                pending = "\n"
+            elif not pending:
+                pending = " "
+            i += 1
+        elif src.startswith("//", i):
+            i = src.find("\n", i)
+            i = n if i < 0 else i
+        elif src.startswith("/*", i):
+            end = src.index("*/", i + 2)
+            if "\n" in src[i:end]:
+                pending = "\n"
+            elif not pending:
+                pending = " "
+            i = end + 2
+        elif ch in "'\"":
+            j = _skip_string(src, i, ch)
+            emit(src[i:j])
+            i = j
+        elif ch == "`" or ch == "}" and templates and templates[-1] == depth:
+            if ch == "}":
+                templates.pop()
+            j, opened = template_from(i + 1)
+            emit(src[i:j])
+            if opened:
+                templates.append(depth)
+            i = j
+        elif ch == "/" and _regex_allowed(out):
+            j = _skip_regex(src, i)
+            emit(src[i:j])
+            i = j
+        else:
+            if ch == "{":
+                depth += 1
+            elif ch == "}":
+                depth -= 1
+            j = i + 1
+            if _is_ident(ch):
+                while j < n and _is_ident(src[j]):
+                    j += 1
+            emit(src[i:j])
+            i = j
+    return "".join(out).strip() + "\n"
+
+
+def minify_css(src):
+    src = re.sub(r"/\*.*?\*/", "", src, flags=re.S)
+    src = re.sub(r"\s+", " ", src)
+    src = re.sub(r"\s*([{};,>])\s*", r"\1", src)
+    src = re.sub(r";}", "}", src)
+    # "a:b" only inside declarations, so selectors like ".x :hover" survive
+    src = re.sub(r"([{;][\w-]+):\s+", r"\1:", src)
+    return src.strip() + "\n"
+
+
+RAW_TAGS = re.compile(r"(<(script|style|pre|textarea)\b.*?</\2\s*>)", re.S | re.I)
+
+
+def minify_html(src):
+    parts = RAW_TAGS.split(src)
+    out = []
+    # split() yields [text, whole raw element, tag name, text, ...]
+    for k in range(0, len(parts), 3):
+        text = re.sub(r"<!--(?!\[if).*?-->", "", parts[k], flags=re.S)
+        text = re.sub(r"\s+", " ", text)
+        text = re.sub(r">\s+<", "> <", text)
+        out.append(text)
+        if k + 1 < len(parts):
+            out.append(parts[k + 1])
+    html = "".join(out)
+    html = re.sub(r"\s*(</?(?:head|body|html|meta|link|title|div|main|aside|section|header|footer|ul|li|p|h\d)\b)",
+                  r"\1", html)
+    return html.strip() + "\n"
+
+
+MINIFIERS = {".js": minify_js, ".mjs": minify_js, ".css": minify_css, ".html": minify_html}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("usage: python -m tools.minify FILE", file=sys.stderr)
+        return 2
+    path = argv[0]
+    minify = MINIFIERS.get(path[path.rfind("."):])
+    if minify is None:
+        print(f"no minifier for {path}", file=sys.stderr)
+        return 2
+    with open(path, encoding="utf-8") as f:
+        sys.stdout.write(minify(f.read()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
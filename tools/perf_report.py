@@ -0,0 +1,145 @@
+"""Aggregate client performance traces into per-hot-path percentiles.
+
+Players (or testers) open the game with ``?perf`` and run
+``sequencePerf.download()`` in the console, which saves a
+``sequence-perf-<session>.json`` trace: every timed hot path as
+``[name, start ms, duration ms]`` plus peer message counters. This tool
+merges any number of traces, so field data from many devices can rank
+what to optimize next.
+
+    python -m tools.perf_report traces/
+    python -m tools.perf_report traces/*.json --group device --sort p95
+    python -m tools.perf_report traces/ --json > report.json
+
+Durations are in milliseconds. ``share`` is the path's part of all timed
+work; ``sessions`` is how many traces recorded it at least once.
+"""
+import argparse
+import json
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+FORMAT = "sequence-perf/1"
+MOBILE_UA = re.compile(r"Mobi|Android|iPhone|iPad|iPod")
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+
+def trace_files(paths):
+    for path in paths:
+        if path.is_dir():
+            yield from sorted(path.rglob("*.json"))
+        else:
+            yield path
+
+
+def load_traces(paths):
+    traces = []
+    for path in trace_files(paths):
+        try:
+            trace = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            print(f"skipping {path}: {e}", file=sys.stderr)
+            continue
+        if not isinstance(trace, dict) or trace.get("format") != FORMAT:
+            print(f"skipping {path}: not a {FORMAT} trace", file=sys.stderr)
+            continue
+        traces.append(trace)
+    return traces
+
+
+def device_of(trace):
+    return "mobile" if MOBILE_UA.search(trace.get("userAgent") or "") else "desktop"
+
+
+def aggregate(traces):
+    durations = defaultdict(list)
+    sessions = defaultdict(set)
+    counters = defaultdict(int)
+    dropped = 0
+    for trace in traces:
+        for name, _start, duration in trace.get("measures") or ():
+            durations[name].append(duration)
+            sessions[name].add(trace.get("session"))
+        for name, n in (trace.get("counters") or {}).items():
+            counters[name] += n
+        dropped += trace.get("dropped") or 0
+
+    grand_total = sum(sum(d) for d in durations.values()) or 1.0
+    paths = {}
+    for name, values in durations.items():
+        values.sort()
+        total = sum(values)
+        paths[name] = {
+            "calls": len(values),
+            "sessions": len(sessions[name]),
+            "mean": total / len(values),
+            "p50": percentile(values, 50),
+            "p90": percentile(values, 90),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+            "max": values[-1],
+            "total": total,
+            "share": total / grand_total,
+        }
+    return {"sessions": len(traces), "paths": paths, "counters": dict(counters), "dropped": dropped}
+
+
+def print_report(title, report, sort, min_calls):
+    print(f"{title}: {report['sessions']} sessions")
+    rows = [(name, s) for name, s in report["paths"].items() if s["calls"] >= min_calls]
+    rows.sort(key=(lambda row: row[0]) if sort == "name" else (lambda row: -row[1][sort]))
+    print(f"  {'hot path':<28}{'calls':>8}{'sess':>6}{'p50':>9}{'p90':>9}{'p95':>9}{'p99':>9}"
+          f"{'max':>9}{'total':>11}{'share':>7}")
+    for name, s in rows:
+        print(f"  {name:<28}{s['calls']:>8}{s['sessions']:>6}{s['p50']:>9.2f}{s['p90']:>9.2f}"
+              f"{s['p95']:>9.2f}{s['p99']:>9.2f}{s['max']:>9.2f}{s['total']:>11.1f}{s['share']:>7.1%}")
+    if report["counters"]:
+        per_session = max(report["sessions"], 1)
+        print(f"  {'messages':<28}{'count':>8}{'per session':>14}")
+        for name, n in sorted(report["counters"].items(), key=lambda item: -item[1]):
+            print(f"  {name:<28}{n:>8}{n / per_session:>14.1f}")
+    if report["dropped"]:
+        print(f"  ({report['dropped']} measures dropped by full trace buffers)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+", type=Path, help="trace files or directories of them")
+    parser.add_argument("--group", choices=("none", "device"), default="none",
+                        help="split the report by mobile/desktop user agent")
+    parser.add_argument("--sort", choices=("total", "p50", "p95", "p99", "calls", "name"), default="total")
+    parser.add_argument("--min-calls", type=int, default=1)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    traces = load_traces(args.paths)
+    if not traces:
+        print("no traces found", file=sys.stderr)
+        return 1
+
+    groups = {"all": traces}
+    if args.group == "device":
+        groups = defaultdict(list)
+        for trace in traces:
+            groups[device_of(trace)].append(trace)
+
+    reports = {name: aggregate(group) for name, group in sorted(groups.items())}
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return 0
+    for i, (name, report) in enumerate(reports.items()):
+        if i:
+            print()
+        print_report(name, report, args.sort, args.min_calls)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""Pack the card faces into sprite atlases.
+
+Collects every image ``getCardImagePath`` can return, scales the faces to
+the size the hand actually renders (``.card`` tops out at 70px wide, so
+2x that by default), and packs them into as few atlases as fit under
+``--max-size``. Each atlas is written as an optimized PNG and a WebP,
+next to an offset table in JSON and as an ES module:
+
+    card_images/atlas/cards-0.png, cards-0.webp, ...
+    card_images/atlas/atlas.json
+    card_images/atlas/atlas.js     # CARD_ATLAS + cardSpriteStyle(card)
+
+    python -m tools.sprites               # build and print the size report
+    python -m tools.sprites --report-only # just the current request/bytes
+
+Requires Pillow (with WebP support) for everything but --report-only.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from engine import create_deck
+
+ROOT = Path(__file__).resolve().parent.parent
+CARD_DIR = ROOT / "card_images"
+SUIT_NAMES = {"H": "hearts", "D": "diamonds", "S": "spades", "C": "clubs"}
+
+
+def card_image_path(card):
+    """Port of ``getCardImagePath`` in game.js."""
+    if card == "FREE":
+        return "card_images/back_light.png"
+    rank, suit = card[:-1], card[-1]
+    if rank == "J":
+        return {
+            "JH": "card_images/hearts_J.png",
+            "JS": "card_images/spades_J.png",
+            "JD": "card_images/diamonds_J.png",
+            "JC": "card_images/clubs_J_two_eyed.png",
+        }[card]
+    return f"card_images/{SUIT_NAMES[suit]}_{rank}.png"
+
+
+def atlas_cards():
+    """Every card the UI can show, in a stable order."""
+    return ["FREE"] + sorted(set(create_deck()), key=lambda k: ("HDSC".index(k[-1]), k))
+
+
+def current_footprint():
+    used = {card_image_path(card) for card in atlas_cards()}
+    files = sorted(p for p in CARD_DIR.glob("*.png"))
+    used_bytes = sum((ROOT / path).stat().st_size for path in used)
+    unused = [p for p in files if f"card_images/{p.name}" not in used]
+    return {
+        "requests": len(used),
+        "bytes": used_bytes,
+        "unreferenced": {p.name: p.stat().st_size for p in unused},
+    }
+
+
+def pack(cards, cell, max_size):
+    """Assign each card an ``(atlas, x, y)`` slot in a uniform grid."""
+    cols = max(1, max_size // cell[0])
+    rows = max(1, max_size // cell[1])
+    per_atlas = cols * rows
+    slots = {}
+    for i, card in enumerate(cards):
+        atlas, slot = divmod(i, per_atlas)
+        slots[card] = (atlas, (slot % cols) * cell[0], (slot // cols) * cell[1])
+    atlases = (len(cards) + per_atlas - 1) // per_atlas
+    last = len(cards) - (atlases - 1) * per_atlas
+    sizes = [(cols * cell[0], rows * cell[1])] * (atlases - 1)
+    sizes.append((min(cols, last) * cell[0], ((last + cols - 1) // cols) * cell[1]))
+    return slots, sizes
+
+
+def build(out_dir, width, max_size, quality):
+    try:
+        from PIL import Image
+    except ImportError:
+        sys.exit("tools.sprites needs Pillow: pip install Pillow")
+
+    cards = atlas_cards()
+    images = {card: Image.open(ROOT / card_image_path(card)).convert("RGBA") for card in cards}
+    src_w, src_h = max(im.width for im in images.values()), max(im.height for im in images.values())
+    cell = (width, round(width * src_h / src_w))
+    slots, sizes = pack(cards, cell, max_size)
+
+    sheets = [Image.new("RGBA", size, (0, 0, 0, 0)) for size in sizes]
+    for card, (atlas, x, y) in slots.items():
+        face = images[card].resize(cell, Image.LANCZOS)
+        sheets[atlas].paste(face, (x, y))
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    files = []
+    for i, sheet in enumerate(sheets):
+        png, webp = out_dir / f"cards-{i}.png", out_dir / f"cards-{i}.webp"
+        sheet.save(png, optimize=True)
+        sheet.save(webp, quality=quality, method=6)
+        files.append({"png": png.name, "webp": webp.name, "width": sheet.width, "height": sheet.height})
+
+    table = {
+        "cell": {"width": cell[0], "height": cell[1]},
+        "atlases": files,
+        "cards": {card: {"atlas": a, "x": x, "y": y} for card, (a, x, y) in slots.items()},
+    }
+    (out_dir / "atlas.json").write_text(json.dumps(table, indent=1))
+    (out_dir / "atlas.js").write_text(
+        "// Generated by tools/sprites.py – do not edit.\n"
+        f"export const CARD_ATLAS = {json.dumps(table)};\n\n"
+        "// CSS background for a card face, sized to a box `size` px wide.\n"
+        "export function cardSpriteStyle(card, size, webp = true) {\n"
+        "    const slot = CARD_ATLAS.cards[card];\n"
+        "    const sheet = CARD_ATLAS.atlases[slot.atlas];\n"
+        "    const k = size / CARD_ATLAS.cell.width;\n"
+        "    const base = 'card_images/atlas/';\n"
+        "    return {\n"
+        "        backgroundImage: `url(${base}${webp ? sheet.webp : sheet.png})`,\n"
+        "        backgroundSize: `${sheet.width * k}px ${sheet.height * k}px`,\n"
+        "        backgroundPosition: `${-slot.x * k}px ${-slot.y * k}px`\n"
+        "    };\n"
+        "}\n"
+    )
+    return files
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build card sprite atlases")
+    parser.add_argument("--out", type=Path, default=CARD_DIR / "atlas")
+    parser.add_argument("--width", type=int, default=140, help="card width in the atlas, px")
+    parser.add_argument("--max-size", type=int, default=2048, help="largest atlas side, px")
+    parser.add_argument("--quality", type=int, default=85, help="WebP quality")
+    parser.add_argument("--report-only", action="store_true")
+    args = parser.parse_args(argv)
+
+    before = current_footprint()
+    print(f"before: {before['requests']} requests, {before['bytes'] / 1024:.0f} KiB")
+    for name, size in before["unreferenced"].items():
+        print(f"  unreferenced by game.js: {name} ({size / 1024:.0f} KiB)")
+    if args.report_only:
+        return 0
+
+    files = build(args.out, args.width, args.max_size, args.quality)
+    for fmt in ("png", "webp"):
+        total = sum((args.out / f[fmt]).stat().st_size for f in files)
+        print(f"after ({fmt}): {len(files)} requests, {total / 1024:.0f} KiB "
+              f"({100 * (1 - total / before['bytes']):.0f}% smaller)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())